@@ -0,0 +1,205 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import numpy as np
+
+import history
+from features import FEATURE_NAMES, rolling_features
+from scorer import LocalModel
+
+# backfill: predikcije za prosli opseg (npr. posle deploy-a novog modela) bez replay-a kroz MQTT.
+# readinzi se citaju iz datamanager-a u blokovima (ExportReadings), prozori se racunaju
+# vektorski za sve izvore odjednom, a bodovanje ide u velikim batch-evima.
+#
+#   python backfill.py --from 2026-01-01T00:00:00Z --to 2026-02-01T00:00:00Z --out preds.jsonl
+#   python backfill.py --from ... --to ... --scoring remote --nats-subject iot.predictions.backfill
+
+DATAMANAGER_GRPC_URL = os.getenv("DATAMANAGER_GRPC_URL", "datamanager:50051")
+WINDOW = int(os.getenv("WINDOW_SIZE", "20"))
+LOCAL_MODEL_DIR = os.getenv("LOCAL_MODEL_DIR", "/models")
+MLAAS_BATCH_URL = os.getenv("MLAAS_BATCH_URL", "http://mlaas:8000/predict/batch")
+NATS_URL = os.getenv("NATS_URL", "nats://nats:4222")
+
+
+def parse_dt(s: str) -> datetime:
+    dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def iso_ms(ts_ms: np.ndarray) -> list[str]:
+    return [s + "Z" for s in np.datetime_as_string(ts_ms.astype("datetime64[ms]"), unit="ms").tolist()]
+
+
+def score_local(model_dir: str, version: str, X: np.ndarray) -> tuple[np.ndarray, float, str]:
+    local = LocalModel(model_dir, FEATURE_NAMES)
+    if not local.load(version):
+        raise SystemExit(f"model version {version or '(latest)'} not found in {model_dir}")
+    return local.score(X), local.scorer.threshold, local.version
+
+
+async def score_remote(url: str, version: str, X: np.ndarray, chunk: int, concurrency: int) -> tuple[np.ndarray, np.ndarray, str]:
+    """POST /predict/batch u komadima od `chunk` redova, do `concurrency` zahteva paralelno."""
+    params = {"model_version": version} if version else None
+    probs = np.empty(len(X))
+    labels = np.empty(len(X), dtype=np.int64)
+    served = set()
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async with httpx.AsyncClient(timeout=60.0) as http:
+        async def one(a: int) -> None:
+            rows = X[a:a + chunk].tolist()
+            items = [
+                {"reading_id": "", "source_id": 0, "ts": "", "features": dict(zip(FEATURE_NAMES, r))}
+                for r in rows
+            ]
+            async with sem:
+                resp = await http.post(url, json={"items": items}, params=params)
+            resp.raise_for_status()
+            out = resp.json()["items"]
+            probs[a:a + len(out)] = [o["probability"] for o in out]
+            labels[a:a + len(out)] = [o["prediction"] for o in out]
+            served.update(o["model_version"] for o in out)
+
+        await asyncio.gather(*(one(a) for a in range(0, len(X), chunk)))
+
+    if len(served) > 1:
+        print(f"[backfill] warning: mlaas served several model versions during backfill: {sorted(served)}")
+    return probs, labels, ",".join(sorted(served))
+
+
+class FileSink:
+    def __init__(self, path: str):
+        self.f = open(path, "w", encoding="utf-8")
+
+    async def publish(self, msg: dict) -> None:
+        self.f.write(json.dumps(msg) + "\n")
+
+    async def close(self) -> None:
+        self.f.close()
+
+
+class NatsSink:
+    FLUSH_EVERY = 10000
+
+    def __init__(self, nc, subject: str):
+        self.nc = nc
+        self.subject = subject
+        self.pending = 0
+
+    async def publish(self, msg: dict) -> None:
+        await self.nc.publish(self.subject, json.dumps(msg).encode("utf-8"))
+        self.pending += 1
+        if self.pending >= self.FLUSH_EVERY:
+            self.pending = 0
+            await self.nc.flush()
+
+    async def close(self) -> None:
+        await self.nc.flush()
+        await self.nc.close()
+
+
+async def run(args) -> None:
+    t_from, t_to = parse_dt(args.from_), parse_dt(args.to)
+    if t_to <= t_from:
+        raise SystemExit("--to must be after --from")
+
+    # prozor na pocetku opsega se puni readinzima iz warmup perioda
+    t0 = time.perf_counter()
+    cols = await history.export_columns(
+        args.datamanager, t_from - timedelta(seconds=args.warmup_s), t_to, args.batch_size
+    )
+    n = len(cols["id"])
+    print(f"[backfill] fetched {n} readings in {time.perf_counter() - t0:.1f}s")
+    if n == 0:
+        return
+
+    # po izvoru, pa po vremenu (stabilno: redosled iz datamanager-a ostaje za isti ts)
+    t1 = time.perf_counter()
+    order = np.lexsort((cols["ts_ms"], cols["source_id"]))
+    src = cols["source_id"][order]
+    ts_ms = cols["ts_ms"][order]
+    idx, X = rolling_features(cols["values"][order], src, args.window)
+
+    # datamanager vraca i readinge sa ts == --to (<=), a opseg je [from, to)
+    win_ts = ts_ms[idx]
+    keep = (win_ts >= int(t_from.timestamp() * 1000)) & (win_ts < int(t_to.timestamp() * 1000))
+    idx, X = idx[keep], X[keep]
+    print(f"[backfill] {len(idx)} windows from {len(np.unique(src))} sources in {time.perf_counter() - t1:.1f}s")
+    if len(idx) == 0:
+        return
+
+    t2 = time.perf_counter()
+    if args.scoring == "local":
+        probs, threshold, version = score_local(args.model_dir, args.model_version, X)
+        labels = (probs >= threshold).astype(np.int64)
+    else:
+        probs, labels, version = await score_remote(args.mlaas_url, args.model_version, X, args.chunk, args.concurrency)
+    print(f"[backfill] scored {len(idx)} windows with model_version={version} in {time.perf_counter() - t2:.1f}s")
+
+    if args.out:
+        sink = FileSink(args.out)
+    else:
+        from nats.aio.client import Client as NATS
+
+        nc = NATS()
+        await nc.connect(servers=[args.nats_url])
+        sink = NatsSink(nc, args.nats_subject)
+
+    # izlaz hronoloski, isti oblik kao live predikcije + backfill: true
+    t3 = time.perf_counter()
+    out_order = np.argsort(ts_ms[idx], kind="stable")
+    rows = order[idx[out_order]]
+    ids = cols["id"]
+    emitted_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    ts_str = iso_ms(ts_ms[idx[out_order]])
+    try:
+        for k, (r, s, ts, y, p) in enumerate(zip(
+            rows.tolist(), src[idx[out_order]].tolist(), ts_str,
+            labels[out_order].tolist(), probs[out_order].tolist(),
+        )):
+            await sink.publish({
+                "emitted_at": emitted_at,
+                "reading_id": ids[r],
+                "source_id": s,
+                "ts": ts,
+                "prediction": y,
+                "probability": p,
+                "model_version": version,
+                "window_size": args.window,
+                "backfill": True,
+            })
+    finally:
+        await sink.close()
+    dest = args.out or f"nats {args.nats_subject}"
+    print(f"[backfill] wrote {len(rows)} predictions to {dest} in {time.perf_counter() - t3:.1f}s "
+          f"(total {time.perf_counter() - t0:.1f}s)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Backfill predikcija za istorijski opseg readinga")
+    ap.add_argument("--from", dest="from_", required=True, help="pocetak opsega (ISO 8601, UTC)")
+    ap.add_argument("--to", required=True, help="kraj opsega, iskljucivo (ISO 8601, UTC)")
+    ap.add_argument("--warmup-s", type=float, default=3600.0,
+                    help="readinzi pre --from koji samo pune prozore (bez predikcija)")
+    ap.add_argument("--window", type=int, default=WINDOW)
+    ap.add_argument("--datamanager", default=DATAMANAGER_GRPC_URL)
+    ap.add_argument("--batch-size", type=int, default=50000, help="redova po ExportReadings bloku")
+    ap.add_argument("--scoring", choices=["local", "remote"], default="local")
+    ap.add_argument("--model-dir", default=LOCAL_MODEL_DIR)
+    ap.add_argument("--model-version", default="", help="prazno = najnovija (local) / default (remote)")
+    ap.add_argument("--mlaas-url", default=MLAAS_BATCH_URL)
+    ap.add_argument("--chunk", type=int, default=1000, help="redova po /predict/batch zahtevu (max MAX_BATCH_SIZE)")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--out", default="", help="JSONL fajl; bez ovoga predikcije idu na NATS")
+    ap.add_argument("--nats-url", default=NATS_URL)
+    ap.add_argument("--nats-subject", default="iot.predictions.backfill")
+    asyncio.run(run(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import json
+import os
+import time
+
+# checkpoint prozora na lokalni disk: periodicno i na gasenje, da posle restarta
+# predikcije krenu odmah umesto posle WINDOW_SIZE novih readinga po izvoru
+
+FORMAT = "analytics-windows-v1"
+
+
+def save(path: str, window_size: int, state: dict) -> None:
+    # tmp + rename: prekid usred upisa ne ostavlja pokvaren checkpoint
+    doc = {"format": FORMAT, "saved_at": time.time(), "window_size": window_size, "sources": state}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(doc, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load(path: str, max_age_s: float) -> dict | None:
+    """Stanje iz checkpoint-a ili None (nema ga, neispravan ili stariji od max_age_s)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            doc = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"[analytics] checkpoint {path} unreadable: {e}")
+        return None
+    if doc.get("format") != FORMAT:
+        print(f"[analytics] checkpoint {path} has unknown format {doc.get('format')}")
+        return None
+    age = time.time() - float(doc.get("saved_at", 0))
+    if max_age_s > 0 and age > max_age_s:
+        print(f"[analytics] checkpoint {path} is {age:.0f}s old (max {max_age_s:.0f}s), ignoring")
+        return None
+    return doc.get("sources") or {}
@@ -0,0 +1,375 @@
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+
+import numpy as np
+
+# window feature-i: jedina implementacija za live (RollingWindow, O(1) po readingu uz tekuce sume)
+# i za batch (rolling_features: trening u mlaas/train.py i backfill); train.py ovaj modul ucitava
+# direktno iz analytics/, pa obe strane uvek racunaju iste vektore
+
+RAW_FIELDS = ("temperature_c", "humidity_percent", "light_lux", "co2_ppm")
+PREFIXES = ("temp", "hum", "light", "co2")
+
+# redosled ulaza modela (mlaas/train.py MODEL_FEATURE_NAMES, mlaas/app/schemas.py Features)
+FEATURE_NAMES = [
+    "temp_mean", "temp_std",
+    "hum_mean", "hum_std",
+    "light_mean", "light_std",
+    "co2_mean", "co2_std",
+    "temp_last", "hum_last", "light_last", "co2_last",
+]
+
+# sume se povremeno racunaju ispocetka da se ne nakuplja greska zaokruzivanja
+RECOMPUTE_EVERY = 64
+
+
+def raw_values(reading: dict) -> tuple:
+    return tuple(float(reading.get(k) or 0.0) for k in RAW_FIELDS)
+
+
+def event_time(reading: dict) -> float:
+    """ts readinga (epoch s); bez ispravnog ts-a vreme prijema."""
+    try:
+        return datetime.fromisoformat(str(reading["ts"]).replace("Z", "+00:00")).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return time.time()
+
+
+TIME_UNITS = {"s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_resolutions(spec: str) -> list[tuple[str, int, float]]:
+    """
+    "5,20,100,5m,1h" -> [(ime, broj readinga, trajanje s)]: broj = prozor po broju readinga,
+    sufiks s/m/h = vremenski prozor po ts readinga.
+    """
+    out = []
+    for part in spec.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        if part[-1] in TIME_UNITS:
+            span = float(part[:-1]) * TIME_UNITS[part[-1]]
+            if span <= 0:
+                raise ValueError(f"bad window {part!r}")
+            out.append((part, 0, span))
+        else:
+            size = int(part)
+            if size < 1:
+                raise ValueError(f"bad window {part!r}")
+            out.append((part, size, 0.0))
+    if len({name for name, _, _ in out}) != len(out):
+        raise ValueError(f"duplicate windows in {spec!r}")
+    return out
+
+
+def rolling_features(values: np.ndarray, groups: np.ndarray, size: int, chunk: int = 1 << 12):
+    """
+    Batch ekvivalent RollingWindow.features (trening, backfill).
+    values: N x 4 (RAW_FIELDS), sortirano po (source_id, vreme); groups: N (source_id).
+    Vraca (idx, X): redove ciji je prozor pun (isti uslov kao window.full) i X (len(idx) x 12)
+    u FEATURE_NAMES redosledu.
+    Sume prozora su razlike kumulativnih suma, pa cena ne zavisi od velicine prozora; vrednosti se
+    centriraju po grupi, a kumulativne sume idu po blokovima od `chunk` redova, da razlika velikih
+    suma ne pojede preciznost std-a. Prozor u kome se vrednost ne menja daje tacno mean=last, std=0
+    (kao RollingWindow).
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    k = len(PREFIXES)
+    if n < size:
+        return np.empty(0, dtype=np.int64), np.empty((0, 3 * k))
+
+    # pozicija reda unutar svoje grupe
+    change = np.flatnonzero(groups[1:] != groups[:-1]) + 1
+    starts = np.zeros(n, dtype=np.int64)
+    starts[change] = change
+    np.maximum.accumulate(starts, out=starts)
+    idx = np.flatnonzero(np.arange(n) - starts >= size - 1)
+
+    bounds = np.concatenate(([0], change))
+    counts = np.diff(np.append(bounds, n))
+    center = np.repeat(np.add.reduceat(values, bounds, axis=0) / counts[:, None], counts, axis=0)
+    v = values - center
+
+    # broj promena vrednosti do reda (po koloni); prozor je konstantan ako u njemu nema promena
+    changes = np.zeros((n, k), dtype=np.int64)
+    np.cumsum(values[1:] != values[:-1], axis=0, out=changes[1:])
+    const = changes[idx] == changes[idx - (size - 1)]
+
+    X = np.empty((len(idx), 3 * k))
+    X[:, 2 * k:] = values[idx]  # *_last
+    for a in range(0, len(idx), chunk):
+        rows = idx[a:a + chunk]
+        lo = rows[0] - (size - 1)
+        seg = v[lo:rows[-1] + 1]
+        c1 = np.zeros((len(seg) + 1, k))
+        c2 = np.zeros((len(seg) + 1, k))
+        np.cumsum(seg, axis=0, out=c1[1:])
+        np.cumsum(seg * seg, axis=0, out=c2[1:])
+        r = rows - lo + 1  # prozor reda = seg[r - size:r], uvek unutar jedne grupe
+        mean = (c1[r] - c1[r - size]) / size
+        # populaciona varijansa (= statistics.pstdev), max(0) zbog zaokruzivanja
+        var = np.maximum((c2[r] - c2[r - size]) / size - mean * mean, 0.0)
+        X[a:a + chunk, 0:2 * k:2] = mean + center[rows]
+        X[a:a + chunk, 1:2 * k:2] = np.sqrt(var)
+    X[:, 0:2 * k:2][const] = X[:, 2 * k:][const]
+    X[:, 1:2 * k:2][const] = 0.0
+    return idx, X
+
+
+def _stats(sums, sumsq, n: int, last, runs) -> dict:
+    # runs[i]: koliko poslednjih readinga ima istu vrednost polja i; ako pokriva ceo prozor,
+    # mean/std su tacni (bez ostatka zaokruzivanja iz tekucih suma)
+    out = {}
+    for i, p in enumerate(PREFIXES):
+        if n < 2 or runs[i] >= n:
+            out[f"{p}_mean"], out[f"{p}_std"] = last[i], 0.0
+            continue
+        mean = sums[i] / n
+        # populaciona varijansa (= statistics.pstdev), max(0) zbog zaokruzivanja
+        var = max(0.0, sumsq[i] / n - mean * mean)
+        out[f"{p}_mean"], out[f"{p}_std"] = mean, var ** 0.5
+    for i, p in enumerate(PREFIXES):
+        out[f"{p}_last"] = last[i]
+    return out
+
+
+def _update_runs(runs: list, prev, x) -> None:
+    for i, v in enumerate(x):
+        runs[i] = runs[i] + 1 if prev is not None and prev[i] == v else 1
+
+
+class _Resolution:
+    __slots__ = ("name", "size", "span", "sums", "sumsq", "n", "start")
+
+    def __init__(self, name: str, size: int, span: float):
+        self.name = name
+        self.size = size  # > 0: poslednjih size readinga
+        self.span = span  # > 0: readinzi sa ts u (t_poslednjeg - span, t_poslednjeg]
+        self.sums = [0.0] * len(RAW_FIELDS)
+        self.sumsq = [0.0] * len(RAW_FIELDS)
+        self.n = 0
+        self.start = 0  # redni broj najstarijeg readinga u prozoru
+
+    def add(self, x) -> None:
+        sums, sumsq = self.sums, self.sumsq
+        for i, v in enumerate(x):
+            sums[i] += v
+            sumsq[i] += v * v
+        self.n += 1
+
+    def remove(self, x) -> None:
+        sums, sumsq = self.sums, self.sumsq
+        for i, v in enumerate(x):
+            sums[i] -= v
+            sumsq[i] -= v * v
+        self.n -= 1
+        self.start += 1
+
+
+class MultiWindow:
+    """
+    Vise rezolucija (po broju readinga i po vremenu) nad jednim baferom izvora: svaki reading
+    se jednom doda u sume svih prozora, a izbacuje se iz prozora cija je granica presla preko njega.
+    Bafer cuva readinge dok god su u bar jednom prozoru (najvise max_len).
+    """
+
+    __slots__ = ("res", "buf", "first", "seq", "max_len", "updates", "runs")
+
+    def __init__(self, resolutions, max_len: int):
+        self.res = [_Resolution(*r) for r in resolutions]
+        self.buf = deque()  # (t, x); buf[0] ima redni broj self.first
+        self.first = 0
+        self.seq = 0
+        self.max_len = max(max((r.size for r in self.res), default=1), max_len)
+        self.updates = 0
+        self.runs = [0] * len(RAW_FIELDS)
+
+    def push(self, t: float, x: tuple) -> None:
+        buf = self.buf
+        _update_runs(self.runs, buf[-1][1] if buf else None, x)
+        buf.append((t, x))
+        seq = self.seq
+        self.seq += 1
+        for r in self.res:
+            r.add(x)
+            if r.size:
+                if r.n > r.size:
+                    r.remove(buf[r.start - self.first][1])
+            else:
+                while r.start < seq:
+                    old_t, old_x = buf[r.start - self.first]
+                    if old_t > t - r.span:
+                        break
+                    r.remove(old_x)
+
+        # readinzi koji vise nisu ni u jednom prozoru; preko max_len izbacuju se i iz vremenskih
+        keep = min(r.start for r in self.res)
+        while self.first < keep or len(buf) > self.max_len:
+            _, old_x = buf.popleft()
+            for r in self.res:
+                if r.start == self.first:
+                    r.remove(old_x)
+            self.first += 1
+
+        self.updates += 1
+        if self.updates >= len(buf) * RECOMPUTE_EVERY:
+            self._recompute()
+
+    def _recompute(self) -> None:
+        self.updates = 0
+        buf = list(self.buf)
+        for r in self.res:
+            r.sums = [0.0] * len(RAW_FIELDS)
+            r.sumsq = [0.0] * len(RAW_FIELDS)
+            for _, x in buf[r.start - self.first:]:
+                for i, v in enumerate(x):
+                    r.sums[i] += v
+                    r.sumsq[i] += v * v
+
+    def features(self) -> dict:
+        """ime rezolucije -> feature-i (FEATURE_NAMES) + count (broj readinga u prozoru)."""
+        if not self.buf:
+            return {}
+        last = self.buf[-1][1]
+        out = {}
+        for r in self.res:
+            f = _stats(r.sums, r.sumsq, r.n, last, self.runs)
+            f["count"] = r.n
+            out[r.name] = f
+        return out
+
+    def state(self) -> list:
+        return [[t, *x] for t, x in self.buf]
+
+
+class RollingWindow:
+    """Poslednjih `size` readinga jednog izvora + tekuce sume za mean/pstdev."""
+
+    __slots__ = (
+        "size", "values", "sums", "sumsq", "runs", "updates", "last_seen", "scored_x", "scored_at", "last_pred",
+        "multi",
+    )
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = deque()
+        self.sums = [0.0] * len(RAW_FIELDS)
+        self.sumsq = [0.0] * len(RAW_FIELDS)
+        self.runs = [0] * len(RAW_FIELDS)
+        self.updates = 0
+        self.last_seen = 0.0
+        # change-driven skipping (gate.py): poslednji bodovani vektor i poslednja predikcija
+        self.scored_x = None
+        self.scored_at = 0.0
+        self.last_pred = None
+        # dodatne rezolucije za objavu feature-a (FEATURE_WINDOWS), None = iskljuceno
+        self.multi = None
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) >= self.size
+
+    def push(self, x: tuple) -> None:
+        _update_runs(self.runs, self.values[-1] if self.values else None, x)
+        self.values.append(x)
+        sums, sumsq = self.sums, self.sumsq
+        for i, v in enumerate(x):
+            sums[i] += v
+            sumsq[i] += v * v
+        if len(self.values) > self.size:
+            old = self.values.popleft()
+            for i, v in enumerate(old):
+                sums[i] -= v
+                sumsq[i] -= v * v
+
+        self.updates += 1
+        if self.updates % (self.size * RECOMPUTE_EVERY) == 0:
+            self._recompute()
+
+    def _recompute(self) -> None:
+        self.sums = [0.0] * len(RAW_FIELDS)
+        self.sumsq = [0.0] * len(RAW_FIELDS)
+        for x in self.values:
+            for i, v in enumerate(x):
+                self.sums[i] += v
+                self.sumsq[i] += v * v
+
+    def features(self) -> dict:
+        return _stats(self.sums, self.sumsq, len(self.values), self.values[-1], self.runs)
+
+
+class WindowStore:
+    """Prozori po source_id; izvori bez readinga duze od ttl_s se izbacuju (LRU redosled)."""
+
+    def __init__(self, size: int, ttl_s: float, resolutions=(), multi_max_len: int = 10000):
+        self.size = size
+        self.ttl_s = ttl_s
+        self.resolutions = list(resolutions)
+        self.multi_max_len = multi_max_len
+        self.windows: "OrderedDict[int, RollingWindow]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.windows)
+
+    def push(self, source_id: int, reading: dict, now: float) -> RollingWindow:
+        w = self.windows.get(source_id)
+        if w is None:
+            w = self.windows[source_id] = self._new_window()
+        else:
+            self.windows.move_to_end(source_id)
+        w.last_seen = now
+        x = raw_values(reading)
+        w.push(x)
+        if w.multi is not None:
+            w.multi.push(event_time(reading), x)
+        self.evict(now)
+        return w
+
+    def _new_window(self) -> RollingWindow:
+        w = RollingWindow(self.size)
+        if self.resolutions:
+            w.multi = MultiWindow(self.resolutions, self.multi_max_len)
+        return w
+
+    def evict(self, now: float) -> int:
+        if self.ttl_s <= 0:
+            return 0
+        n = 0
+        while self.windows:
+            sid, w = next(iter(self.windows.items()))
+            if now - w.last_seen <= self.ttl_s:
+                break
+            del self.windows[sid]
+            n += 1
+        return n
+
+    def state(self) -> dict:
+        """
+        Sirove vrednosti prozora po izvoru (za checkpoint); sume se racunaju pri restore.
+        Sa vise rezolucija: {"values": ..., "multi": [[t, *x], ...]}.
+        """
+        out = {}
+        for sid, w in self.windows.items():
+            values = [list(x) for x in w.values]
+            out[str(sid)] = values if w.multi is None else {"values": values, "multi": w.multi.state()}
+        return out
+
+    def restore(self, state: dict, now: float) -> int:
+        n = 0
+        for sid, values in state.items():
+            multi = None
+            if isinstance(values, dict):
+                values, multi = values.get("values") or [], values.get("multi")
+            w = self._new_window()
+            for x in values[-self.size:]:
+                w.push(tuple(float(v) for v in x))
+            if w.multi is not None and multi:
+                for t, *x in multi:
+                    w.multi.push(float(t), tuple(float(v) for v in x))
+            w.last_seen = now
+            self.windows[int(sid)] = w
+            n += 1
+        return n
@@ -0,0 +1,61 @@
+# change-driven inference: novi poziv modela samo kad se neki feature pomeri vise od
+# max(abs_eps, rel_eps * |vrednost|) u odnosu na poslednji bodovani vektor tog izvora,
+# ili kad je poslednja predikcija starija od max_staleness_s
+
+from features import FEATURE_NAMES
+
+DEFAULT_ABS_EPS = {"temp": 0.05, "hum": 0.1, "light": 5.0, "co2": 5.0}
+
+
+def parse_abs_eps(spec: str) -> list[float]:
+    """"temp=0.05,hum=0.1,light=5,co2=5" (prefiks ili puno ime) -> eps po feature-u."""
+    eps = dict(DEFAULT_ABS_EPS)
+    for part in spec.split(","):
+        part = part.strip()
+        if part:
+            name, _, val = part.partition("=")
+            eps[name.strip()] = float(val)
+    return [eps.get(n, eps.get(n.partition("_")[0], 0.0)) for n in FEATURE_NAMES]
+
+
+class ChangeGate:
+    ACTIONS = ("republish", "suppress")
+
+    def __init__(self, rel_eps: float, abs_eps: list[float], max_staleness_s: float, action: str):
+        if action not in self.ACTIONS:
+            raise ValueError(f"unknown skip action {action!r}, expected one of {self.ACTIONS}")
+        self.rel_eps = rel_eps
+        self.abs_eps = abs_eps
+        self.max_staleness_s = max_staleness_s
+        self.action = action
+        self.scored = 0
+        self.skipped = 0
+
+    def changed(self, old: list, new: list) -> bool:
+        rel = self.rel_eps
+        for a, b, eps in zip(old, new, self.abs_eps):
+            if abs(a - b) > max(eps, rel * max(abs(a), abs(b))):
+                return True
+        return False
+
+    def should_score(self, window, feats: dict, now: float) -> bool:
+        """Odluka za spreman prozor; stanje (poslednji bodovani vektor) cuva se na samom prozoru."""
+        x = [feats[n] for n in FEATURE_NAMES]
+        if (
+            window.scored_x is None
+            or (self.max_staleness_s > 0 and now - window.scored_at >= self.max_staleness_s)
+            or self.changed(window.scored_x, x)
+        ):
+            self.scored += 1
+            return True
+        self.skipped += 1
+        return False
+
+    def record(self, window, feats: dict, pred: dict, now: float) -> None:
+        """
+        Posle objavljene predikcije: tek tada vektor vazi kao bodovan. Neuspeo poziv modela
+        (MLaaS greska/timeout) ne menja stanje, pa sledeci reading ponovo ide na model.
+        """
+        window.scored_x = [feats[n] for n in FEATURE_NAMES]
+        window.scored_at = now
+        window.last_pred = pred
@@ -0,0 +1,444 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+import warnings
+
+import iot_readings_pb2 as iot__readings__pb2
+
+GRPC_GENERATED_VERSION = '1.78.0'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
+
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
+
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + ' but the generated code in iot_readings_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
+
+
+class ReadingServiceStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.CreateReading = channel.unary_unary(
+                '/iot.ReadingService/CreateReading',
+                request_serializer=iot__readings__pb2.CreateReadingRequest.SerializeToString,
+                response_deserializer=iot__readings__pb2.ReadingResponse.FromString,
+                _registered_method=True)
+        self.GetReading = channel.unary_unary(
+                '/iot.ReadingService/GetReading',
+                request_serializer=iot__readings__pb2.GetReadingRequest.SerializeToString,
+                response_deserializer=iot__readings__pb2.ReadingResponse.FromString,
+                _registered_method=True)
+        self.UpdateReading = channel.unary_unary(
+                '/iot.ReadingService/UpdateReading',
+                request_serializer=iot__readings__pb2.UpdateReadingRequest.SerializeToString,
+                response_deserializer=iot__readings__pb2.ReadingResponse.FromString,
+                _registered_method=True)
+        self.BatchUpdateReadings = channel.unary_unary(
+                '/iot.ReadingService/BatchUpdateReadings',
+                request_serializer=iot__readings__pb2.BatchUpdateReadingsRequest.SerializeToString,
+                response_deserializer=iot__readings__pb2.BatchUpdateReadingsResponse.FromString,
+                _registered_method=True)
+        self.DeleteReading = channel.unary_unary(
+                '/iot.ReadingService/DeleteReading',
+                request_serializer=iot__readings__pb2.DeleteReadingRequest.SerializeToString,
+                response_deserializer=iot__readings__pb2.DeleteReadingResponse.FromString,
+                _registered_method=True)
+        self.ListReadings = channel.unary_unary(
+                '/iot.ReadingService/ListReadings',
+                request_serializer=iot__readings__pb2.ListReadingsRequest.SerializeToString,
+                response_deserializer=iot__readings__pb2.ListReadingsResponse.FromString,
+                _registered_method=True)
+        self.Aggregate = channel.unary_unary(
+                '/iot.ReadingService/Aggregate',
+                request_serializer=iot__readings__pb2.AggregateRequest.SerializeToString,
+                response_deserializer=iot__readings__pb2.AggregateResponse.FromString,
+                _registered_method=True)
+        self.GetSpoolStats = channel.unary_unary(
+                '/iot.ReadingService/GetSpoolStats',
+                request_serializer=iot__readings__pb2.SpoolStatsRequest.SerializeToString,
+                response_deserializer=iot__readings__pb2.SpoolStatsResponse.FromString,
+                _registered_method=True)
+        self.ExportReadings = channel.unary_stream(
+                '/iot.ReadingService/ExportReadings',
+                request_serializer=iot__readings__pb2.ExportReadingsRequest.SerializeToString,
+                response_deserializer=iot__readings__pb2.ReadingColumns.FromString,
+                _registered_method=True)
+
+
+class ReadingServiceServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def CreateReading(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetReading(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def UpdateReading(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def BatchUpdateReadings(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def DeleteReading(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ListReadings(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Aggregate(self, request, context):
+        """Bonus (preporučeno): agregacije server-side (brže i “ozbiljnije”)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetSpoolStats(self, request, context):
+        """stanje disk spool-a (SPOOL_ENABLED): koliko readinga ceka upis u bazu
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ExportReadings(self, request, context):
+        """bulk izvoz opsega (backfill): kolonski blokovi rastuce po ts, bez offset paginacije
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_ReadingServiceServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'CreateReading': grpc.unary_unary_rpc_method_handler(
+                    servicer.CreateReading,
+                    request_deserializer=iot__readings__pb2.CreateReadingRequest.FromString,
+                    response_serializer=iot__readings__pb2.ReadingResponse.SerializeToString,
+            ),
+            'GetReading': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetReading,
+                    request_deserializer=iot__readings__pb2.GetReadingRequest.FromString,
+                    response_serializer=iot__readings__pb2.ReadingResponse.SerializeToString,
+            ),
+            'UpdateReading': grpc.unary_unary_rpc_method_handler(
+                    servicer.UpdateReading,
+                    request_deserializer=iot__readings__pb2.UpdateReadingRequest.FromString,
+                    response_serializer=iot__readings__pb2.ReadingResponse.SerializeToString,
+            ),
+            'BatchUpdateReadings': grpc.unary_unary_rpc_method_handler(
+                    servicer.BatchUpdateReadings,
+                    request_deserializer=iot__readings__pb2.BatchUpdateReadingsRequest.FromString,
+                    response_serializer=iot__readings__pb2.BatchUpdateReadingsResponse.SerializeToString,
+            ),
+            'DeleteReading': grpc.unary_unary_rpc_method_handler(
+                    servicer.DeleteReading,
+                    request_deserializer=iot__readings__pb2.DeleteReadingRequest.FromString,
+                    response_serializer=iot__readings__pb2.DeleteReadingResponse.SerializeToString,
+            ),
+            'ListReadings': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListReadings,
+                    request_deserializer=iot__readings__pb2.ListReadingsRequest.FromString,
+                    response_serializer=iot__readings__pb2.ListReadingsResponse.SerializeToString,
+            ),
+            'Aggregate': grpc.unary_unary_rpc_method_handler(
+                    servicer.Aggregate,
+                    request_deserializer=iot__readings__pb2.AggregateRequest.FromString,
+                    response_serializer=iot__readings__pb2.AggregateResponse.SerializeToString,
+            ),
+            'GetSpoolStats': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetSpoolStats,
+                    request_deserializer=iot__readings__pb2.SpoolStatsRequest.FromString,
+                    response_serializer=iot__readings__pb2.SpoolStatsResponse.SerializeToString,
+            ),
+            'ExportReadings': grpc.unary_stream_rpc_method_handler(
+                    servicer.ExportReadings,
+                    request_deserializer=iot__readings__pb2.ExportReadingsRequest.FromString,
+                    response_serializer=iot__readings__pb2.ReadingColumns.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'iot.ReadingService', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('iot.ReadingService', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class ReadingService(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def CreateReading(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/iot.ReadingService/CreateReading',
+            iot__readings__pb2.CreateReadingRequest.SerializeToString,
+            iot__readings__pb2.ReadingResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetReading(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/iot.ReadingService/GetReading',
+            iot__readings__pb2.GetReadingRequest.SerializeToString,
+            iot__readings__pb2.ReadingResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def UpdateReading(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/iot.ReadingService/UpdateReading',
+            iot__readings__pb2.UpdateReadingRequest.SerializeToString,
+            iot__readings__pb2.ReadingResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def BatchUpdateReadings(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/iot.ReadingService/BatchUpdateReadings',
+            iot__readings__pb2.BatchUpdateReadingsRequest.SerializeToString,
+            iot__readings__pb2.BatchUpdateReadingsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def DeleteReading(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/iot.ReadingService/DeleteReading',
+            iot__readings__pb2.DeleteReadingRequest.SerializeToString,
+            iot__readings__pb2.DeleteReadingResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ListReadings(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/iot.ReadingService/ListReadings',
+            iot__readings__pb2.ListReadingsRequest.SerializeToString,
+            iot__readings__pb2.ListReadingsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def Aggregate(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/iot.ReadingService/Aggregate',
+            iot__readings__pb2.AggregateRequest.SerializeToString,
+            iot__readings__pb2.AggregateResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetSpoolStats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/iot.ReadingService/GetSpoolStats',
+            iot__readings__pb2.SpoolStatsRequest.SerializeToString,
+            iot__readings__pb2.SpoolStatsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ExportReadings(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/iot.ReadingService/ExportReadings',
+            iot__readings__pb2.ExportReadingsRequest.SerializeToString,
+            iot__readings__pb2.ReadingColumns.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
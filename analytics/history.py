@@ -0,0 +1,104 @@
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import grpc
+import numpy as np
+from google.protobuf.timestamp_pb2 import Timestamp
+
+GEN_DIR = Path(__file__).resolve().parent / "generated"
+if str(GEN_DIR) not in sys.path:
+    sys.path.insert(0, str(GEN_DIR))
+
+import iot_readings_pb2 as pb2
+import iot_readings_pb2_grpc as pb2_grpc
+
+from features import RAW_FIELDS
+
+# citanje istorije iz datamanager-a: ListReadings za warm start prozora,
+# ExportReadings (kolonski stream) za backfill
+
+PAGE_SIZE = 1000  # max koji ListReadings dozvoljava
+
+
+def ts_from_dt(dt: datetime) -> Timestamp:
+    t = Timestamp()
+    t.FromDatetime(dt)
+    return t
+
+
+def reading_to_dict(r) -> dict:
+    out = {k: getattr(r, k) for k in RAW_FIELDS}
+    out["id"] = r.id
+    out["source_id"] = r.source_id
+    out["ts"] = r.ts.ToDatetime(tzinfo=timezone.utc).isoformat().replace("+00:00", "Z")
+    return out
+
+
+async def recent_readings(target: str, lookback_s: float, per_source: int, max_rows: int) -> dict:
+    """
+    Poslednjih `per_source` readinga po izvoru iz poslednjih lookback_s sekundi,
+    source_id -> lista dict-ova rastuce po ts. Stranice idu od najnovijih ka starijim.
+    """
+    from_dt = datetime.now(timezone.utc) - timedelta(seconds=lookback_s)
+    by_source: dict[int, list] = {}
+    fetched = 0
+    async with grpc.aio.insecure_channel(target) as channel:
+        stub = pb2_grpc.ReadingServiceStub(channel)
+        while fetched < max_rows:
+            req = pb2.ListReadingsRequest(
+                from_ts=ts_from_dt(from_dt),
+                limit=min(PAGE_SIZE, max_rows - fetched),
+                offset=fetched,
+                order="desc",
+            )
+            resp = await stub.ListReadings(req, timeout=30.0)
+            fetched += len(resp.readings)
+            for r in resp.readings:
+                rows = by_source.setdefault(r.source_id, [])
+                if len(rows) < per_source:
+                    rows.append(reading_to_dict(r))
+            if len(resp.readings) < req.limit:
+                break
+    return {sid: rows[::-1] for sid, rows in by_source.items()}
+
+
+async def export_blocks(target: str, from_dt: datetime | None, to_dt: datetime | None, batch_size: int = 50000):
+    """
+    ExportReadings blok po blok (memorija = jedan blok): dict sa id (lista), source_id, ts_ms,
+    values (N x 4, RAW_FIELDS) i occupancy. Redovi su rastuce po ts.
+    """
+    req = pb2.ExportReadingsRequest(batch_size=batch_size)
+    if from_dt is not None:
+        req.from_ts.CopyFrom(ts_from_dt(from_dt))
+    if to_dt is not None:
+        req.to_ts.CopyFrom(ts_from_dt(to_dt))
+
+    # veliki blokovi: podigni limit poruke (default 4MB)
+    opts = [("grpc.max_receive_message_length", 256 * 1024 * 1024)]
+    async with grpc.aio.insecure_channel(target, options=opts) as channel:
+        stub = pb2_grpc.ReadingServiceStub(channel)
+        async for cols in stub.ExportReadings(req):
+            yield {
+                "id": list(cols.id),
+                "source_id": np.array(cols.source_id, dtype=np.int64),
+                "ts_ms": np.array(cols.ts_unix_ms, dtype=np.int64),
+                "values": np.column_stack([np.array(getattr(cols, k), dtype=float) for k in RAW_FIELDS]),
+                "occupancy": np.array(cols.occupancy, dtype=np.int8),
+            }
+
+
+async def export_columns(target: str, from_dt: datetime | None, to_dt: datetime | None, batch_size: int = 50000) -> dict:
+    """Ceo opseg preko ExportReadings kao numpy kolone (spojeni blokovi iz export_blocks)."""
+    blocks = [b async for b in export_blocks(target, from_dt, to_dt, batch_size)]
+    if not blocks:
+        return {
+            "id": [],
+            "source_id": np.empty(0, np.int64),
+            "ts_ms": np.empty(0, np.int64),
+            "values": np.empty((0, len(RAW_FIELDS))),
+            "occupancy": np.empty(0, np.int8),
+        }
+    out = {k: np.concatenate([b[k] for b in blocks]) for k in ("source_id", "ts_ms", "values", "occupancy")}
+    out["id"] = [i for b in blocks for i in b["id"]]
+    return out
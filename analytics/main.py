@@ -1,11 +1,18 @@
-import os, json, asyncio
-from collections import deque
+import os, json, asyncio, signal, time
 from datetime import datetime, timezone
 
 import httpx
+import numpy as np
 import paho.mqtt.client as mqtt
 from nats.aio.client import Client as NATS
 
+import checkpoint
+import history
+from features import FEATURE_NAMES, WindowStore, parse_resolutions
+from gate import ChangeGate, parse_abs_eps
+from pipeline import BatchedPublisher, IngestQueue, LagTracker, PartitionedPool
+from scorer import LocalModel
+
 MQTT_HOST = os.getenv("MQTT_HOST", "mosquitto")
 MQTT_PORT = int(os.getenv("MQTT_PORT", "1883"))
 MQTT_TOPIC = os.getenv("MQTT_TOPIC_READINGS", "iot/readings")
@@ -15,67 +22,124 @@ NATS_URL = os.getenv("NATS_URL", "nats://nats:4222")
 NATS_SUBJECT = os.getenv("NATS_SUBJECT", "iot.predictions")
 
 WINDOW = int(os.getenv("WINDOW_SIZE", "20"))  # poslednjih N reading-a po source_id
+# izvor bez readinga duze od ovoga se izbacuje iz memorije (0 = nikad)
+WINDOW_TTL_S = float(os.getenv("WINDOW_TTL_S", "3600"))
+
+# dodatni prozori (broj readinga ili vreme po ts, npr. 5m) racunati u istom prolazu po izvoru;
+# vektori svih rezolucija se objavljuju na FEATURES_SUBJECT za druge potrosace (prazno = iskljuceno)
+FEATURE_WINDOWS = os.getenv("FEATURE_WINDOWS", "5,20,100,5m")
+FEATURES_SUBJECT = os.getenv("FEATURES_SUBJECT", "iot.features")
+FEATURE_MAX_READINGS = int(os.getenv("FEATURE_MAX_READINGS", "10000"))  # max bafer po izvoru (vremenski prozori)
+
+# remote (default): POST na MLAAS_URL po prozoru; local: isti linearni artefakt se boduje u procesu,
+# vektorski za sve izvore ciji je prozor spreman u istom tick-u
+SCORING_MODE = os.getenv("SCORING_MODE", "remote").lower()
+LOCAL_MODEL_DIR = os.getenv("LOCAL_MODEL_DIR", "/models")
+MLAAS_HEALTH_URL = os.getenv("MLAAS_HEALTH_URL", "http://mlaas:8000/health")
+MODEL_CHECK_INTERVAL_S = float(os.getenv("MODEL_CHECK_INTERVAL_S", "30"))
+TICK_MAX = int(os.getenv("TICK_MAX", "1000"))  # max poruka obradjenih u jednom tick-u
+
+# remote rezim: WORKERS paralelnih workera (particionisano po source_id), najvise MAX_INFLIGHT
+# istovremenih POST-ova ka MLaaS-u; NATS flush periodicno umesto posle svake poruke
+WORKERS = int(os.getenv("WORKERS", "4"))
+MAX_INFLIGHT = int(os.getenv("MAX_INFLIGHT", "64"))
+WORKER_QUEUE_MAX = int(os.getenv("WORKER_QUEUE_MAX", "1000"))
+NATS_FLUSH_INTERVAL_MS = float(os.getenv("NATS_FLUSH_INTERVAL_MS", "50"))
+
+# ograniceni ulazni red: block | drop_oldest | coalesce_latest (vidi IngestQueue)
+INGEST_QUEUE_MAX = int(os.getenv("INGEST_QUEUE_MAX", "10000"))
+INGEST_QUEUE_POLICY = os.getenv("INGEST_QUEUE_POLICY", "drop_oldest").lower()
+# reading stariji od ovoga (sada - ts) ulazi u prozor ali se ne boduje (0 = iskljuceno)
+MAX_READING_AGE_S = float(os.getenv("MAX_READING_AGE_S", "0"))
+STATS_INTERVAL_S = float(os.getenv("STATS_INTERVAL_S", "10"))
+NATS_STATS_SUBJECT = os.getenv("NATS_STATS_SUBJECT", "")  # prazno = stats samo u logu
+
+# warm start prozora: checkpoint fajl, a ako ga nema (ili je star) istorija iz datamanager-a
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "/var/lib/analytics/windows.json")  # prazno = bez checkpoint-a
+CHECKPOINT_INTERVAL_S = float(os.getenv("CHECKPOINT_INTERVAL_S", "30"))
+CHECKPOINT_MAX_AGE_S = float(os.getenv("CHECKPOINT_MAX_AGE_S", "3600"))
+DATAMANAGER_GRPC_URL = os.getenv("DATAMANAGER_GRPC_URL", "datamanager:50051")  # prazno = bez warm start-a
+WARM_START_LOOKBACK_S = float(os.getenv("WARM_START_LOOKBACK_S", "3600"))
+WARM_START_MAX_ROWS = int(os.getenv("WARM_START_MAX_ROWS", "100000"))
+
+# change-driven inference: model se zove samo kad se feature-i promene ili predikcija zastari
+SKIP_UNCHANGED = os.getenv("SKIP_UNCHANGED", "false").lower() in ("1", "true", "yes", "y")
+SKIP_REL_EPS = float(os.getenv("SKIP_REL_EPS", "0.02"))
+SKIP_ABS_EPS = os.getenv("SKIP_ABS_EPS", "temp=0.05,hum=0.1,light=5,co2=5")
+SKIP_MAX_STALENESS_S = float(os.getenv("SKIP_MAX_STALENESS_S", "300"))
+SKIP_ACTION = os.getenv("SKIP_ACTION", "republish").lower()  # republish | suppress
 
 def iso_z(dt: datetime) -> str:
     return dt.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
 
-def compute_features(window):
-    # window: list[reading]
-    def arr(key):
-        return [float(x.get(key) or 0.0) for x in window]
-
-    import statistics as st
-
-    def mean_std(vals):
-        if len(vals) < 2:
-            return (vals[-1] if vals else 0.0, 0.0)
-        return (st.mean(vals), st.pstdev(vals))
-
-    t = arr("temperature_c")
-    h = arr("humidity_percent")
-    l = arr("light_lux")
-    c = arr("co2_ppm")
-
-    # racunam srednju vresnost za poslednjih 20 i to mi je poruka
-    t_mean, t_std = mean_std(t)
-    h_mean, h_std = mean_std(h)
-    l_mean, l_std = mean_std(l)
-    c_mean, c_std = mean_std(c)
-
-    last = window[-1]
-    return {
-        "temp_mean": t_mean, "temp_std": t_std,
-        "hum_mean": h_mean, "hum_std": h_std,
-        "light_mean": l_mean, "light_std": l_std,
-        "co2_mean": c_mean, "co2_std": c_std,
-        "temp_last": float(last.get("temperature_c") or 0.0),
-        "hum_last": float(last.get("humidity_percent") or 0.0),
-        "light_last": float(last.get("light_lux") or 0.0),
-        "co2_last": float(last.get("co2_ppm") or 0.0),
-    }
+async def warm_start(windows: WindowStore) -> None:
+    now = time.monotonic()
+    if CHECKPOINT_PATH:
+        state = checkpoint.load(CHECKPOINT_PATH, CHECKPOINT_MAX_AGE_S)
+        if state:
+            n = windows.restore(state, now)
+            print(f"[analytics] restored {n} windows from checkpoint {CHECKPOINT_PATH}")
+            return
+    if not DATAMANAGER_GRPC_URL:
+        return
+    try:
+        hist = await history.recent_readings(DATAMANAGER_GRPC_URL, WARM_START_LOOKBACK_S, windows.size, WARM_START_MAX_ROWS)
+    except Exception as e:
+        print(f"[analytics] warm start from datamanager failed: {e}")
+        return
+    rows = 0
+    for source_id, readings in hist.items():
+        for r in readings:
+            windows.push(source_id, r, now)
+        rows += len(readings)
+    full = sum(1 for w in windows.windows.values() if w.full)
+    print(f"[analytics] warm start from datamanager: {rows} readings, {len(hist)} sources, {full} full windows")
+
+
+async def save_checkpoint(windows: WindowStore) -> None:
+    state = windows.state()  # snapshot u petlji, upis u thread-u
+    try:
+        await asyncio.to_thread(checkpoint.save, CHECKPOINT_PATH, windows.size, state)
+    except Exception as e:
+        print(f"[analytics] checkpoint save failed: {e}")
+
 
 async def main():
     loop = asyncio.get_running_loop()
-    q: asyncio.Queue[bytes] = asyncio.Queue()
+    # SIGTERM (docker stop) -> cancel, pa finally snimi checkpoint
+    loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    q = IngestQueue(loop, INGEST_QUEUE_MAX, INGEST_QUEUE_POLICY)
+    lag = LagTracker()
+    stale = 0
+    gate = ChangeGate(SKIP_REL_EPS, parse_abs_eps(SKIP_ABS_EPS), SKIP_MAX_STALENESS_S, SKIP_ACTION) if SKIP_UNCHANGED else None
 
     # NATS connect
     nc = NATS()
     await nc.connect(servers=[NATS_URL])
 
-    # HTTP client
-    http = httpx.AsyncClient(timeout=10.0)
+    # HTTP client (konekcija koliko i dozvoljenih zahteva u letu)
+    http = httpx.AsyncClient(
+        timeout=10.0,
+        limits=httpx.Limits(max_connections=MAX_INFLIGHT, max_keepalive_connections=MAX_INFLIGHT),
+    )
+    inflight = asyncio.Semaphore(MAX_INFLIGHT)
+
+    publisher = BatchedPublisher(nc, NATS_SUBJECT, NATS_FLUSH_INTERVAL_MS / 1000.0)
+    resolutions = parse_resolutions(FEATURE_WINDOWS) if FEATURES_SUBJECT else []
+    feature_publisher = BatchedPublisher(nc, FEATURES_SUBJECT, NATS_FLUSH_INTERVAL_MS / 1000.0) if resolutions else None
 
-    # global sliding window (poslednjih WINDOW reading-a ukupno)
-    window = deque(maxlen=WINDOW)
+    # sliding window po source_id (poslednjih WINDOW reading-a tog izvora)
+    windows = WindowStore(WINDOW, WINDOW_TTL_S, resolutions, FEATURE_MAX_READINGS)
+    await warm_start(windows)
 
     # MQTT callbacks (paho radi u svom thread-u)
     def on_connect(client, userdata, flags, rc):
         print(f"[analytics] mqtt connected rc={rc}, subscribing {MQTT_TOPIC}")
         client.subscribe(MQTT_TOPIC)
 
-    # ubacuje poruku u asyncio.Queue
+    # ubacuje poruku u ograniceni ulazni red
     def on_message(client, userdata, msg):
-        loop.call_soon_threadsafe(q.put_nowait, msg.payload)
+        q.put_threadsafe(msg.payload)
 
     m = mqtt.Client()
     m.on_connect = on_connect
@@ -84,63 +148,229 @@ async def main():
     m.loop_start()
 
     print(f"[analytics] nats connected {NATS_URL}, subject={NATS_SUBJECT}")
-    print(f"[analytics] mlaas url={MLAAS_URL}, window={WINDOW}")
+    if resolutions:
+        print(f"[analytics] feature windows={','.join(r[0] for r in resolutions)} subject={FEATURES_SUBJECT}")
+    print(f"[analytics] mlaas url={MLAAS_URL}, window={WINDOW}, ttl={WINDOW_TTL_S}s, scoring={SCORING_MODE}")
+    print(f"[analytics] workers={WORKERS} max_inflight={MAX_INFLIGHT} nats_flush_ms={NATS_FLUSH_INTERVAL_MS}")
+    print(f"[analytics] ingest queue max={INGEST_QUEUE_MAX} policy={INGEST_QUEUE_POLICY} max_age_s={MAX_READING_AGE_S}")
 
-    try:
-        while True:
-            payload = await q.get()
-            env = json.loads(payload.decode("utf-8"))
+    local = None
+    sync_task = None
+    if SCORING_MODE == "local":
+        local = LocalModel(LOCAL_MODEL_DIR, FEATURE_NAMES)
+        await local.sync(http, MLAAS_HEALTH_URL)
+        if local.scorer is None:
+            raise RuntimeError(f"no linear model found in {LOCAL_MODEL_DIR}")
 
-            action = env.get("action")
-            if action not in ("created", "updated"):
-                continue
+        async def model_sync():
+            while True:
+                await asyncio.sleep(MODEL_CHECK_INTERVAL_S)
+                try:
+                    await local.sync(http, MLAAS_HEALTH_URL)
+                except Exception as e:
+                    # task ne sme da umre: bez njega analytics vise ne prati verzije MLaaS-a
+                    print(f"[analytics] model sync failed: {e}")
+
+        sync_task = asyncio.create_task(model_sync())
+
+    async def score_remote(item):
+        rid, source_id, ts, feats = item
+        req = {
+            "reading_id": rid,
+            "source_id": source_id,
+            "ts": ts,
+            "features": feats,
+        }
+        try:
+            async with inflight:
+                resp = await http.post(MLAAS_URL, json=req)
+            resp.raise_for_status()
+            return resp.json()
+        except Exception as e:
+            print(f"[analytics] mlaas error: {e}")
+            return None
+
+    async def publish(pred, feats: dict | None = None, reused: bool = False) -> None:
+        if gate is not None and not reused:
+            w = windows.windows.get(pred["source_id"])
+            if w is not None:
+                gate.record(w, feats, pred, time.monotonic())
+        out = {
+            "emitted_at": iso_z(datetime.now(timezone.utc)),
+            "reading_id": pred["reading_id"],
+            "source_id": pred["source_id"],
+            "ts": pred["ts"],
+            "prediction": pred["prediction"],
+            "probability": pred["probability"],
+            "model_version": pred["model_version"],
+            "window_size": WINDOW,
+        }
+        if reused:
+            out["reused"] = True  # poslednja predikcija izvora, model nije pozvan
+        await publisher.publish(out)
+        print(f"[analytics] published prediction rid={out['reading_id']} p={out['probability']:.3f}")
+
+    async def publish_reused(item) -> None:
+        rid, source_id, ts, _ = item
+        w = windows.windows.get(source_id)
+        if w is not None and w.last_pred is not None:
+            await publish({**w.last_pred, "reading_id": rid, "ts": ts}, reused=True)
 
-            r = env.get("reading") or {}
-            source_id = int(r.get("source_id", 0))
-            rid = r.get("id")
-            ts = r.get("ts")
+    async def no_score():
+        return None
 
-            window.append(r)
+    async def handle_remote(items) -> None:
+        # POST-ovi iz jednog batch-a idu paralelno, objava redom kojim su stigli
+        preds = await asyncio.gather(*(score_remote(it) if it[3] is not None else no_score() for it in items))
+        for item, pred in zip(items, preds):
+            if item[3] is None:
+                await publish_reused(item)
+            elif pred is not None:
+                await publish(pred, item[3])
 
-            if len(window) < WINDOW:
-                continue  # još nema dovoljno za prozor
+    def stats() -> dict:
+        return {
+            "queue_depth": q.qsize(),
+            "worker_depth": pool.depth() if pool is not None else 0,
+            "dropped": q.dropped,
+            "coalesced": q.coalesced,
+            "stale_skipped": stale,
+            "inference_skipped": gate.skipped if gate is not None else 0,
+            "inference_scored": gate.scored if gate is not None else 0,
+            "published": publisher.published,
+            "features_published": feature_publisher.published if feature_publisher is not None else 0,
+            "windows": len(windows),
+            **lag.reset(),
+        }
 
-            feats = compute_features(list(window))
+    async def report_stats():
+        while True:
+            await asyncio.sleep(STATS_INTERVAL_S)
+            st = stats()
+            print("[analytics] stats " + " ".join(f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}" for k, v in st.items()))
+            if NATS_STATS_SUBJECT:
+                try:
+                    await nc.publish(NATS_STATS_SUBJECT, json.dumps(st).encode("utf-8"))
+                except Exception as e:
+                    print(f"[analytics] stats publish error: {e}")
+
+    stats_task = asyncio.create_task(report_stats())
+
+    async def checkpoint_loop():
+        while True:
+            await asyncio.sleep(CHECKPOINT_INTERVAL_S)
+            await save_checkpoint(windows)
+
+    checkpoint_task = asyncio.create_task(checkpoint_loop()) if CHECKPOINT_PATH else None
+
+    pool = None
+    if local is None:
+        pool = PartitionedPool(WORKERS, handle_remote, WORKER_QUEUE_MAX, max(1, MAX_INFLIGHT // max(1, WORKERS)))
+        pool.start()
+    publisher.start()
+    if feature_publisher is not None:
+        feature_publisher.start()
 
-            req = {
+    def score_local(ready) -> list:
+        x = np.array([[feats[n] for n in FEATURE_NAMES] for _, _, _, feats in ready], dtype=float)
+        probs = local.score(x)
+        threshold = local.scorer.threshold
+        return [
+            {
                 "reading_id": rid,
                 "source_id": source_id,
                 "ts": ts,
-                "features": feats,
+                "prediction": int(p >= threshold),
+                "probability": p,
+                "model_version": local.version,
             }
+            for (rid, source_id, ts, _), p in zip(ready, probs.tolist())
+        ]
 
-            try:
-                resp = await http.post(MLAAS_URL, json=req)
-                resp.raise_for_status()
-                pred = resp.json()
-            except Exception as e:
-                print(f"[analytics] mlaas error: {e}")
-                continue
+    try:
+        while True:
+            # tick: sve poruke koje su vec stigle obradjuju se zajedno
+            batch = [await q.get()]
+            while len(batch) < TICK_MAX and not q.empty():
+                batch.append(q.get_nowait())
 
-            out = {
-                "emitted_at": iso_z(datetime.now(timezone.utc)),
-                "reading_id": pred["reading_id"],
-                "source_id": pred["source_id"],
-                "ts": pred["ts"],
-                "prediction": pred["prediction"],
-                "probability": pred["probability"],
-                "model_version": pred["model_version"],
-                "window_size": WINDOW,
-            }
+            ready = []  # (rid, source_id, ts, feats) za prozore koji su spremni
+            now = time.monotonic()
+            wall = datetime.now(timezone.utc)
+            for env in batch:
+                action = env.get("action")
+                if action not in ("created", "updated"):
+                    continue
 
-            await nc.publish(NATS_SUBJECT, json.dumps(out).encode("utf-8"))
-            await nc.flush()
-            print(f"[analytics] published prediction rid={rid} p={out['probability']:.3f}")
+                r = env.get("reading") or {}
+                source_id = int(r.get("source_id", 0))
+                rid = r.get("id")
+                ts = r.get("ts")
+
+                window = windows.push(source_id, r, now)
+                age = lag.observe(ts, wall)
+                fresh = not (MAX_READING_AGE_S > 0 and age > MAX_READING_AGE_S)
+
+                if feature_publisher is not None and fresh:
+                    await feature_publisher.publish({
+                        "emitted_at": iso_z(wall),
+                        "reading_id": rid,
+                        "source_id": source_id,
+                        "ts": ts,
+                        "windows": window.multi.features(),
+                    })
+
+                if not window.full:
+                    continue  # još nema dovoljno za prozor
+
+                if not fresh:
+                    stale += 1  # zastareo: prozor je azuriran, ali predikcija vise nikome ne treba
+                    continue
+
+                feats = window.features()
+                if gate is not None and not gate.should_score(window, feats, now):
+                    if gate.action == "republish":
+                        # feats=None: worker objavljuje poslednju predikciju izvora, istim redom
+                        ready.append((rid, source_id, ts, None))
+                    continue
+
+                ready.append((rid, source_id, ts, feats))
+
+            if not ready:
+                continue
+
+            if local is not None:
+                scored = [it for it in ready if it[3] is not None]
+                preds = iter(score_local(scored) if scored else ())
+                for item in ready:
+                    if item[3] is None:
+                        await publish_reused(item)
+                    else:
+                        await publish(next(preds), item[3])
+            else:
+                for item in ready:
+                    await pool.submit(item[1], item)
 
     finally:
+        if sync_task is not None:
+            sync_task.cancel()
+        stats_task.cancel()
+        if checkpoint_task is not None:
+            checkpoint_task.cancel()
+            await save_checkpoint(windows)
+            print(f"[analytics] checkpoint saved ({len(windows)} windows)")
+        q.close()
         m.loop_stop()
+        if pool is not None:
+            await pool.stop()
+        await publisher.close()
+        if feature_publisher is not None:
+            await feature_publisher.close()
         await http.aclose()
         await nc.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        asyncio.run(main())
+    except asyncio.CancelledError:
+        pass
\ No newline at end of file
@@ -0,0 +1,200 @@
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+# konkurentna obrada: hash(source_id) -> uvek isti worker, pa predikcije jednog izvora
+# izlaze redom, a razliciti izvori idu paralelno (ogranicenje je kapacitet MLaaS-a)
+
+
+class PartitionedPool:
+    def __init__(self, n: int, handle_batch, queue_max: int, batch_max: int):
+        self.n = max(1, n)
+        self.handle_batch = handle_batch  # async (list) -> None, redosled u listi = redosled dolaska
+        self.batch_max = max(1, batch_max)
+        self.queues = [asyncio.Queue(maxsize=max(1, queue_max)) for _ in range(self.n)]
+        self._tasks = []
+
+    def partition(self, key: int) -> int:
+        return hash(key) % self.n
+
+    async def submit(self, key: int, item) -> None:
+        # pun red workera -> ceka (backpressure prema ulaznoj petlji)
+        await self.queues[self.partition(key)].put(item)
+
+    def depth(self) -> int:
+        return sum(q.qsize() for q in self.queues)
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker(q)) for q in self.queues]
+
+    async def stop(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _worker(self, q: asyncio.Queue) -> None:
+        while True:
+            items = [await q.get()]
+            while len(items) < self.batch_max and not q.empty():
+                items.append(q.get_nowait())
+            try:
+                await self.handle_batch(items)
+            except Exception as e:
+                print(f"[analytics] worker error: {e}")
+
+
+class BatchedPublisher:
+    """
+    nc.publish samo upisuje u bafer klijenta; nc.flush (PING/PONG do servera) se radi
+    periodicno umesto posle svake poruke.
+    """
+
+    def __init__(self, nc, subject: str, flush_interval_s: float):
+        self.nc = nc
+        self.subject = subject
+        self.flush_interval_s = flush_interval_s
+        self.pending = 0
+        self.published = 0
+        self._task = None
+
+    async def publish(self, msg: dict) -> None:
+        await self.nc.publish(self.subject, json.dumps(msg).encode("utf-8"))
+        self.pending += 1
+        self.published += 1
+
+    async def flush(self) -> None:
+        if self.pending:
+            self.pending = 0
+            await self.nc.flush()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_s)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[analytics] nats flush error: {e}")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+
+
+class IngestQueue:
+    """
+    Ograniceni ulazni red izmedju paho thread-a i asyncio petlje. Politike kad je pun:
+      block           - paho thread ceka mesto (backpressure ka brokeru)
+      drop_oldest     - izbacuje se najstarija poruka
+      coalesce_latest - po source_id ostaje samo poslednji reading (prozor preskace medjuvrednosti)
+    """
+
+    POLICIES = ("block", "drop_oldest", "coalesce_latest")
+
+    def __init__(self, loop, maxsize: int, policy: str):
+        if policy not in self.POLICIES:
+            raise ValueError(f"unknown queue policy {policy!r}, expected one of {self.POLICIES}")
+        self.loop = loop
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self._items: "OrderedDict[object, dict]" = OrderedDict()
+        self._nonempty = asyncio.Event()
+        self._slots = threading.Semaphore(self.maxsize) if policy == "block" else None
+        self.dropped = 0
+        self.coalesced = 0
+        self._closed = False
+
+    def close(self) -> None:
+        # odblokira paho thread (block politika) da bi loop_stop mogao da ga zavrsi
+        self._closed = True
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def put_threadsafe(self, payload: bytes) -> None:
+        """Poziva se iz paho thread-a (on_message)."""
+        if self._slots is not None:
+            # blokira paho thread dok consumer ne oslobodi mesto
+            while not self._slots.acquire(timeout=0.5):
+                if self._closed:
+                    return
+        self.loop.call_soon_threadsafe(self._put, payload)
+
+    def _put(self, payload: bytes) -> None:
+        try:
+            env = json.loads(payload.decode("utf-8"))
+        except Exception as e:
+            print(f"[analytics] bad message: {e}")
+            if self._slots is not None:
+                self._slots.release()
+            return
+
+        key = object()  # jedinstven kljuc = bez spajanja
+        if self.policy == "coalesce_latest":
+            r = env.get("reading") or {}
+            if env.get("action") in ("created", "updated") and "source_id" in r:
+                key = int(r["source_id"])
+                if key in self._items:
+                    self._items[key] = env  # mesto u redu ostaje, vrednost je najnovija
+                    self.coalesced += 1
+                    return
+
+        if self.policy != "block" and len(self._items) >= self.maxsize:
+            self._items.popitem(last=False)
+            self.dropped += 1
+        self._items[key] = env
+        self._nonempty.set()
+
+    def get_nowait(self) -> dict:
+        _, env = self._items.popitem(last=False)
+        if self._slots is not None:
+            self._slots.release()
+        return env
+
+    async def get(self) -> dict:
+        while not self._items:
+            self._nonempty.clear()
+            await self._nonempty.wait()
+        return self.get_nowait()
+
+
+class LagTracker:
+    """Kasnjenje obrade: sada - ts readinga (s), zbirno za interval izvestaja."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def observe(self, ts: str, now: datetime) -> float:
+        try:
+            lag = (now - datetime.fromisoformat(ts)).total_seconds()
+        except (TypeError, ValueError):
+            return 0.0
+        self.count += 1
+        self.total += lag
+        self.max = max(self.max, lag)
+        self.last = lag
+        return lag
+
+    def reset(self) -> dict:
+        out = {
+            "lag_avg_s": (self.total / self.count) if self.count else 0.0,
+            "lag_max_s": self.max,
+            "lag_last_s": self.last,
+        }
+        self.count, self.total, self.max = 0, 0.0, 0.0
+        return out
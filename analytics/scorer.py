@@ -0,0 +1,138 @@
+import json
+import os
+
+import numpy as np
+
+# lokalno bodovanje (SCORING_MODE=local): isti linearni artefakt koji MLaaS koristi
+# (model.linear.json iz mlaas/train.py), bez HTTP round trip-a po prozoru
+
+META_FILE = "model.meta.json"
+LINEAR_FILE = "model.linear.json"
+
+
+class LinearScorer:
+    def __init__(self, weights, bias: float, feature_names, version: str, threshold: float = 0.5):
+        self.weights = np.asarray(weights, dtype=float)
+        self.bias = float(bias)
+        self.feature_names = list(feature_names)
+        self.version = version
+        self.threshold = threshold
+        if self.weights.shape != (len(self.feature_names),):
+            raise ValueError("weights and feature_names length mismatch")
+
+    @classmethod
+    def load(cls, path: str) -> "LinearScorer":
+        with open(path, "r", encoding="utf-8") as f:
+            art = json.load(f)
+        if art.get("format") != "linear-logistic-v1":
+            raise ValueError(f"Unsupported linear model format: {art.get('format')}")
+        return cls(
+            weights=art["weights"],
+            bias=art["bias"],
+            feature_names=art["feature_names"],
+            version=str(art.get("version", "")),
+            threshold=float(art.get("threshold", 0.5)),
+        )
+
+    def predict_proba1(self, x: np.ndarray) -> np.ndarray:
+        """x: N x 12 -> P(class=1) po redu."""
+        z = x @ self.weights + self.bias
+        return 0.5 * (1.0 + np.tanh(0.5 * z))  # sigmoid bez overflow-a
+
+
+def _read_meta(d: str) -> dict:
+    try:
+        with open(os.path.join(d, META_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def find_versions(model_dir: str) -> dict:
+    """
+    verzija -> (direktorijum, trained_at). model_dir je ili MLaaS registar (poddirektorijum
+    po verziji) ili jedan direktorijum sa model.linear.json.
+    """
+    dirs = [model_dir]
+    try:
+        dirs += [e.path for e in os.scandir(model_dir) if e.is_dir()]
+    except FileNotFoundError:
+        return {}
+    out = {}
+    for d in dirs:
+        if not os.path.exists(os.path.join(d, LINEAR_FILE)):
+            continue
+        meta = _read_meta(d)
+        if not meta and d != model_dir:
+            continue  # verzija jos nije objavljena (meta se upisuje poslednja)
+        version = str(meta.get("model_version") or LinearScorer.load(os.path.join(d, LINEAR_FILE)).version)
+        trained_at = str(meta.get("trained_at", ""))
+        if version not in out or trained_at > out[version][1]:
+            out[version] = (d, trained_at)
+    return out
+
+
+class LocalModel:
+    """Lokalni model koji prati verziju koju MLaaS prijavljuje na /health."""
+
+    def __init__(self, model_dir: str, feature_names):
+        self.model_dir = model_dir
+        self.feature_names = list(feature_names)
+        self.scorer = None
+
+    @property
+    def version(self) -> str:
+        return self.scorer.version if self.scorer is not None else ""
+
+    def load(self, version: str = "") -> bool:
+        """Ucita datu verziju (prazno = najnoviji trained_at); False ako je nema u model_dir."""
+        versions = find_versions(self.model_dir)
+        if not versions:
+            return False
+        if not version:
+            version = max(versions, key=lambda v: versions[v][1])
+        if version not in versions:
+            return False
+        d = versions[version][0]
+        scorer = LinearScorer.load(os.path.join(d, LINEAR_FILE))
+        if scorer.feature_names != self.feature_names:
+            raise ValueError(f"feature order mismatch: {scorer.feature_names}")
+        scorer.version = version
+        self.scorer = scorer
+        print(f"[analytics] local model version={version} loaded from {d}")
+        return True
+
+    def try_load(self, version: str = "") -> bool:
+        """load, ali neispravan/poluiskopiran fajl samo loguje i ostavlja trenutni scorer."""
+        try:
+            return self.load(version)
+        except Exception as e:
+            print(f"[analytics] local model load failed (version={version or 'latest'}): {e}; "
+                  f"keeping local version={self.version or '-'}")
+            return False
+
+    async def sync(self, http, health_url: str) -> None:
+        """Poravna lokalnu verziju sa default verzijom MLaaS-a (GET /health)."""
+        try:
+            resp = await http.get(health_url)
+            resp.raise_for_status()
+            remote = str(resp.json().get("model_version") or "")
+        except Exception as e:
+            print(f"[analytics] mlaas health check failed: {e}")
+            if self.scorer is None:
+                self.try_load()
+            return
+        if remote == self.version:
+            return
+        if not self.try_load(remote):
+            print(
+                f"[analytics] mlaas serves model_version={remote} which is not usable in {self.model_dir}; "
+                f"keeping local version={self.version or '-'}"
+            )
+            if self.scorer is None:
+                self.try_load()
+
+    def score(self, x: np.ndarray) -> np.ndarray:
+        if self.scorer is None:
+            raise RuntimeError("local model not loaded")
+        return self.scorer.predict_proba1(x)
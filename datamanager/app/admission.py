@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import grpc
+
+# admission control: ogranicava broj istovremenih RPC-ova (da jedan izvor/backfill ne pojede
+# ceo DB pool) i brzinu upisa po source_id; visak ceka u ogranicenom redu ili dobija
+# RESOURCE_EXHAUSTED sa "retry-after-ms" u trailing metadata
+
+RETRY_AFTER_KEY = "retry-after-ms"
+MAX_SOURCE_BUCKETS = 10_000
+
+
+def parse_rpc_limits(spec: str) -> dict[str, int]:
+    # "Aggregate=4,ListReadings=8" -> {"Aggregate": 4, "ListReadings": 8}
+    out: dict[str, int] = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, value = part.partition("=")
+        out[name.strip()] = int(value)
+    return out
+
+
+class ConcurrencyLimiter:
+    def __init__(self, name: str, limit: int, queue_max: int):
+        self.name = name
+        self.limit = limit
+        self.queue_max = queue_max
+        self.sem = asyncio.Semaphore(limit) if limit > 0 else None
+        self.waiting = 0
+        self.avg_service_s = 0.01  # EWMA trajanja, za retry-after procenu
+
+    async def acquire(self) -> bool:
+        if self.sem is None:
+            return True
+        if self.sem.locked() and self.waiting >= self.queue_max:
+            return False
+        self.waiting += 1
+        try:
+            await self.sem.acquire()
+        finally:
+            self.waiting -= 1
+        return True
+
+    def release(self, elapsed_s: float | None) -> None:
+        if self.sem is None:
+            return
+        if elapsed_s is not None:
+            self.avg_service_s = 0.9 * self.avg_service_s + 0.1 * elapsed_s
+        self.sem.release()
+
+    def retry_after(self) -> float:
+        # koliko otprilike treba da se red isprazni
+        return self.avg_service_s * (self.waiting + 1) / max(self.limit, 1)
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated = now
+
+    def take(self, rate: float, burst: int, now: float) -> float:
+        """Vraca 0 ako je token uzet, inace broj sekundi do sledeceg tokena."""
+        self.tokens = min(float(burst), self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / rate
+
+
+class Admission:
+    def __init__(
+        self,
+        read_limit: int,
+        write_limit: int,
+        rpc_limits: dict[str, int],
+        queue_max: int,
+        source_rate: float,
+        source_burst: int,
+    ):
+        self.classes = {
+            "read": ConcurrencyLimiter("read", read_limit, queue_max),
+            "write": ConcurrencyLimiter("write", write_limit, queue_max),
+        }
+        self.rpcs = {name: ConcurrencyLimiter(name, n, queue_max) for name, n in rpc_limits.items()}
+        self.source_rate = source_rate
+        self.source_burst = max(source_burst, 1)
+        self._buckets: dict[int, TokenBucket] = {}
+
+    @asynccontextmanager
+    async def slot(self, rpc: str, kind: str, context: grpc.aio.ServicerContext, timed: bool = True):
+        # timed=False: dugi stream-ovi (ExportReadings) ne ulaze u EWMA za retry-after
+        limiters = [lim for lim in (self.rpcs.get(rpc), self.classes[kind]) if lim is not None]
+        acquired: list[ConcurrencyLimiter] = []
+        t0 = time.perf_counter()
+        try:
+            for lim in limiters:
+                if not await lim.acquire():
+                    await _reject(context, f"{rpc}: too many concurrent {lim.name} requests", lim.retry_after())
+                acquired.append(lim)
+            t0 = time.perf_counter()
+            yield
+        finally:
+            elapsed = (time.perf_counter() - t0) if timed else None
+            for lim in reversed(acquired):
+                lim.release(elapsed)
+
+    async def check_rate(self, source_id: int, context: grpc.aio.ServicerContext) -> None:
+        if self.source_rate <= 0:
+            return
+        now = time.monotonic()
+        b = self._buckets.get(source_id)
+        if b is None:
+            if len(self._buckets) >= MAX_SOURCE_BUCKETS:
+                self._evict_idle(now)
+            b = self._buckets[source_id] = TokenBucket(float(self.source_burst), now)
+        wait = b.take(self.source_rate, self.source_burst, now)
+        if wait > 0:
+            await _reject(context, f"rate limit exceeded for source_id={source_id}", wait)
+
+    def _evict_idle(self, now: float) -> None:
+        # bucket koji se vec napunio do burst-a je isto sto i nov
+        full_after = self.source_burst / self.source_rate
+        for sid in [k for k, b in self._buckets.items() if now - b.updated >= full_after]:
+            del self._buckets[sid]
+
+
+async def _reject(context: grpc.aio.ServicerContext, msg: str, retry_after_s: float) -> None:
+    ms = max(1, int(retry_after_s * 1000))
+    await context.abort(
+        grpc.StatusCode.RESOURCE_EXHAUSTED,
+        f"{msg}, retry after {ms} ms",
+        trailing_metadata=((RETRY_AFTER_KEY, str(ms)),),
+    )
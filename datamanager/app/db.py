@@ -1,15 +1,116 @@
 from __future__ import annotations
+
+import asyncio
+import itertools
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from .config import DATABASE_URL
+from .config import (
+    DATABASE_URL,
+    DB_WRITE_POOL_SIZE,
+    DB_READ_POOL_SIZE,
+    DB_POOL_MAX_OVERFLOW,
+    READ_DATABASE_URLS,
+    REPLICA_MAX_LAG_S,
+)
 
+# upis i citanje imaju odvojene pool-ove da ingest burst ne blokira GetReading/Aggregate
 engine = create_async_engine(
     DATABASE_URL,
     echo=False,
     pool_pre_ping=True,
+    pool_size=DB_WRITE_POOL_SIZE,
+    max_overflow=DB_POOL_MAX_OVERFLOW,
+)
+
+read_engine = create_async_engine(
+    DATABASE_URL,
+    echo=False,
+    pool_pre_ping=True,
+    pool_size=DB_READ_POOL_SIZE,
+    max_overflow=DB_POOL_MAX_OVERFLOW,
 )
 
 SessionLocal: async_sessionmaker[AsyncSession] = async_sessionmaker(
     bind=engine,
     autoflush=False,
     expire_on_commit=False,
-)
\ No newline at end of file
+)
+
+ReadSessionLocal: async_sessionmaker[AsyncSession] = async_sessionmaker(
+    bind=read_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# koliko replika kasni za primary-jem (0 ako je sve primenjeno, NULL ako se ne zna)
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+
+class ReadRouter:
+    """
+    Bira sesiju za read RPC: round-robin po replikama ciji je lag <= max_lag_s,
+    inace (ili uz force_primary) read pool na primary-ju.
+    """
+
+    def __init__(self, primary: async_sessionmaker[AsyncSession], replica_urls: list[str], max_lag_s: float):
+        self.primary = primary
+        self.max_lag_s = max_lag_s
+        self.replicas: list[tuple[str, async_sessionmaker[AsyncSession]]] = []
+        for url in replica_urls:
+            eng = create_async_engine(
+                url,
+                echo=False,
+                pool_pre_ping=True,
+                pool_size=DB_READ_POOL_SIZE,
+                max_overflow=DB_POOL_MAX_OVERFLOW,
+            )
+            name = make_url(url).render_as_string(hide_password=True)
+            self.replicas.append((name, async_sessionmaker(bind=eng, autoflush=False, expire_on_commit=False)))
+        # dok prva provera ne prodje replika se ne koristi
+        self.lag: dict[str, float | None] = {name: None for name, _ in self.replicas}
+        self._rr = itertools.count()
+
+    def session(self, force_primary: bool = False) -> AsyncSession:
+        if force_primary or not self.replicas:
+            return self.primary()
+        fresh = [
+            sm for name, sm in self.replicas
+            if self.lag[name] is not None and self.lag[name] <= self.max_lag_s
+        ]
+        if not fresh:
+            return self.primary()
+        return fresh[next(self._rr) % len(fresh)]()
+
+    async def check_lag(self) -> None:
+        for name, sm in self.replicas:
+            try:
+                async with sm() as session:
+                    v = (await session.execute(REPLICA_LAG_SQL)).scalar_one()
+                lag = float(v) if v is not None else None
+            except Exception as e:
+                print(f"[datamanager] replica {name} check failed: {e}")
+                lag = None
+
+            prev = self.lag[name]
+            was_ok = prev is not None and prev <= self.max_lag_s
+            is_ok = lag is not None and lag <= self.max_lag_s
+            if was_ok != is_ok:
+                state = "in rotation" if is_ok else "out of rotation (reads -> primary)"
+                print(f"[datamanager] replica {name} lag={lag} {state}")
+            self.lag[name] = lag
+
+    async def run_lag_monitor(self, interval_s: float) -> None:
+        while True:
+            await self.check_lag()
+            await asyncio.sleep(interval_s)
+
+
+read_router = ReadRouter(ReadSessionLocal, READ_DATABASE_URLS, REPLICA_MAX_LAG_S)
@@ -23,41 +23,54 @@ _sym_db = _symbol_database.Default()
 
 
 from google.protobuf import timestamp_pb2 as google_dot_protobuf_dot_timestamp__pb2
+from google.protobuf import field_mask_pb2 as google_dot_protobuf_dot_field__mask__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x12iot_readings.proto\x12\x03iot\x1a\x1fgoogle/protobuf/timestamp.proto\"\xd0\x01\n\x07Reading\x12\n\n\x02id\x18\x01 \x01(\t\x12\x11\n\tsource_id\x18\x02 \x01(\x05\x12&\n\x02ts\x18\x03 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x15\n\rtemperature_c\x18\x04 \x01(\x01\x12\x18\n\x10humidity_percent\x18\x05 \x01(\x01\x12\x11\n\tlight_lux\x18\x06 \x01(\x01\x12\x0f\n\x07\x63o2_ppm\x18\x07 \x01(\x01\x12\x16\n\x0ehumidity_ratio\x18\x08 \x01(\x01\x12\x11\n\toccupancy\x18\t \x01(\x08\"5\n\x14\x43reateReadingRequest\x12\x1d\n\x07reading\x18\x01 \x01(\x0b\x32\x0c.iot.Reading\"\x1f\n\x11GetReadingRequest\x12\n\n\x02id\x18\x01 \x01(\t\"A\n\x14UpdateReadingRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x1d\n\x07reading\x18\x02 \x01(\x0b\x32\x0c.iot.Reading\"\"\n\x14\x44\x65leteReadingRequest\x12\n\n\x02id\x18\x01 \x01(\t\"0\n\x0fReadingResponse\x12\x1d\n\x07reading\x18\x01 \x01(\x0b\x32\x0c.iot.Reading\"(\n\x15\x44\x65leteReadingResponse\x12\x0f\n\x07\x64\x65leted\x18\x01 \x01(\x08\"\x9b\x01\n\x13ListReadingsRequest\x12+\n\x07\x66rom_ts\x18\x01 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12)\n\x05to_ts\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\r\n\x05limit\x18\x03 \x01(\x05\x12\x0e\n\x06offset\x18\x04 \x01(\x05\x12\r\n\x05order\x18\x05 \x01(\t\"E\n\x14ListReadingsResponse\x12\x1e\n\x08readings\x18\x01 \x03(\x0b\x32\x0c.iot.Reading\x12\r\n\x05total\x18\x02 \x01(\x03\"\x97\x01\n\x10\x41ggregateRequest\x12+\n\x07\x66rom_ts\x18\x01 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12)\n\x05to_ts\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x0e\n\x06\x66ields\x18\x03 \x03(\t\x12\x1b\n\x05\x66uncs\x18\x04 \x03(\x0e\x32\x0c.iot.AggFunc\"D\n\x08\x41ggValue\x12\r\n\x05\x66ield\x18\x01 \x01(\t\x12\x1a\n\x04\x66unc\x18\x02 \x01(\x0e\x32\x0c.iot.AggFunc\x12\r\n\x05value\x18\x03 \x01(\x01\"2\n\x11\x41ggregateResponse\x12\x1d\n\x06values\x18\x01 \x03(\x0b\x32\r.iot.AggValue*G\n\x07\x41ggFunc\x12\x18\n\x14\x41GG_FUNC_UNSPECIFIED\x10\x00\x12\x07\n\x03MIN\x10\x01\x12\x07\n\x03MAX\x10\x02\x12\x07\n\x03\x41VG\x10\x03\x12\x07\n\x03SUM\x10\x04\x32\x99\x03\n\x0eReadingService\x12@\n\rCreateReading\x12\x19.iot.CreateReadingRequest\x1a\x14.iot.ReadingResponse\x12:\n\nGetReading\x12\x16.iot.GetReadingRequest\x1a\x14.iot.ReadingResponse\x12@\n\rUpdateReading\x12\x19.iot.UpdateReadingRequest\x1a\x14.iot.ReadingResponse\x12\x46\n\rDeleteReading\x12\x19.iot.DeleteReadingRequest\x1a\x1a.iot.DeleteReadingResponse\x12\x43\n\x0cListReadings\x12\x18.iot.ListReadingsRequest\x1a\x19.iot.ListReadingsResponse\x12:\n\tAggregate\x12\x15.iot.AggregateRequest\x1a\x16.iot.AggregateResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x12iot_readings.proto\x12\x03iot\x1a\x1fgoogle/protobuf/timestamp.proto\x1a google/protobuf/field_mask.proto\"\xd0\x01\n\x07Reading\x12\n\n\x02id\x18\x01 \x01(\t\x12\x11\n\tsource_id\x18\x02 \x01(\x05\x12&\n\x02ts\x18\x03 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x15\n\rtemperature_c\x18\x04 \x01(\x01\x12\x18\n\x10humidity_percent\x18\x05 \x01(\x01\x12\x11\n\tlight_lux\x18\x06 \x01(\x01\x12\x0f\n\x07\x63o2_ppm\x18\x07 \x01(\x01\x12\x16\n\x0ehumidity_ratio\x18\x08 \x01(\x01\x12\x11\n\toccupancy\x18\t \x01(\x08\"5\n\x14\x43reateReadingRequest\x12\x1d\n\x07reading\x18\x01 \x01(\x0b\x32\x0c.iot.Reading\"6\n\x11GetReadingRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x15\n\rforce_primary\x18\x02 \x01(\x08\"r\n\x14UpdateReadingRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x1d\n\x07reading\x18\x02 \x01(\x0b\x32\x0c.iot.Reading\x12/\n\x0bupdate_mask\x18\x03 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\"\"\n\x14\x44\x65leteReadingRequest\x12\n\n\x02id\x18\x01 \x01(\t\"0\n\x0fReadingResponse\x12\x1d\n\x07reading\x18\x01 \x01(\x0b\x32\x0c.iot.Reading\"(\n\x15\x44\x65leteReadingResponse\x12\x0f\n\x07\x64\x65leted\x18\x01 \x01(\x08\"H\n\x1a\x42\x61tchUpdateReadingsRequest\x12*\n\x07updates\x18\x01 \x03(\x0b\x32\x19.iot.UpdateReadingRequest\"T\n\x1b\x42\x61tchUpdateReadingsResponse\x12\x1e\n\x08readings\x18\x01 \x03(\x0b\x32\x0c.iot.Reading\x12\x15\n\rnot_found_ids\x18\x02 \x03(\t\"\xb2\x01\n\x13ListReadingsRequest\x12+\n\x07\x66rom_ts\x18\x01 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12)\n\x05to_ts\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\r\n\x05limit\x18\x03 \x01(\x05\x12\x0e\n\x06offset\x18\x04 \x01(\x05\x12\r\n\x05order\x18\x05 \x01(\t\x12\x15\n\rforce_primary\x18\x06 \x01(\x08\"E\n\x14ListReadingsResponse\x12\x1e\n\x08readings\x18\x01 \x03(\x0b\x32\x0c.iot.Reading\x12\r\n\x05total\x18\x02 \x01(\x03\"\xae\x01\n\x10\x41ggregateRequest\x12+\n\x07\x66rom_ts\x18\x01 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12)\n\x05to_ts\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x0e\n\x06\x66ields\x18\x03 \x03(\t\x12\x1b\n\x05\x66uncs\x18\x04 \x03(\x0e\x32\x0c.iot.AggFunc\x12\x15\n\rforce_primary\x18\x05 \x01(\x08\"D\n\x08\x41ggValue\x12\r\n\x05\x66ield\x18\x01 \x01(\t\x12\x1a\n\x04\x66unc\x18\x02 \x01(\x0e\x32\x0c.iot.AggFunc\x12\r\n\x05value\x18\x03 \x01(\x01\"2\n\x11\x41ggregateResponse\x12\x1d\n\x06values\x18\x01 \x03(\x0b\x32\r.iot.AggValue\"\x13\n\x11SpoolStatsRequest\"\x95\x01\n\x12SpoolStatsResponse\x12\x0f\n\x07\x65nabled\x18\x01 \x01(\x08\x12\r\n\x05\x64\x65pth\x18\x02 \x01(\x03\x12\x10\n\x08segments\x18\x03 \x01(\x05\x12\r\n\x05\x62ytes\x18\x04 \x01(\x03\x12\x13\n\x0blag_seconds\x18\x05 \x01(\x01\x12\x15\n\rdrained_total\x18\x06 \x01(\x03\x12\x12\n\nlast_error\x18\x07 \x01(\t\"\x9a\x01\n\x15\x45xportReadingsRequest\x12+\n\x07\x66rom_ts\x18\x01 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12)\n\x05to_ts\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x12\n\nbatch_size\x18\x03 \x01(\x05\x12\x15\n\rforce_primary\x18\x04 \x01(\x08\"\xc3\x01\n\x0eReadingColumns\x12\n\n\x02id\x18\x01 \x03(\t\x12\x11\n\tsource_id\x18\x02 \x03(\x05\x12\x12\n\nts_unix_ms\x18\x03 \x03(\x03\x12\x15\n\rtemperature_c\x18\x04 \x03(\x01\x12\x18\n\x10humidity_percent\x18\x05 \x03(\x01\x12\x11\n\tlight_lux\x18\x06 \x03(\x01\x12\x0f\n\x07\x63o2_ppm\x18\x07 \x03(\x01\x12\x16\n\x0ehumidity_ratio\x18\x08 \x03(\x01\x12\x11\n\toccupancy\x18\t \x03(\x08*G\n\x07\x41ggFunc\x12\x18\n\x14\x41GG_FUNC_UNSPECIFIED\x10\x00\x12\x07\n\x03MIN\x10\x01\x12\x07\n\x03MAX\x10\x02\x12\x07\n\x03\x41VG\x10\x03\x12\x07\n\x03SUM\x10\x04\x32\xfa\x04\n\x0eReadingService\x12@\n\rCreateReading\x12\x19.iot.CreateReadingRequest\x1a\x14.iot.ReadingResponse\x12:\n\nGetReading\x12\x16.iot.GetReadingRequest\x1a\x14.iot.ReadingResponse\x12@\n\rUpdateReading\x12\x19.iot.UpdateReadingRequest\x1a\x14.iot.ReadingResponse\x12X\n\x13\x42\x61tchUpdateReadings\x12\x1f.iot.BatchUpdateReadingsRequest\x1a .iot.BatchUpdateReadingsResponse\x12\x46\n\rDeleteReading\x12\x19.iot.DeleteReadingRequest\x1a\x1a.iot.DeleteReadingResponse\x12\x43\n\x0cListReadings\x12\x18.iot.ListReadingsRequest\x1a\x19.iot.ListReadingsResponse\x12:\n\tAggregate\x12\x15.iot.AggregateRequest\x1a\x16.iot.AggregateResponse\x12@\n\rGetSpoolStats\x12\x16.iot.SpoolStatsRequest\x1a\x17.iot.SpoolStatsResponse\x12\x43\n\x0e\x45xportReadings\x12\x1a.iot.ExportReadingsRequest\x1a\x13.iot.ReadingColumns0\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'iot_readings_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
-  _globals['_AGGFUNC']._serialized_start=1059
-  _globals['_AGGFUNC']._serialized_end=1130
-  _globals['_READING']._serialized_start=61
-  _globals['_READING']._serialized_end=269
-  _globals['_CREATEREADINGREQUEST']._serialized_start=271
-  _globals['_CREATEREADINGREQUEST']._serialized_end=324
-  _globals['_GETREADINGREQUEST']._serialized_start=326
-  _globals['_GETREADINGREQUEST']._serialized_end=357
-  _globals['_UPDATEREADINGREQUEST']._serialized_start=359
-  _globals['_UPDATEREADINGREQUEST']._serialized_end=424
-  _globals['_DELETEREADINGREQUEST']._serialized_start=426
-  _globals['_DELETEREADINGREQUEST']._serialized_end=460
-  _globals['_READINGRESPONSE']._serialized_start=462
-  _globals['_READINGRESPONSE']._serialized_end=510
-  _globals['_DELETEREADINGRESPONSE']._serialized_start=512
-  _globals['_DELETEREADINGRESPONSE']._serialized_end=552
-  _globals['_LISTREADINGSREQUEST']._serialized_start=555
-  _globals['_LISTREADINGSREQUEST']._serialized_end=710
-  _globals['_LISTREADINGSRESPONSE']._serialized_start=712
-  _globals['_LISTREADINGSRESPONSE']._serialized_end=781
-  _globals['_AGGREGATEREQUEST']._serialized_start=784
-  _globals['_AGGREGATEREQUEST']._serialized_end=935
-  _globals['_AGGVALUE']._serialized_start=937
-  _globals['_AGGVALUE']._serialized_end=1005
-  _globals['_AGGREGATERESPONSE']._serialized_start=1007
-  _globals['_AGGREGATERESPONSE']._serialized_end=1057
-  _globals['_READINGSERVICE']._serialized_start=1133
-  _globals['_READINGSERVICE']._serialized_end=1542
+  _globals['_AGGFUNC']._serialized_start=1899
+  _globals['_AGGFUNC']._serialized_end=1970
+  _globals['_READING']._serialized_start=95
+  _globals['_READING']._serialized_end=303
+  _globals['_CREATEREADINGREQUEST']._serialized_start=305
+  _globals['_CREATEREADINGREQUEST']._serialized_end=358
+  _globals['_GETREADINGREQUEST']._serialized_start=360
+  _globals['_GETREADINGREQUEST']._serialized_end=414
+  _globals['_UPDATEREADINGREQUEST']._serialized_start=416
+  _globals['_UPDATEREADINGREQUEST']._serialized_end=530
+  _globals['_DELETEREADINGREQUEST']._serialized_start=532
+  _globals['_DELETEREADINGREQUEST']._serialized_end=566
+  _globals['_READINGRESPONSE']._serialized_start=568
+  _globals['_READINGRESPONSE']._serialized_end=616
+  _globals['_DELETEREADINGRESPONSE']._serialized_start=618
+  _globals['_DELETEREADINGRESPONSE']._serialized_end=658
+  _globals['_BATCHUPDATEREADINGSREQUEST']._serialized_start=660
+  _globals['_BATCHUPDATEREADINGSREQUEST']._serialized_end=732
+  _globals['_BATCHUPDATEREADINGSRESPONSE']._serialized_start=734
+  _globals['_BATCHUPDATEREADINGSRESPONSE']._serialized_end=818
+  _globals['_LISTREADINGSREQUEST']._serialized_start=821
+  _globals['_LISTREADINGSREQUEST']._serialized_end=999
+  _globals['_LISTREADINGSRESPONSE']._serialized_start=1001
+  _globals['_LISTREADINGSRESPONSE']._serialized_end=1070
+  _globals['_AGGREGATEREQUEST']._serialized_start=1073
+  _globals['_AGGREGATEREQUEST']._serialized_end=1247
+  _globals['_AGGVALUE']._serialized_start=1249
+  _globals['_AGGVALUE']._serialized_end=1317
+  _globals['_AGGREGATERESPONSE']._serialized_start=1319
+  _globals['_AGGREGATERESPONSE']._serialized_end=1369
+  _globals['_SPOOLSTATSREQUEST']._serialized_start=1371
+  _globals['_SPOOLSTATSREQUEST']._serialized_end=1390
+  _globals['_SPOOLSTATSRESPONSE']._serialized_start=1393
+  _globals['_SPOOLSTATSRESPONSE']._serialized_end=1542
+  _globals['_EXPORTREADINGSREQUEST']._serialized_start=1545
+  _globals['_EXPORTREADINGSREQUEST']._serialized_end=1699
+  _globals['_READINGCOLUMNS']._serialized_start=1702
+  _globals['_READINGCOLUMNS']._serialized_end=1897
+  _globals['_READINGSERVICE']._serialized_start=1973
+  _globals['_READINGSERVICE']._serialized_end=2607
 # @@protoc_insertion_point(module_scope)
@@ -49,6 +49,11 @@ class ReadingServiceStub(object):
                 request_serializer=iot__readings__pb2.UpdateReadingRequest.SerializeToString,
                 response_deserializer=iot__readings__pb2.ReadingResponse.FromString,
                 _registered_method=True)
+        self.BatchUpdateReadings = channel.unary_unary(
+                '/iot.ReadingService/BatchUpdateReadings',
+                request_serializer=iot__readings__pb2.BatchUpdateReadingsRequest.SerializeToString,
+                response_deserializer=iot__readings__pb2.BatchUpdateReadingsResponse.FromString,
+                _registered_method=True)
         self.DeleteReading = channel.unary_unary(
                 '/iot.ReadingService/DeleteReading',
                 request_serializer=iot__readings__pb2.DeleteReadingRequest.SerializeToString,
@@ -64,6 +69,16 @@ class ReadingServiceStub(object):
                 request_serializer=iot__readings__pb2.AggregateRequest.SerializeToString,
                 response_deserializer=iot__readings__pb2.AggregateResponse.FromString,
                 _registered_method=True)
+        self.GetSpoolStats = channel.unary_unary(
+                '/iot.ReadingService/GetSpoolStats',
+                request_serializer=iot__readings__pb2.SpoolStatsRequest.SerializeToString,
+                response_deserializer=iot__readings__pb2.SpoolStatsResponse.FromString,
+                _registered_method=True)
+        self.ExportReadings = channel.unary_stream(
+                '/iot.ReadingService/ExportReadings',
+                request_serializer=iot__readings__pb2.ExportReadingsRequest.SerializeToString,
+                response_deserializer=iot__readings__pb2.ReadingColumns.FromString,
+                _registered_method=True)
 
 
 class ReadingServiceServicer(object):
@@ -87,6 +102,12 @@ class ReadingServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def BatchUpdateReadings(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def DeleteReading(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -105,6 +126,20 @@ class ReadingServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetSpoolStats(self, request, context):
+        """stanje disk spool-a (SPOOL_ENABLED): koliko readinga ceka upis u bazu
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ExportReadings(self, request, context):
+        """bulk izvoz opsega (backfill): kolonski blokovi rastuce po ts, bez offset paginacije
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_ReadingServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -123,6 +158,11 @@ def add_ReadingServiceServicer_to_server(servicer, server):
                     request_deserializer=iot__readings__pb2.UpdateReadingRequest.FromString,
                     response_serializer=iot__readings__pb2.ReadingResponse.SerializeToString,
             ),
+            'BatchUpdateReadings': grpc.unary_unary_rpc_method_handler(
+                    servicer.BatchUpdateReadings,
+                    request_deserializer=iot__readings__pb2.BatchUpdateReadingsRequest.FromString,
+                    response_serializer=iot__readings__pb2.BatchUpdateReadingsResponse.SerializeToString,
+            ),
             'DeleteReading': grpc.unary_unary_rpc_method_handler(
                     servicer.DeleteReading,
                     request_deserializer=iot__readings__pb2.DeleteReadingRequest.FromString,
@@ -138,6 +178,16 @@ def add_ReadingServiceServicer_to_server(servicer, server):
                     request_deserializer=iot__readings__pb2.AggregateRequest.FromString,
                     response_serializer=iot__readings__pb2.AggregateResponse.SerializeToString,
             ),
+            'GetSpoolStats': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetSpoolStats,
+                    request_deserializer=iot__readings__pb2.SpoolStatsRequest.FromString,
+                    response_serializer=iot__readings__pb2.SpoolStatsResponse.SerializeToString,
+            ),
+            'ExportReadings': grpc.unary_stream_rpc_method_handler(
+                    servicer.ExportReadings,
+                    request_deserializer=iot__readings__pb2.ExportReadingsRequest.FromString,
+                    response_serializer=iot__readings__pb2.ReadingColumns.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'iot.ReadingService', rpc_method_handlers)
@@ -230,6 +280,33 @@ class ReadingService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def BatchUpdateReadings(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/iot.ReadingService/BatchUpdateReadings',
+            iot__readings__pb2.BatchUpdateReadingsRequest.SerializeToString,
+            iot__readings__pb2.BatchUpdateReadingsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def DeleteReading(request,
             target,
@@ -310,3 +387,57 @@ class ReadingService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def GetSpoolStats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/iot.ReadingService/GetSpoolStats',
+            iot__readings__pb2.SpoolStatsRequest.SerializeToString,
+            iot__readings__pb2.SpoolStatsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ExportReadings(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/iot.ReadingService/ExportReadings',
+            iot__readings__pb2.ExportReadingsRequest.SerializeToString,
+            iot__readings__pb2.ReadingColumns.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
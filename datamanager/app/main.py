@@ -7,8 +7,25 @@ import sys
 import grpc
 from grpc_reflection.v1alpha import reflection
 
-from .config import GRPC_HOST, GRPC_PORT
-from .db import engine
+from .config import (
+    GRPC_HOST,
+    GRPC_PORT,
+    SPOOL_ENABLED,
+    SPOOL_DIR,
+    SPOOL_SEGMENT_MAX_BYTES,
+    SPOOL_FSYNC_INTERVAL_MS,
+    SPOOL_DRAIN_BATCH,
+    SPOOL_DRAIN_RETRY_S,
+    READ_CONCURRENCY,
+    WRITE_CONCURRENCY,
+    RPC_CONCURRENCY,
+    ADMISSION_QUEUE_MAX,
+    SOURCE_RATE_PER_S,
+    SOURCE_BURST,
+    REPLICA_CHECK_INTERVAL_S,
+)
+from .admission import Admission, parse_rpc_limits
+from .db import engine, read_router
 from .models import Base
 
 GEN_DIR = Path(__file__).resolve().parent / "generated"
@@ -19,6 +36,7 @@ from .generated import iot_readings_pb2 as pb2
 from .generated import iot_readings_pb2_grpc as pb2_grpc
 from .mqtt_publisher import MqttPublisher
 from .service import ReadingService
+from .spool import Spool
 # baza init grpc server init registruje readingservice i slusa za zahteve
 
 async def init_db() -> None:
@@ -36,7 +54,41 @@ async def serve() -> None:
 
     # MQTT publisher se pravi OVDE i prosleđuje servisu koji se registruje na isti server
     publisher = MqttPublisher()
-    pb2_grpc.add_ReadingServiceServicer_to_server(ReadingService(publisher), server)
+
+    # opcioni disk spool: CreateReading ne ceka bazu, drainer puni Postgres u pozadini
+    spool = None
+    drainer = None
+    if SPOOL_ENABLED:
+        spool = Spool(SPOOL_DIR, SPOOL_SEGMENT_MAX_BYTES, SPOOL_FSYNC_INTERVAL_MS)
+        print(f"[datamanager] spool enabled dir={SPOOL_DIR} pending={spool.depth}")
+
+    admission = Admission(
+        read_limit=READ_CONCURRENCY,
+        write_limit=WRITE_CONCURRENCY,
+        rpc_limits=parse_rpc_limits(RPC_CONCURRENCY),
+        queue_max=ADMISSION_QUEUE_MAX,
+        source_rate=SOURCE_RATE_PER_S,
+        source_burst=SOURCE_BURST,
+    )
+    print(
+        f"[datamanager] admission read={READ_CONCURRENCY} write={WRITE_CONCURRENCY} "
+        f"rpc={RPC_CONCURRENCY or '-'} queue_max={ADMISSION_QUEUE_MAX} source_rate={SOURCE_RATE_PER_S}/s"
+    )
+
+    # read replike: lag se proverava periodicno, preko praga citanje ide na primary
+    lag_monitor = None
+    if read_router.replicas:
+        await read_router.check_lag()
+        lag_monitor = asyncio.create_task(read_router.run_lag_monitor(REPLICA_CHECK_INTERVAL_S))
+        print(f"[datamanager] read replicas={len(read_router.replicas)} max_lag={read_router.max_lag_s}s")
+
+    service = ReadingService(publisher, spool, admission)
+    pb2_grpc.add_ReadingServiceServicer_to_server(service, server)
+
+    if spool is not None:
+        # multi-row INSERT ima limit od 32767 parametara (9 kolona po redu)
+        batch = max(1, min(SPOOL_DRAIN_BATCH, 3000))
+        drainer = asyncio.create_task(spool.run_drainer(service.flush_spooled, batch, SPOOL_DRAIN_RETRY_S))
 
     # Reflection (super za Postman/grpcurl)
     service_names = (
@@ -53,6 +105,12 @@ async def serve() -> None:
     try:
         await server.wait_for_termination()
     finally:
+        if drainer is not None:
+            drainer.cancel()
+        if lag_monitor is not None:
+            lag_monitor.cancel()
+        if spool is not None:
+            spool.close()
         # ako imaš close() u publisher-u (preporuka), zatvori ga
         try:
             publisher.close()
@@ -4,7 +4,8 @@ import uuid
 from datetime import datetime
 from typing import Sequence
 
-from sqlalchemy import select, update, delete, func
+from sqlalchemy import select, update, delete, func, values, column, case, cast, Boolean
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .models import SensorReading
@@ -29,6 +30,22 @@ async def create_reading(session: AsyncSession, r: SensorReading) -> SensorReadi
     await session.flush()
     return r
 
+async def bulk_insert_readings(session: AsyncSession, rows: list[dict]) -> Sequence[SensorReading]:
+    """
+    Jedan multi-row INSERT; postojeci id se preskace (ponovljeno praznjenje spool-a je idempotentno).
+    Vraca samo stvarno upisane redove.
+    """
+    if not rows:
+        return []
+    stmt = (
+        pg_insert(SensorReading)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[SensorReading.id])
+        .returning(SensorReading)
+    )
+    res = await session.execute(stmt)
+    return res.scalars().all()
+
 async def get_reading(session: AsyncSession, reading_id: uuid.UUID) -> SensorReading | None:
     res = await session.execute(select(SensorReading).where(SensorReading.id == reading_id))
     return res.scalar_one_or_none()
@@ -43,6 +60,45 @@ async def update_reading(session: AsyncSession, reading_id: uuid.UUID, patch: di
     res = await session.execute(stmt)
     return res.scalar_one_or_none()
 
+async def batch_update_readings(
+    session: AsyncSession,
+    patches: list[tuple[uuid.UUID, dict]],
+) -> Sequence[SensorReading]:
+    """
+    Vise maskiranih izmena u jednom UPDATE ... FROM (VALUES ...):
+    za svaku kolonu iz unije maski ide par (vrednost, set_<kolona>), pa
+    SET kolona = CASE WHEN v.set_kolona THEN v.kolona ELSE kolona END.
+    Vraca izmenjene redove (id-jevi kojih nema se ne vracaju).
+    """
+    if not patches:
+        return []
+
+    cols = sorted({c for _, patch in patches for c in patch})
+    table = SensorReading.__table__
+    v = values(
+        column("id", table.c.id.type),
+        *[column(c, table.c[c].type) for c in cols],
+        *[column(f"set_{c}", Boolean) for c in cols],
+        name="v",
+    ).data([
+        (rid, *[patch.get(c) for c in cols], *[c in patch for c in cols])
+        for rid, patch in patches
+    ])
+
+    stmt = (
+        update(SensorReading)
+        .where(SensorReading.id == v.c.id)
+        .values({
+            # cast: kolona sa samo NULL vrednostima (npr. source_id=None) bi bila text
+            c: case((v.c[f"set_{c}"], cast(v.c[c], table.c[c].type)), else_=getattr(SensorReading, c))
+            for c in cols
+        })
+        .returning(SensorReading)
+        .execution_options(synchronize_session=False)
+    )
+    res = await session.execute(stmt)
+    return res.scalars().all()
+
 async def delete_reading(session: AsyncSession, reading_id: uuid.UUID) -> bool:
     stmt = delete(SensorReading).where(SensorReading.id == reading_id).returning(SensorReading.id)
     res = await session.execute(stmt)
@@ -80,6 +136,34 @@ async def list_readings(
 
     return items, int(total)
 
+EXPORT_COLUMNS = (
+    SensorReading.id,
+    SensorReading.source_id,
+    SensorReading.ts,
+    SensorReading.temperature_c,
+    SensorReading.humidity_percent,
+    SensorReading.light_lux,
+    SensorReading.co2_ppm,
+    SensorReading.humidity_ratio,
+    SensorReading.occupancy,
+)
+
+async def export_readings(
+    session: AsyncSession,
+    from_ts: datetime | None,
+    to_ts: datetime | None,
+    batch_size: int,
+):
+    """
+    Server-side cursor (yield_per) nad opsegom, rastuce po (ts, id): vraca blokove od
+    batch_size redova (tuple-ovi u redosledu EXPORT_COLUMNS), bez COUNT-a i OFFSET-a.
+    """
+    stmt = _apply_time_filter(select(*EXPORT_COLUMNS), from_ts, to_ts)
+    stmt = stmt.order_by(SensorReading.ts.asc(), SensorReading.id.asc()).execution_options(yield_per=batch_size)
+    result = await session.stream(stmt)
+    async for rows in result.partitions(batch_size):
+        yield rows
+
 async def aggregate(
     session: AsyncSession,
     from_ts: datetime,
@@ -1,18 +1,20 @@
 from __future__ import annotations
 
 import uuid
-from datetime import timezone
+from datetime import datetime, timedelta, timezone
 
 import grpc
 from google.protobuf.timestamp_pb2 import Timestamp
 
-from .db import SessionLocal
+from .admission import Admission
+from .db import SessionLocal, read_router
 from .models import SensorReading
 from . import repository
 
 from .generated import iot_readings_pb2 as pb2
 from .generated import iot_readings_pb2_grpc as pb2_grpc
 from .mqtt_publisher import MqttPublisher
+from .spool import Spool, reading_to_record, record_to_row
 
 # implementira grpc validira zove repository
 def dt_from_ts(ts: Timestamp):
@@ -37,6 +39,21 @@ def reading_to_proto(m: SensorReading) -> pb2.Reading:
         occupancy=m.occupancy,
     )
 
+def rows_to_columns(rows) -> pb2.ReadingColumns:
+    # redovi iz repository.export_readings (id, source_id, ts, temp, hum, light, co2, ratio, occupancy)
+    ids, sources, ts, temp, hum, light, co2, ratio, occ = zip(*rows)
+    return pb2.ReadingColumns(
+        id=[str(x) for x in ids],
+        source_id=[int(x or 0) for x in sources],
+        ts_unix_ms=[(t - EPOCH) // timedelta(milliseconds=1) for t in ts],
+        temperature_c=temp,
+        humidity_percent=hum,
+        light_lux=light,
+        co2_ppm=co2,
+        humidity_ratio=ratio,
+        occupancy=[bool(x) for x in occ],
+    )
+
 def reading_to_mqtt(m: SensorReading) -> dict:
     ts = m.ts.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
     return {
@@ -59,9 +76,76 @@ def parse_uuid(value: str) -> uuid.UUID:
     except Exception:
         raise ValueError("Invalid UUID")
 
+# polja Reading-a koja se mogu menjati preko update_mask
+UPDATABLE_FIELDS = (
+    "source_id",
+    "ts",
+    "temperature_c",
+    "humidity_percent",
+    "light_lux",
+    "co2_ppm",
+    "humidity_ratio",
+    "occupancy",
+)
+MAX_BATCH_UPDATES = 1000
+
+# ExportReadings: redova po ReadingColumns bloku
+EXPORT_BATCH_DEFAULT = 10000
+EXPORT_BATCH_MAX = 100000
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def patch_from_update(u: pb2.UpdateReadingRequest) -> dict:
+    """
+    Bez update_mask: stari nacin, prepisuju se sva polja (ts samo ako je poslat).
+    Sa update_mask: samo navedena polja ("occupancy" ili "reading.occupancy").
+    """
+    r = u.reading
+    if u.HasField("update_mask") and u.update_mask.paths:
+        fields = []
+        for path in u.update_mask.paths:
+            name = path[len("reading."):] if path.startswith("reading.") else path
+            if name not in UPDATABLE_FIELDS:
+                raise ValueError(f"Unknown update_mask path: {path}")
+            fields.append(name)
+    else:
+        fields = [f for f in UPDATABLE_FIELDS if f != "ts" or r.HasField("ts")]
+
+    patch = {}
+    for name in fields:
+        if name == "ts":
+            if not r.HasField("ts"):
+                raise ValueError("ts is in update_mask but not set")
+            patch["ts"] = dt_from_ts(r.ts)
+        elif name == "source_id":
+            patch["source_id"] = r.source_id if r.source_id != 0 else None
+        else:
+            patch[name] = getattr(r, name)
+    return patch
+
 class ReadingService(pb2_grpc.ReadingServiceServicer):
-    def __init__(self, publisher: MqttPublisher | None = None):
+    def __init__(
+        self,
+        publisher: MqttPublisher | None = None,
+        spool: Spool | None = None,
+        admission: Admission | None = None,
+    ):
         self.publisher = publisher
+        self.spool = spool
+        # bez admission konfiguracije -> bez limita
+        self.admission = admission or Admission(0, 0, {}, 0, 0.0, 1)
+
+    async def flush_spooled(self, records: list[dict]) -> None:
+        # sink za spool drainer: bulk upis jednog batch-a pa MQTT redom iz spool-a
+        async with SessionLocal() as session:
+            async with session.begin():
+                created = await repository.bulk_insert_readings(session, [record_to_row(x) for x in records])
+
+        if self.publisher:
+            by_id = {str(m.id): m for m in created}
+            for rec in records:
+                m = by_id.get(rec["id"])
+                if m is not None:
+                    self.publisher.publish_reading(reading_to_mqtt(m), action="created")
 
 
     async def CreateReading(self, request: pb2.CreateReadingRequest, context: grpc.aio.ServicerContext):
@@ -93,9 +177,20 @@ class ReadingService(pb2_grpc.ReadingServiceServicer):
             occupancy=r.occupancy,
         )
 
-        async with SessionLocal() as session:
-            async with session.begin():
-                created = await repository.create_reading(session, model)
+        await self.admission.check_rate(r.source_id, context)
+
+        if self.spool is not None:
+            # upis u spool (fsync) i odmah ack; u bazu i na MQTT ide preko drainer-a
+            try:
+                await self.spool.append(reading_to_record(model))
+            except OSError as e:
+                await context.abort(grpc.StatusCode.UNAVAILABLE, f"Spool write failed: {e}")
+            return pb2.ReadingResponse(reading=reading_to_proto(model))
+
+        async with self.admission.slot("CreateReading", "write", context):
+            async with SessionLocal() as session:
+                async with session.begin():
+                    created = await repository.create_reading(session, model)
 
         if self.publisher:
             self.publisher.publish_reading(reading_to_mqtt(created), action="created")
@@ -108,11 +203,16 @@ class ReadingService(pb2_grpc.ReadingServiceServicer):
         except ValueError:
             await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid id UUID")
 
-        async with SessionLocal() as session:
-            m = await repository.get_reading(session, rid)
-            if m is None:
-                await context.abort(grpc.StatusCode.NOT_FOUND, "Not found")
-            return pb2.ReadingResponse(reading=reading_to_proto(m))
+        async with self.admission.slot("GetReading", "read", context):
+            async with read_router.session(request.force_primary) as session:
+                m = await repository.get_reading(session, rid)
+            if m is None and not request.force_primary and read_router.replicas:
+                # replika mozda jos nema tek upisan reading -> probaj primary
+                async with read_router.session(force_primary=True) as session:
+                    m = await repository.get_reading(session, rid)
+        if m is None:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "Not found")
+        return pb2.ReadingResponse(reading=reading_to_proto(m))
 
     async def UpdateReading(self, request: pb2.UpdateReadingRequest, context: grpc.aio.ServicerContext):
         try:
@@ -120,25 +220,18 @@ class ReadingService(pb2_grpc.ReadingServiceServicer):
         except ValueError:
             await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid id UUID")
 
-        r = request.reading
-        if r is None:
+        if not request.HasField("reading"):
             await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Missing reading")
 
-        patch = {
-            "source_id": (r.source_id if r.source_id != 0 else None),
-            "temperature_c": r.temperature_c,
-            "humidity_percent": r.humidity_percent,
-            "light_lux": r.light_lux,
-            "co2_ppm": r.co2_ppm,
-            "humidity_ratio": r.humidity_ratio,
-            "occupancy": r.occupancy,
-        }
-        if r.HasField("ts"):
-            patch["ts"] = dt_from_ts(r.ts)
+        try:
+            patch = patch_from_update(request)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
 
-        async with SessionLocal() as session:
-            async with session.begin():
-                updated = await repository.update_reading(session, rid, patch)
+        async with self.admission.slot("UpdateReading", "write", context):
+            async with SessionLocal() as session:
+                async with session.begin():
+                    updated = await repository.update_reading(session, rid, patch)
 
         if updated is None:
             await context.abort(grpc.StatusCode.NOT_FOUND, "Not found")
@@ -148,21 +241,60 @@ class ReadingService(pb2_grpc.ReadingServiceServicer):
 
         return pb2.ReadingResponse(reading=reading_to_proto(updated))
 
+    async def BatchUpdateReadings(self, request: pb2.BatchUpdateReadingsRequest, context: grpc.aio.ServicerContext):
+        if len(request.updates) > MAX_BATCH_UPDATES:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"at most {MAX_BATCH_UPDATES} updates per batch")
+
+        patches: list[tuple[uuid.UUID, dict]] = []
+        seen: set[uuid.UUID] = set()
+        for i, u in enumerate(request.updates):
+            try:
+                rid = parse_uuid(u.id)
+                if not u.HasField("reading"):
+                    raise ValueError("Missing reading")
+                patch = patch_from_update(u)
+            except ValueError as e:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"updates[{i}]: {e}")
+            if rid in seen:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"updates[{i}]: duplicate id {rid}")
+            seen.add(rid)
+            patches.append((rid, patch))
+
+        async with self.admission.slot("BatchUpdateReadings", "write", context):
+            async with SessionLocal() as session:
+                async with session.begin():
+                    updated = await repository.batch_update_readings(session, patches)
+
+        by_id = {m.id: m for m in updated}
+        out = []
+        not_found = []
+        for rid, _ in patches:
+            m = by_id.get(rid)
+            if m is None:
+                not_found.append(str(rid))
+                continue
+            if self.publisher:
+                self.publisher.publish_reading(reading_to_mqtt(m), action="updated")
+            out.append(reading_to_proto(m))
+
+        return pb2.BatchUpdateReadingsResponse(readings=out, not_found_ids=not_found)
+
     async def DeleteReading(self, request: pb2.DeleteReadingRequest, context: grpc.aio.ServicerContext):
         try:
             rid = parse_uuid(request.id)
         except ValueError:
             await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid id UUID")
 
-        async with SessionLocal() as session:
-            async with session.begin():
-                m = await repository.get_reading(session, rid)
-                if m is None:
-                    await context.abort(grpc.StatusCode.NOT_FOUND, "Not found")
+        async with self.admission.slot("DeleteReading", "write", context):
+            async with SessionLocal() as session:
+                async with session.begin():
+                    m = await repository.get_reading(session, rid)
+                    if m is None:
+                        await context.abort(grpc.StatusCode.NOT_FOUND, "Not found")
 
-                ok = await repository.delete_reading(session, rid)
-                if not ok:
-                    await context.abort(grpc.StatusCode.NOT_FOUND, "Not found")
+                    ok = await repository.delete_reading(session, rid)
+                    if not ok:
+                        await context.abort(grpc.StatusCode.NOT_FOUND, "Not found")
 
         # posle commita:
         if self.publisher:
@@ -181,19 +313,20 @@ class ReadingService(pb2_grpc.ReadingServiceServicer):
         from_ts = dt_from_ts(request.from_ts) if request.HasField("from_ts") else None
         to_ts = dt_from_ts(request.to_ts) if request.HasField("to_ts") else None
 
-        async with SessionLocal() as session:
-            items, total = await repository.list_readings(
-                session=session,
-                from_ts=from_ts,
-                to_ts=to_ts,
-                limit=limit,
-                offset=offset,
-                order=request.order or "asc",
-            )
-            return pb2.ListReadingsResponse(
-                readings=[reading_to_proto(x) for x in items],
-                total=total,
-            )
+        async with self.admission.slot("ListReadings", "read", context):
+            async with read_router.session(request.force_primary) as session:
+                items, total = await repository.list_readings(
+                    session=session,
+                    from_ts=from_ts,
+                    to_ts=to_ts,
+                    limit=limit,
+                    offset=offset,
+                    order=request.order or "asc",
+                )
+        return pb2.ListReadingsResponse(
+            readings=[reading_to_proto(x) for x in items],
+            total=total,
+        )
 
     async def Aggregate(self, request: pb2.AggregateRequest, context: grpc.aio.ServicerContext):
         if not request.HasField("from_ts") or not request.HasField("to_ts"):
@@ -218,11 +351,32 @@ class ReadingService(pb2_grpc.ReadingServiceServicer):
         if not funcs_list:
             funcs_list = ["min", "max", "avg", "sum"]
 
-        async with SessionLocal() as session:
-            rows = await repository.aggregate(session, from_dt, to_dt, fields, funcs_list)
+        async with self.admission.slot("Aggregate", "read", context):
+            async with read_router.session(request.force_primary) as session:
+                rows = await repository.aggregate(session, from_dt, to_dt, fields, funcs_list)
 
         out = []
         inv = {"min": pb2.MIN, "max": pb2.MAX, "avg": pb2.AVG, "sum": pb2.SUM}
         for field, fn, value in rows:
             out.append(pb2.AggValue(field=field, func=inv[fn], value=value))
-        return pb2.AggregateResponse(values=out)
\ No newline at end of file
+        return pb2.AggregateResponse(values=out)
+
+    async def ExportReadings(self, request: pb2.ExportReadingsRequest, context: grpc.aio.ServicerContext):
+        batch_size = int(request.batch_size or EXPORT_BATCH_DEFAULT)
+        if batch_size < 1 or batch_size > EXPORT_BATCH_MAX:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"batch_size must be 1..{EXPORT_BATCH_MAX}")
+
+        from_ts = dt_from_ts(request.from_ts) if request.HasField("from_ts") else None
+        to_ts = dt_from_ts(request.to_ts) if request.HasField("to_ts") else None
+        if from_ts is not None and to_ts is not None and from_ts > to_ts:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "from_ts must be <= to_ts")
+
+        async with self.admission.slot("ExportReadings", "read", context, timed=False):
+            async with read_router.session(request.force_primary) as session:
+                async for rows in repository.export_readings(session, from_ts, to_ts, batch_size):
+                    yield rows_to_columns(rows)
+
+    async def GetSpoolStats(self, request: pb2.SpoolStatsRequest, context: grpc.aio.ServicerContext):
+        if self.spool is None:
+            return pb2.SpoolStatsResponse(enabled=False)
+        return pb2.SpoolStatsResponse(enabled=True, **self.spool.stats())
\ No newline at end of file
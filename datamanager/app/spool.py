@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from .models import SensorReading
+
+# append-only spool: CreateReading upisuje ovde (fsync u batch-evima) i odmah vraca odgovor,
+# drainer u pozadini prebacuje zapise u Postgres redom kojim su primljeni
+
+SEGMENT_SUFFIX = ".seg"
+CURSOR_FILE = "cursor.json"
+
+
+def reading_to_record(m: SensorReading) -> dict:
+    return {
+        "id": str(m.id),
+        "source_id": m.source_id,
+        "ts": m.ts.astimezone(timezone.utc).isoformat(),
+        "temperature_c": m.temperature_c,
+        "humidity_percent": m.humidity_percent,
+        "light_lux": m.light_lux,
+        "co2_ppm": m.co2_ppm,
+        "humidity_ratio": m.humidity_ratio,
+        "occupancy": m.occupancy,
+        "accepted_at": time.time(),
+    }
+
+
+def record_to_row(rec: dict) -> dict:
+    # kolone za bulk INSERT (accepted_at je samo za lag)
+    return {
+        "id": uuid.UUID(rec["id"]),
+        "source_id": rec.get("source_id"),
+        "ts": datetime.fromisoformat(rec["ts"]),
+        "temperature_c": rec["temperature_c"],
+        "humidity_percent": rec["humidity_percent"],
+        "light_lux": rec["light_lux"],
+        "co2_ppm": rec["co2_ppm"],
+        "humidity_ratio": rec["humidity_ratio"],
+        "occupancy": rec["occupancy"],
+    }
+
+
+def _fsync_close(fd: int) -> None:
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class Spool:
+    """
+    Segmentirani append-only log (JSON linije) u SPOOL_DIR.
+    - append(): upis u aktivni segment, ceka zajednicki fsync (group commit)
+    - run_drainer(): cita zapise redom i predaje ih sink-u (bulk insert u bazu);
+      pozicija se cuva u cursor.json, potpuno ispraznjeni segmenti se brisu
+    """
+
+    def __init__(self, directory: str, segment_max_bytes: int, fsync_interval_ms: int):
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync_interval = max(fsync_interval_ms, 0) / 1000.0
+
+        self._cursor = self._load_cursor()
+        self._segments = sorted(int(p.stem) for p in self.dir.glob(f"*{SEGMENT_SUFFIX}"))
+        # segmenti pre kursora su vec upisani u bazu (pad pre brisanja)
+        for seq in [s for s in self._segments if s < self._cursor[0]]:
+            self._path(seq).unlink(missing_ok=True)
+            self._segments.remove(seq)
+        self.depth = self._count_pending()
+
+        # posle restarta uvek novi segment, stari se samo prazne
+        self._active_seq = (self._segments[-1] + 1) if self._segments else 1
+        self._segments.append(self._active_seq)
+        if self._cursor[0] not in self._segments:
+            self._cursor = (self._segments[0], 0)
+        self._fh = open(self._path(self._active_seq), "ab")
+        self._active_size = 0
+        self._durable = (self._active_seq, 0)  # (segment, bajtova) koji su fsync-ovani
+
+        self._pending: asyncio.Future | None = None
+        self._data_ready = asyncio.Event()
+
+        self.drained_total = 0
+        self.oldest_accepted_at: float | None = None
+        self.last_error = ""
+
+    def _path(self, seq: int) -> Path:
+        return self.dir / f"{seq:012d}{SEGMENT_SUFFIX}"
+
+    def _load_cursor(self) -> tuple[int, int]:
+        p = self.dir / CURSOR_FILE
+        try:
+            c = json.loads(p.read_text(encoding="utf-8"))
+            return int(c["segment"]), int(c["offset"])
+        except Exception:
+            return 0, 0
+
+    def _save_cursor(self) -> None:
+        tmp = self.dir / (CURSOR_FILE + ".tmp")
+        seq, off = self._cursor
+        tmp.write_text(json.dumps({"segment": seq, "offset": off}), encoding="utf-8")
+        os.replace(tmp, self.dir / CURSOR_FILE)
+
+    def _count_pending(self) -> int:
+        n = 0
+        for seq in self._segments:
+            with open(self._path(seq), "rb") as f:
+                if seq == self._cursor[0]:
+                    f.seek(self._cursor[1])
+                n += f.read().count(b"\n")
+        return n
+
+    # ---------------- upis ----------------
+
+    async def append(self, record: dict) -> None:
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        if self._active_size and self._active_size + len(line) > self.segment_max_bytes:
+            self._rotate()
+
+        self._fh.write(line)
+        self._active_size += len(line)
+        self.depth += 1
+
+        fut = self._pending
+        if fut is None:
+            loop = asyncio.get_running_loop()
+            fut = self._pending = loop.create_future()
+            loop.call_later(self.fsync_interval, self._start_sync)
+        # shield: ako klijent odustane, batch se svejedno fsync-uje
+        await asyncio.shield(fut)
+
+    def _rotate(self) -> None:
+        # retko (jednom po segmentu) pa je sinhroni fsync ok
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._fh.close()
+        self._active_seq += 1
+        self._segments.append(self._active_seq)
+        self._fh = open(self._path(self._active_seq), "ab")
+        self._active_size = 0
+        self._durable = (self._active_seq, 0)
+        self._data_ready.set()
+
+    def _start_sync(self) -> None:
+        fut, self._pending = self._pending, None
+        if fut is None:
+            return
+        try:
+            self._fh.flush()
+            # dup: rotacija sme da zatvori original dok fsync radi u thread-u
+            fd = os.dup(self._fh.fileno())
+        except OSError as e:
+            fut.set_exception(e)
+            return
+        synced = (self._active_seq, self._active_size)
+
+        def _done(t: asyncio.Future) -> None:
+            if t.exception() is not None:
+                fut.set_exception(t.exception())
+                return
+            if synced[0] == self._durable[0] and synced[1] > self._durable[1]:
+                self._durable = synced
+            fut.set_result(None)
+            self._data_ready.set()
+
+        asyncio.ensure_future(asyncio.to_thread(_fsync_close, fd)).add_done_callback(_done)
+
+    # ---------------- praznjenje ----------------
+
+    def _readable_end(self, seq: int) -> int | None:
+        # zatvoreni segmenti do kraja, aktivni samo do fsync-ovanog dela (acked)
+        if seq != self._active_seq:
+            return None
+        return self._durable[1] if self._durable[0] == seq else 0
+
+    def _read(self, seq: int, offset: int, limit: int, end: int | None) -> tuple[list[dict], int, int]:
+        records: list[dict] = []
+        lines = 0
+        with open(self._path(seq), "rb") as f:
+            f.seek(offset)
+            pos = offset
+            while len(records) < limit and (end is None or pos < end):
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    # kraj fajla ili nedovrsen zapis (pad usred upisa)
+                    break
+                pos += len(line)
+                lines += 1
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    print(f"[datamanager] spool: skipping corrupt record in segment {seq} at {pos - len(line)}")
+        return records, pos, lines
+
+    async def run_drainer(
+        self,
+        sink: Callable[[list[dict]], Awaitable[None]],
+        batch_size: int,
+        retry_s: float,
+    ) -> None:
+        while True:
+            self._data_ready.clear()
+            seq, off = self._cursor
+            closed = seq != self._active_seq
+            end = self._readable_end(seq)
+            records, new_off, lines = await asyncio.to_thread(self._read, seq, off, batch_size, end)
+
+            if records:
+                self.oldest_accepted_at = records[0].get("accepted_at")
+                try:
+                    await sink(records)
+                except Exception as e:
+                    self.last_error = str(e)
+                    print(f"[datamanager] spool drain failed (depth={self.depth}): {e}")
+                    await asyncio.sleep(retry_s)
+                    continue
+                self.last_error = ""
+                self._cursor = (seq, new_off)
+                await asyncio.to_thread(self._save_cursor)
+                self.depth -= lines
+                self.drained_total += len(records)
+                continue
+
+            if new_off > off:
+                # preskoceni neispravni zapisi
+                self._cursor = (seq, new_off)
+                self.depth -= lines
+                continue
+
+            if closed:
+                # segment ispraznjen -> sledeci
+                self._segments.remove(seq)
+                self._cursor = (self._segments[0], 0)
+                await asyncio.to_thread(self._save_cursor)
+                self._path(seq).unlink(missing_ok=True)
+                continue
+
+            self.oldest_accepted_at = None
+            try:
+                await asyncio.wait_for(self._data_ready.wait(), timeout=retry_s)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        lag = 0.0
+        if self.depth > 0 and self.oldest_accepted_at is not None:
+            lag = max(0.0, time.time() - self.oldest_accepted_at)
+        size = 0
+        for seq in self._segments:
+            try:
+                size += self._path(seq).stat().st_size
+            except OSError:
+                pass
+        return {
+            "depth": self.depth,
+            "segments": len(self._segments),
+            "bytes": max(0, size - self._cursor[1]),
+            "lag_seconds": lag,
+            "drained_total": self.drained_total,
+            "last_error": self.last_error,
+        }
+
+    def close(self) -> None:
+        try:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._fh.close()
+        except Exception:
+            pass
@@ -4,6 +4,8 @@ import time
 import uuid
 import paho.mqtt.client as mqtt
 
+from rules import RuleEngine, threshold_config
+
 def env(name: str, default: str) -> str:
     v = os.getenv(name)
     return v if v is not None and v != "" else default
@@ -17,28 +19,22 @@ TOPIC_IN  = env("MQTT_TOPIC_READINGS", "iot/readings")
 TOPIC_OUT = env("MQTT_TOPIC_EVENTS", "iot/events")
 QOS = int(env("MQTT_QOS", "1"))
 
-# pragovi
+# pravila (rules.py); fajl se prati i ponovo ucitava bez restarta
+RULES_FILE = env("RULES_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules", "rules.json"))
+RULES_POLL_S = float(env("RULES_POLL_S", "2"))
+
+# pragovi: koriste se samo dok RULES_FILE ne postoji
 TEMP_MAX = float(env("TEMP_MAX", "0.0"))
 CO2_MAX  = float(env("CO2_MAX", "0"))
 HUM_MIN  = float(env("HUM_MIN", "0.0"))
 LIGHT_MAX = float(env("LIGHT_MAX", "0"))
 
+engine = RuleEngine(RULES_FILE, threshold_config(TEMP_MAX, CO2_MAX, HUM_MIN, LIGHT_MAX), RULES_POLL_S)
+
 def detect_events(reading: dict):
     events = []
-    temp = reading.get("temperature_c", 0) or 0
-    co2  = reading.get("co2_ppm", 0) or 0
-    hum  = reading.get("humidity_percent", 0) or 0
-    lux  = reading.get("light_lux", 0) or 0
-
-    if temp > TEMP_MAX:
-        events.append(("HIGH_TEMPERATURE", {"temperature_c": temp, "threshold": TEMP_MAX}))
-    if co2 > CO2_MAX:
-        events.append(("HIGH_CO2", {"co2_ppm": co2, "threshold": CO2_MAX}))
-    if hum < HUM_MIN:
-        events.append(("LOW_HUMIDITY", {"humidity_percent": hum, "threshold": HUM_MIN}))
-    if lux > LIGHT_MAX:
-        events.append(("HIGH_LIGHT", {"light_lux": lux, "threshold": LIGHT_MAX}))
-
+    for rule, event_type, value in engine.evaluate(reading):
+        events.append((rule.key, event_type, {rule.field: value, "threshold": rule.value}))
     return events
 
 def on_connect(client, userdata, flags, rc):
@@ -55,10 +51,11 @@ def on_message(client, userdata, msg):
             return
 
         detected = detect_events(reading)
-        for event_type, values in detected:
+        for rule_key, event_type, values in detected:
             event_msg = {
                 "event_id": str(uuid.uuid4()),
                 "event_type": event_type,
+                "rule": rule_key,
                 "detected_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
                 "reading_id": reading.get("id"),
                 "source_id": reading.get("source_id"),
@@ -83,6 +80,9 @@ def main():
     client.on_connect = on_connect
     client.on_message = on_message
 
+    engine.load()
+    engine.start_watching()
+
     print(f"[eventmanager] connecting to {MQTT_HOST}:{MQTT_PORT}")
     client.connect(MQTT_HOST, MQTT_PORT, keepalive=60)
     client.loop_forever()
@@ -0,0 +1,245 @@
+import json
+import operator
+import os
+import threading
+
+# pravila za evente (RULES_FILE, JSON):
+#
+#   {
+#     "groups": {"sala": [3, 4, 5]},
+#     "rules": [
+#       {"event": "HIGH_TEMPERATURE", "field": "temperature_c", "op": ">", "value": 23.0, "hysteresis": 0.5},
+#       {"event": "HIGH_TEMPERATURE", "field": "temperature_c", "op": ">", "value": 26.0, "groups": ["sala"]},
+#       {"event": "HIGH_CO2", "field": "co2_ppm", "op": ">", "value": 1000, "sources": [7],
+#        "mode": "edge", "clear_event": "CO2_OK"}
+#     ]
+#   }
+#
+# - bez "sources"/"groups" pravilo vazi za sve izvore; za isti "event" specificnije pravilo
+#   (source > group > globalno) zamenjuje opstije za taj izvor (npr. drugi prag za jednu salu)
+# - op: > >= < <= == !=; readinzi bez polja (ili sa null) se preskacu, ne racunaju se kao 0
+# - za > >= < <= vrednost iz readinga se pretvara u float ("23.5" radi); ako ne moze, preskace
+#   se samo to pravilo (uz log jednom po pravilu), ostala pravila za reading se i dalje proveravaju
+# - hysteresis (samo za > >= < <=): aktivno pravilo ostaje aktivno dok vrednost ne predje
+#   value -/+ hysteresis, pa vrednost oko praga ne pali/gasi event naizmenicno
+# - mode "level" (default): event za svaki reading dok je pravilo aktivno; "edge": samo na
+#   aktivaciji. clear_event (opciono) se objavi kad se pravilo deaktivira
+#
+# Pravila se kompajliraju u tuple po source_id, pa reading prolazi samo kroz pravila svog izvora
+# (ne raste sa ukupnim brojem pravila). Izmena fajla se ucitava u pozadinskom thread-u i menja
+# jednom dodelom reference; poruke se obradjuju sve vreme, a neispravan fajl ostavlja stara pravila.
+
+OPS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le, "==": operator.eq, "!=": operator.ne}
+MODES = ("level", "edge")
+
+
+class Rule:
+    __slots__ = ("key", "event", "field", "op", "value", "hold", "hysteresis", "edge", "clear_event", "stateful",
+                 "numeric")
+
+    def __init__(self, key, event, field, op, value, hysteresis, edge, clear_event):
+        self.key = key
+        self.event = event
+        self.field = field
+        self.op = OPS[op]
+        self.value = value
+        # prag dok je pravilo aktivno: za > / >= nizi, za < / <= visi
+        self.hold = value - hysteresis if op in (">", ">=") else value + hysteresis if op in ("<", "<=") else value
+        self.hysteresis = hysteresis
+        self.edge = edge
+        self.clear_event = clear_event
+        self.stateful = hysteresis > 0 or edge or clear_event is not None
+        self.numeric = op in (">", ">=", "<", "<=")
+
+
+class RuleSet:
+    """Kompajlirana pravila: by_source[sid] / default -> tuple pravila koja vaze za izvor."""
+
+    def __init__(self, by_source: dict, default: tuple, keys: frozenset, n_rules: int):
+        self.by_source = by_source
+        self.default = default
+        self.keys = keys
+        self.n_rules = n_rules
+
+    def for_source(self, sid) -> tuple:
+        return self.by_source.get(sid, self.default)
+
+
+def _number(r: dict, name: str, default=None):
+    v = r.get(name, default)
+    if isinstance(v, bool) or not isinstance(v, (int, float)):
+        raise ValueError(f"rule {r.get('event')!r}: {name} must be a number")
+    return float(v)
+
+
+def compile_rules(cfg: dict) -> RuleSet:
+    if not isinstance(cfg, dict) or not isinstance(cfg.get("rules"), list):
+        raise ValueError("config must be an object with a 'rules' list")
+    groups = cfg.get("groups") or {}
+    for name, members in groups.items():
+        if not isinstance(members, list) or not all(isinstance(s, int) for s in members):
+            raise ValueError(f"group {name!r} must be a list of source ids")
+
+    # (specificnost, pravilo, izvori) ; specificnost: 0 globalno, 1 grupa, 2 izvor
+    scoped = []
+    keys = set()
+    for i, r in enumerate(cfg["rules"]):
+        if not isinstance(r, dict):
+            raise ValueError(f"rule #{i} must be an object")
+        event, field, op = r.get("event"), r.get("field"), r.get("op")
+        if not event or not isinstance(event, str):
+            raise ValueError(f"rule #{i}: missing event")
+        if not field or not isinstance(field, str):
+            raise ValueError(f"rule {event!r}: missing field")
+        if op not in OPS:
+            raise ValueError(f"rule {event!r}: op must be one of {' '.join(OPS)}")
+        if op in ("==", "!="):
+            value = r.get("value")
+            if isinstance(value, (dict, list)) or value is None:
+                raise ValueError(f"rule {event!r}: value must be a scalar")
+        else:
+            value = _number(r, "value")
+        hysteresis = _number(r, "hysteresis", 0)
+        if hysteresis < 0 or (hysteresis and op in ("==", "!=")):
+            raise ValueError(f"rule {event!r}: hysteresis must be >= 0 and only with > >= < <=")
+        mode = r.get("mode", "level")
+        if mode not in MODES:
+            raise ValueError(f"rule {event!r}: mode must be one of {', '.join(MODES)}")
+
+        sources = r.get("sources") or []
+        if not all(isinstance(s, int) and not isinstance(s, bool) for s in sources):
+            raise ValueError(f"rule {event!r}: sources must be source ids")
+        group_names = r.get("groups") or []
+        members = set(sources)
+        for g in group_names:
+            if g not in groups:
+                raise ValueError(f"rule {event!r}: unknown group {g!r}")
+            members.update(groups[g])
+        level = 2 if sources else 1 if group_names else 0
+        if level == 2 and group_names:
+            raise ValueError(f"rule {event!r}: use either sources or groups, not both")
+
+        scope = "*" if level == 0 else ("s=" + ",".join(map(str, sorted(sources))) if level == 2 else "g=" + ",".join(group_names))
+        key = r.get("id") or f"{event}:{field}{op}{value}:{scope}"
+        if key in keys:
+            raise ValueError(f"duplicate rule {key!r} (set a unique id)")
+        keys.add(key)
+        rule = Rule(key, event, field, op, value, hysteresis, mode == "edge", r.get("clear_event"))
+        scoped.append((level, rule, members))
+
+    def merge(levels: list) -> tuple:
+        # za svaki event ostaju samo pravila najvise specificnosti
+        best = {}
+        for level, rule in levels:
+            best[rule.event] = max(best.get(rule.event, -1), level)
+        return tuple(rule for level, rule in levels if level == best[rule.event])
+
+    global_rules = [(0, rule) for level, rule, _ in scoped if level == 0]
+    per_source = {}
+    for level, rule, members in scoped:
+        for sid in members:
+            per_source.setdefault(sid, []).append((level, rule))
+    by_source = {sid: merge(global_rules + extra) for sid, extra in per_source.items()}
+    return RuleSet(by_source, merge(global_rules), frozenset(keys), len(scoped))
+
+
+def threshold_config(temp_max: float, co2_max: float, hum_min: float, light_max: float) -> dict:
+    """Pravila ekvivalentna starim env pragovima (TEMP_MAX, CO2_MAX, HUM_MIN, LIGHT_MAX)."""
+    return {"rules": [
+        {"event": "HIGH_TEMPERATURE", "field": "temperature_c", "op": ">", "value": temp_max},
+        {"event": "HIGH_CO2", "field": "co2_ppm", "op": ">", "value": co2_max},
+        {"event": "LOW_HUMIDITY", "field": "humidity_percent", "op": "<", "value": hum_min},
+        {"event": "HIGH_LIGHT", "field": "light_lux", "op": ">", "value": light_max},
+    ]}
+
+
+class RuleEngine:
+    def __init__(self, path: str, fallback: dict, poll_s: float = 2.0):
+        self.path = path
+        self.poll_s = poll_s
+        self.rules = compile_rules(fallback)  # dok fajl ne postoji
+        self.active = set()  # (source_id, rule.key) aktivnih stateful pravila; menja ga samo MQTT thread
+        self._state_for = self.rules
+        self.reloads = 0
+        self._sig = None
+        self._stop = threading.Event()
+        self._bad_value = set()  # rule.key za koje je vec logovana neispravna vrednost
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def load(self) -> bool:
+        """Ucita fajl ako se promenio; vraca True ako su pravila zamenjena."""
+        sig = self._signature()
+        if sig == self._sig:
+            return False
+        self._sig = sig
+        if sig is None:
+            print(f"[eventmanager] rules file {self.path} not found, keeping {self.rules.n_rules} current rules")
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                rules = compile_rules(json.load(f))
+        except Exception as e:
+            print(f"[eventmanager] rules reload failed, keeping current rules: {e}")
+            return False
+        self.rules = rules  # atomska zamena; evaluate uzima jednu referencu po poruci
+        self.reloads += 1
+        print(f"[eventmanager] loaded {rules.n_rules} rules from {self.path} "
+              f"({len(rules.by_source)} sources with own rules, {len(rules.default)} default)")
+        return True
+
+    def evaluate(self, reading: dict) -> list:
+        """[(rule, event_type, vrednost)] za reading."""
+        rules = self.rules
+        if rules is not self._state_for:
+            # posle reload-a: izbaci stanje pravila kojih vise nema
+            self.active = {k for k in self.active if k[1] in rules.keys}
+            self._state_for = rules
+        sid = reading.get("source_id")
+        out = []
+        for rule in rules.for_source(sid):
+            v = reading.get(rule.field)
+            if v is None:
+                continue
+            if rule.numeric:
+                try:
+                    v = float(v)
+                except (TypeError, ValueError):
+                    if rule.key not in self._bad_value:
+                        self._bad_value.add(rule.key)
+                        print(f"[eventmanager] rule {rule.key}: {rule.field}={v!r} is not a number, skipping rule")
+                    continue
+            if not rule.stateful:
+                if rule.op(v, rule.value):
+                    out.append((rule, rule.event, v))
+                continue
+            k = (sid, rule.key)
+            was = k in self.active
+            now = rule.op(v, rule.hold if was else rule.value)
+            if now:
+                self.active.add(k)
+                if not (rule.edge and was):
+                    out.append((rule, rule.event, v))
+            elif was:
+                self.active.discard(k)
+                if rule.clear_event:
+                    out.append((rule, rule.clear_event, v))
+        return out
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_s):
+            try:
+                self.load()
+            except Exception as e:
+                print(f"[eventmanager] rules watch failed: {e}")
+
+    def start_watching(self) -> None:
+        threading.Thread(target=self._watch, name="rules-watch", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -16,11 +16,14 @@ export type Reading = {
 
 export type CreateReadingRequest = { reading: Reading };
 export type GetReadingRequest = { id: string };
-export type UpdateReadingRequest = { id: string; reading: Reading };
+export type FieldMask = { paths: string[] };
+export type UpdateReadingRequest = { id: string; reading: Reading; update_mask?: FieldMask };
 export type DeleteReadingRequest = { id: string };
 
 export type ReadingResponse = { reading: Required<Reading> };
 export type DeleteReadingResponse = { deleted: boolean };
+export type BatchUpdateReadingsRequest = { updates: UpdateReadingRequest[] };
+export type BatchUpdateReadingsResponse = { readings: Required<Reading>[]; not_found_ids: string[] };
 
 export type ListReadingsRequest = {
   from_ts?: Timestamp;
@@ -57,6 +60,7 @@ export interface ReadingServiceGrpc {
   CreateReading(req: CreateReadingRequest): any;
   GetReading(req: GetReadingRequest): any;
   UpdateReading(req: UpdateReadingRequest): any;
+  BatchUpdateReadings(req: BatchUpdateReadingsRequest): any;
   DeleteReading(req: DeleteReadingRequest): any;
   ListReadings(req: ListReadingsRequest): any;
   Aggregate(req: AggregateRequest): any;
@@ -1,5 +1,7 @@
 import {
   BadRequestException,
+  HttpException,
+  HttpStatus,
   Inject,
   Injectable,
   InternalServerErrorException,
@@ -20,12 +22,24 @@ import { toTimestamp, fromTimestamp } from './time';
 
 function mapGrpcError(e: any): never {
   // gRPC status codes:
-  // 3 INVALID_ARGUMENT, 5 NOT_FOUND, 13 INTERNAL, ...
+  // 3 INVALID_ARGUMENT, 5 NOT_FOUND, 8 RESOURCE_EXHAUSTED, 13 INTERNAL, ...
   const code = e?.code;
   const message = e?.details || e?.message || 'gRPC error';
 
   if (code === 3) throw new BadRequestException(message);
   if (code === 5) throw new NotFoundException(message);
+  if (code === 8) {
+    // datamanager admission control: retry-after-ms stize u trailing metadata
+    const retry = Number(e?.metadata?.get?.('retry-after-ms')?.[0]);
+    throw new HttpException(
+      {
+        statusCode: HttpStatus.TOO_MANY_REQUESTS,
+        message,
+        retry_after_ms: Number.isFinite(retry) ? retry : undefined,
+      },
+      HttpStatus.TOO_MANY_REQUESTS,
+    );
+  }
 
   throw new InternalServerErrorException(message);
 }
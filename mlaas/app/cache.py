@@ -0,0 +1,93 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from . import metrics
+
+# LRU kes predikcija: kljuc = (verzija modela, feature vektor zaokruzen na zadatu preciznost).
+# senzori u mirnim sobama salju skoro iste vektore, pa pogodak preskace model u potpunosti
+
+DEFAULT_DECIMALS = {"temp": 2, "hum": 1, "light": 0, "co2": 0}
+
+
+def parse_decimals(spec: str, feature_names) -> list[int]:
+    """
+    "temp=2,hum=1,light=0,co2=0,co2_std=1" -> broj decimala po feature-u (redom kao feature_names).
+    Puno ime feature-a ima prednost nad prefiksom.
+    """
+    overrides = dict(DEFAULT_DECIMALS)
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, val = part.partition("=")
+        overrides[name.strip()] = int(val)
+
+    out = []
+    for n in feature_names:
+        prefix = n.partition("_")[0]
+        if n in overrides:
+            out.append(overrides[n])
+        elif prefix in overrides:
+            out.append(overrides[prefix])
+        else:
+            raise ValueError(f"no cache precision for feature {n}")
+    return out
+
+
+class PredictionCache:
+    def __init__(self, max_size: int, decimals):
+        self.max_size = max(1, max_size)
+        self.scale = 10.0 ** np.asarray(decimals, dtype=float)
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def keys_for(self, version: str, x: np.ndarray) -> list[tuple]:
+        q = np.rint(x * self.scale).astype(np.int64)
+        return [(version, *row) for row in q.tolist()]
+
+    def score(self, version: str, x: np.ndarray, predict_proba) -> np.ndarray:
+        """P(class=1) po redu; model (predict_proba, N x 2) se zove samo za promasaje."""
+        keys = self.keys_for(version, x)
+        out = np.empty(len(keys), dtype=float)
+        miss = []
+        with self._lock:
+            for i, k in enumerate(keys):
+                p = self._data.get(k)
+                if p is None:
+                    miss.append(i)
+                else:
+                    self._data.move_to_end(k)
+                    out[i] = p
+
+        metrics.prediction_cache_hits.inc(len(keys) - len(miss))
+        metrics.prediction_cache_misses.inc(len(miss))
+        if not miss:
+            return out
+
+        probs = predict_proba(x[miss])[:, 1]
+        out[miss] = probs
+        evicted = 0
+        with self._lock:
+            for i, p in zip(miss, probs.tolist()):
+                self._data[keys[i]] = p
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                evicted += 1
+        if evicted:
+            metrics.prediction_cache_evictions.inc(evicted)
+        return out
+
+    def invalidate(self, versions) -> None:
+        """Izbacuje unose za date verzije (npr. model te verzije je ponovo ucitan)."""
+        versions = set(versions)
+        with self._lock:
+            before = len(self._data)
+            self._data = OrderedDict((k, p) for k, p in self._data.items() if k[0] not in versions)
+            after = len(self._data)
+        if before != after:
+            print(f"[mlaas] prediction cache flushed {before - after} entries for versions={sorted(versions)}")
@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+import numpy as np
+
+from . import metrics
+
+# server-side micro-batching: pojedinacni /predict zahtevi se skupljaju max_wait_s
+# (ili dok ih ne bude max_batch) i boduju jednim vektorizovanim predict_proba pozivom
+
+
+class Coalescer:
+    def __init__(self, score, max_batch: int, max_wait_s: float):
+        self.score = score  # np.ndarray (N x 12) -> (np.ndarray (N,), tag), tag = npr. verzija modela
+        self.max_batch = max(1, max_batch)
+        self.max_wait_s = max(0.0, max_wait_s)
+        self._pending = []  # (red, future, vreme ulaska)
+        self._timer = None
+
+    async def submit(self, row) -> tuple[float, object]:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((row, fut, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_s, self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        now = time.perf_counter()
+        metrics.coalesced_batch_size.observe(len(batch))
+        for _, _, t in batch:
+            metrics.coalesce_queue_wait_ms.observe((now - t) * 1000.0)
+
+        # model radi u thread-u da event loop nastavi da prima zahteve
+        x = np.array([row for row, _, _ in batch], dtype=float)
+        task = asyncio.ensure_future(asyncio.to_thread(self.score, x))
+        task.add_done_callback(lambda t: self._resolve(batch, t))
+
+    @staticmethod
+    def _resolve(batch, task) -> None:
+        err = task.exception()
+        if err is not None:
+            for _, fut, _ in batch:
+                if not fut.done():
+                    fut.set_exception(err)
+            return
+        probs, tag = task.result()
+        for (_, fut, _), p in zip(batch, probs):
+            if not fut.done():  # klijent je mozda odustao
+                fut.set_result((float(p), tag))
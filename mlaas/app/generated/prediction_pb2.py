@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: prediction.proto
+# Protobuf Python Version: 6.31.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    6,
+    31,
+    1,
+    '',
+    'prediction.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x10prediction.proto\x12\x05mlaas\"l\n\x0ePredictRequest\x12\x12\n\nreading_id\x18\x01 \x01(\t\x12\x11\n\tsource_id\x18\x02 \x01(\x05\x12\n\n\x02ts\x18\x03 \x01(\t\x12\x10\n\x08\x66\x65\x61tures\x18\x04 \x03(\x01\x12\x15\n\rmodel_version\x18\x05 \x01(\t\"\x84\x01\n\x0fPredictResponse\x12\x12\n\nreading_id\x18\x01 \x01(\t\x12\x11\n\tsource_id\x18\x02 \x01(\x05\x12\n\n\x02ts\x18\x03 \x01(\t\x12\x12\n\nprediction\x18\x04 \x01(\x05\x12\x13\n\x0bprobability\x18\x05 \x01(\x01\x12\x15\n\rmodel_version\x18\x06 \x01(\t2\x91\x01\n\x11PredictionService\x12\x38\n\x07Predict\x12\x15.mlaas.PredictRequest\x1a\x16.mlaas.PredictResponse\x12\x42\n\rPredictStream\x12\x15.mlaas.PredictRequest\x1a\x16.mlaas.PredictResponse(\x01\x30\x01\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'prediction_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_PREDICTREQUEST']._serialized_start=27
+  _globals['_PREDICTREQUEST']._serialized_end=135
+  _globals['_PREDICTRESPONSE']._serialized_start=138
+  _globals['_PREDICTRESPONSE']._serialized_end=270
+  _globals['_PREDICTIONSERVICE']._serialized_start=273
+  _globals['_PREDICTIONSERVICE']._serialized_end=418
+# @@protoc_insertion_point(module_scope)
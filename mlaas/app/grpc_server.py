@@ -0,0 +1,94 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import grpc
+from fastapi import HTTPException
+
+GEN_DIR = Path(__file__).resolve().parent / "generated"
+if str(GEN_DIR) not in sys.path:
+    sys.path.insert(0, str(GEN_DIR))
+
+from .generated import prediction_pb2 as pb2
+from .generated import prediction_pb2_grpc as pb2_grpc
+from . import metrics
+
+# gRPC PredictionService: isti model kao FastAPI (score_row iz main.py), bez JSON-a i Pydantic-a
+
+STREAM_WINDOW = 256  # max predikcija "u letu" po stream-u
+
+
+class PredictionService(pb2_grpc.PredictionServiceServicer):
+    def __init__(self, score_row, n_features: int):
+        self.score_row = score_row  # async (list[float], verzija | None) -> (float, verzija koja je bodovala)
+        self.n_features = n_features
+
+    async def _score(self, req: pb2.PredictRequest) -> pb2.PredictResponse:
+        t0 = time.perf_counter()
+        if len(req.features) != self.n_features:
+            raise ValueError(f"expected {self.n_features} features, got {len(req.features)}")
+        row = list(req.features)
+        metrics.feature_assembly_ms.labels("grpc").observe(metrics.since_ms(t0))
+        proba, version = await self.score_row(row, req.model_version or None)
+        metrics.request_total_ms.labels("grpc").observe(metrics.since_ms(t0))
+        return pb2.PredictResponse(
+            reading_id=req.reading_id,
+            source_id=req.source_id,
+            ts=req.ts,
+            prediction=int(proba >= 0.5),
+            probability=proba,
+            model_version=version,
+        )
+
+    @staticmethod
+    async def _abort(context, e: Exception):
+        if isinstance(e, ValueError):
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        if isinstance(e, HTTPException) and e.status_code == 404:
+            await context.abort(grpc.StatusCode.NOT_FOUND, str(e.detail))
+        if isinstance(e, HTTPException) and e.status_code == 503:
+            await context.abort(grpc.StatusCode.UNAVAILABLE, str(e.detail))
+        await context.abort(grpc.StatusCode.INTERNAL, str(e))
+
+    async def Predict(self, request: pb2.PredictRequest, context: grpc.aio.ServicerContext):
+        try:
+            return await self._score(request)
+        except Exception as e:
+            await self._abort(context, e)
+
+    async def PredictStream(self, request_iterator, context: grpc.aio.ServicerContext):
+        # zahtevi se boduju paralelno (coalescer ih spaja u batch), odgovori idu redom
+        pending: asyncio.Queue = asyncio.Queue(maxsize=STREAM_WINDOW)
+
+        async def reader():
+            async for req in request_iterator:
+                await pending.put(asyncio.ensure_future(self._score(req)))
+            await pending.put(None)
+
+        reader_task = asyncio.create_task(reader())
+        try:
+            while True:
+                fut = await pending.get()
+                if fut is None:
+                    break
+                try:
+                    resp = await fut
+                except Exception as e:
+                    await self._abort(context, e)
+                yield resp
+            await reader_task
+        finally:
+            reader_task.cancel()
+            while not pending.empty():
+                fut = pending.get_nowait()
+                if fut is not None:
+                    fut.cancel()
+
+
+async def start_server(host: str, port: int, service: PredictionService) -> grpc.aio.Server:
+    server = grpc.aio.server()
+    pb2_grpc.add_PredictionServiceServicer_to_server(service, server)
+    server.add_insecure_port(f"{host}:{port}")
+    await server.start()
+    return server
@@ -1,78 +1,285 @@
 import os
-import joblib
+import time
 import numpy as np
 from fastapi import FastAPI, HTTPException
-from .schemas import PredictRequest, PredictResponse
+from starlette.concurrency import run_in_threadpool
+from . import metrics
+from .cache import PredictionCache, parse_decimals
+from .coalescer import Coalescer
+from .grpc_server import PredictionService, start_server
+from .registry import LINEAR_FILE, META_FILE, SKLEARN_FILE, ModelRegistry, load_model_files
+from .shadow import ShadowScorer
+from .schemas import Features, PredictRequest, PredictResponse, PredictBatchRequest, PredictBatchResponse
 
 MODEL_PATH = os.getenv("MODEL_PATH", "/app/model.joblib")
-MODEL_VERSION = os.getenv("MODEL_VERSION", "1.0.0")
+MODEL_META_PATH = os.getenv("MODEL_META_PATH", "/app/model.meta.json")
+MODEL_VERSION = os.getenv("MODEL_VERSION", "1.0.0")  # samo ako meta nema model_version
+# kompaktni linearni model iz train.py; sklearn (MODEL_PATH) ostaje kao fallback
+LINEAR_MODEL_PATH = os.getenv("LINEAR_MODEL_PATH", "/app/model.linear.json")
+MODEL_SCORER = os.getenv("MODEL_SCORER", "auto").lower()  # auto | linear | sklearn
+SCORER_VERIFY = os.getenv("SCORER_VERIFY", "false").lower() in ("1", "true", "yes", "y")
+# vise workera (uvicorn --workers / WEB_CONCURRENCY): sklearn nizovi se mapiraju iz fajla umesto kopije po procesu
+MODEL_MMAP = os.getenv("MODEL_MMAP", "true").lower() in ("1", "true", "yes", "y")
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "1000"))
+
+# registar modela (poddirektorijum po verziji); prazno -> jedan model iz MODEL_PATH/LINEAR_MODEL_PATH
+MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", "")
+MODEL_REGISTRY_POLL_S = float(os.getenv("MODEL_REGISTRY_POLL_S", "2"))
+MODEL_DEFAULT_VERSION = os.getenv("MODEL_DEFAULT_VERSION", "")  # prazno -> najnoviji trained_at
+MODEL_SHADOW_VERSION = os.getenv("MODEL_SHADOW_VERSION", "")
+SHADOW_QUEUE_MAX = int(os.getenv("SHADOW_QUEUE_MAX", "10000"))
+SHADOW_MAX_BATCH = int(os.getenv("SHADOW_MAX_BATCH", "256"))
+
+# opt-in micro-batching za /predict (bez promene na klijentima)
+COALESCE_ENABLED = os.getenv("COALESCE_ENABLED", "false").lower() in ("1", "true", "yes", "y")
+COALESCE_MAX_WAIT_MS = float(os.getenv("COALESCE_MAX_WAIT_MS", "2"))
+COALESCE_MAX_BATCH = int(os.getenv("COALESCE_MAX_BATCH", "64"))
+
+# opt-in LRU kes predikcija po (verziji, zaokruzenim feature-ima); decimale po feature-u ili prefiksu
+PREDICT_CACHE_ENABLED = os.getenv("PREDICT_CACHE_ENABLED", "false").lower() in ("1", "true", "yes", "y")
+PREDICT_CACHE_SIZE = int(os.getenv("PREDICT_CACHE_SIZE", "100000"))
+PREDICT_CACHE_DECIMALS = os.getenv("PREDICT_CACHE_DECIMALS", "temp=2,hum=1,light=0,co2=0")
+
+# gRPC PredictionService pored REST-a (isti proces, isti model)
+GRPC_ENABLED = os.getenv("GRPC_ENABLED", "true").lower() in ("1", "true", "yes", "y")
+GRPC_HOST = os.getenv("GRPC_HOST", "0.0.0.0")
+GRPC_PORT = int(os.getenv("GRPC_PORT", "50052"))
+
+# /metrics sa vise workera: snapshot-i svih workera se sabiraju preko deljenog direktorijuma
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1") or "1")
+METRICS_SHARED_DIR = os.getenv("METRICS_SHARED_DIR", "/tmp/mlaas-metrics")  # prazno -> samo ovaj proces
+METRICS_FLUSH_S = float(os.getenv("METRICS_FLUSH_S", "1"))
 
 app = FastAPI(title="MLaaS", version=MODEL_VERSION)
+app.router.route_class = metrics.TimedRoute  # latencija po endpointu u /metrics
 
-model = None  # ucitamo na startup
+FEATURE_NAMES = list(Features.model_fields)
 
 
-def _patch_logreg(obj):
-    """
-    Patch za sklearn LogisticRegression modele ucitane iz starijih joblib/pickle fajlova.
-    Ako je Pipeline, patchuje i korake.
-    """
-    # Pipeline support (bez dodatnog importa)
-    if hasattr(obj, "steps") and isinstance(getattr(obj, "steps"), list):
-        for _, step in obj.steps:
-            _patch_logreg(step)
+def load_version_dir(d: str):
+    return load_model_files(
+        os.path.join(d, LINEAR_FILE),
+        os.path.join(d, SKLEARN_FILE),
+        os.path.join(d, META_FILE),
+        FEATURE_NAMES,
+        MODEL_SCORER,
+        SCORER_VERIFY,
+        fallback_version=os.path.basename(d),
+        mmap=MODEL_MMAP,
+    )
 
-    try:
-        from sklearn.linear_model import LogisticRegression
-        if isinstance(obj, LogisticRegression) and not hasattr(obj, "multi_class"):
-            # fallback za stare dump-ove
-            obj.multi_class = "auto"
-    except Exception:
-        # ako sklearn nije tu ili import fail — ignorisi
-        pass
 
-    return obj
+registry = ModelRegistry(load_version_dir, MODEL_REGISTRY_DIR, MODEL_DEFAULT_VERSION, MODEL_REGISTRY_POLL_S)
+coalescers = {}  # trazena verzija ("" = default) -> Coalescer
+cache = None
+shadow = None
+grpc_server = None
+shared_metrics = None
 
-# ucitam model
+
+# ucitam model(e)
 @app.on_event("startup")
 def _startup():
-    global model
-    m = joblib.load(MODEL_PATH)
-    model = _patch_logreg(m)
-    print(f"[mlaas] loaded model from {MODEL_PATH}, version={MODEL_VERSION}")
+    global cache
+    if PREDICT_CACHE_ENABLED:
+        cache = PredictionCache(PREDICT_CACHE_SIZE, parse_decimals(PREDICT_CACHE_DECIMALS, FEATURE_NAMES))
+        registry.add_listener(cache.invalidate)  # novi/izmenjeni model -> stari rezultati ne vaze
+        print(f"[mlaas] prediction cache enabled size={PREDICT_CACHE_SIZE} decimals={PREDICT_CACHE_DECIMALS}")
+
+    if MODEL_REGISTRY_DIR:
+        registry.scan()
+        registry.start_watching()
+        print(f"[mlaas] watching model registry {MODEL_REGISTRY_DIR} every {MODEL_REGISTRY_POLL_S}s")
+    else:
+        m = load_model_files(
+            LINEAR_MODEL_PATH, MODEL_PATH, MODEL_META_PATH,
+            FEATURE_NAMES, MODEL_SCORER, SCORER_VERIFY, fallback_version=MODEL_VERSION, mmap=MODEL_MMAP,
+        )
+        registry.set_single(m)
+        print(f"[mlaas] loaded {m.kind} model from {m.path}, version={m.version}")
+
+    if COALESCE_ENABLED:
+        print(f"[mlaas] coalescing enabled max_batch={COALESCE_MAX_BATCH} max_wait_ms={COALESCE_MAX_WAIT_MS}")
+
+
+@app.on_event("startup")
+async def _start_shadow():
+    global shadow
+    if not MODEL_SHADOW_VERSION:
+        return
+    shadow = ShadowScorer(registry, MODEL_SHADOW_VERSION, SHADOW_QUEUE_MAX, SHADOW_MAX_BATCH)
+    shadow.start()
+    print(f"[mlaas] shadow scoring with version={MODEL_SHADOW_VERSION}")
+
+
+@app.on_event("shutdown")
+async def _stop_shadow():
+    registry.stop()
+    if shadow is not None:
+        await shadow.stop()
+
+
+@app.on_event("startup")
+def _start_shared_metrics():
+    global shared_metrics
+    if WEB_CONCURRENCY <= 1 or not METRICS_SHARED_DIR:
+        return
+    shared_metrics = metrics.SharedSnapshots(METRICS_SHARED_DIR, METRICS_FLUSH_S, local_metrics)
+    shared_metrics.start()
+    print(f"[mlaas] metrics shared across workers via {shared_metrics.dir} every {METRICS_FLUSH_S}s")
+
+
+@app.on_event("shutdown")
+def _stop_shared_metrics():
+    if shared_metrics is not None:
+        shared_metrics.stop()
+        shared_metrics.write()  # poslednje stanje ostaje za ostale workere
+
+
+@app.on_event("startup")
+async def _start_grpc():
+    global grpc_server
+    if not GRPC_ENABLED:
+        return
+    # sa vise workera svaki proces binduje isti port (grpc koristi SO_REUSEPORT), kernel deli konekcije
+    service = PredictionService(score_row, len(FEATURE_NAMES))
+    grpc_server = await start_server(GRPC_HOST, GRPC_PORT, service)
+    print(f"[mlaas] gRPC PredictionService listening on {GRPC_HOST}:{GRPC_PORT}")
+
+
+@app.on_event("shutdown")
+async def _stop_grpc():
+    if grpc_server is not None:
+        await grpc_server.stop(grace=5)
 
 
 @app.get("/health")
 def health():
-    return {"ok": True, "model_version": MODEL_VERSION}
+    models = registry.models
+    default = models.get(registry.default_version)
+    return {
+        "ok": True,
+        "model_version": registry.default_version,
+        "scorer": default.kind if default else None,
+        "versions": {v: m.kind for v, m in sorted(models.items())},
+        "shadow_version": MODEL_SHADOW_VERSION or None,
+        "pid": os.getpid(),
+    }
 
 
-@app.post("/predict", response_model=PredictResponse)
-def predict(req: PredictRequest):
-    if model is None:
-        raise HTTPException(status_code=503, detail="Model not loaded")
+def local_metrics() -> dict:
+    snap = metrics.snapshot()
+    snap["prediction_cache"]["size"] = len(cache) if cache is not None else 0
+    return snap
+
+
+@app.get("/metrics")
+def get_metrics():
+    # sa vise workera: zbir svih workera (workers.pids); inace samo ovaj proces
+    if shared_metrics is not None:
+        return shared_metrics.collect()
+    snap = local_metrics()
+    snap["workers"] = {"pid": os.getpid(), "pids": [os.getpid()]}
+    return snap
+
 
-    f = req.features
-    x = np.array([[
+def feature_row(f) -> list[float]:
+    # redosled kao MODEL_FEATURE_NAMES u train.py
+    return [
         f.temp_mean, f.temp_std,
         f.hum_mean, f.hum_std,
         f.light_mean, f.light_std,
         f.co2_mean, f.co2_std,
-        f.temp_last, f.hum_last, f.light_last, f.co2_last
-    ]], dtype=float)
+        f.temp_last, f.hum_last, f.light_last, f.co2_last,
+    ]
+
+
+def get_model(version: str | None = None):
+    try:
+        return registry.get(version)
+    except KeyError:
+        if not registry.models:
+            raise HTTPException(status_code=503, detail="Model not loaded")
+        raise HTTPException(status_code=404, detail=f"Unknown model version: {version}")
+
+
+def predict_proba(x: np.ndarray, version: str | None = None) -> tuple[np.ndarray, str]:
+    """x: N x 12 -> (P(class=1) za svaki red, verzija koja je bodovala), jedan poziv modela."""
+    m = get_model(version)  # snapshot: reload u toku ne menja model ovog zahteva
 
     # sigurnosno: ako model nema predict_proba, fail jasno
-    if not hasattr(model, "predict_proba"):
+    if not hasattr(m.model, "predict_proba"):
         raise HTTPException(status_code=500, detail="Model does not support predict_proba")
 
-    proba = float(model.predict_proba(x)[0, 1])  # P(class=1)
-    pred = int(proba >= 0.5)
+    t0 = time.perf_counter()
+    if cache is not None:
+        probs = cache.score(m.version, x, m.model.predict_proba)
+    else:
+        probs = m.model.predict_proba(x)[:, 1]
+    metrics.observe_scoring(x, probs, m.version, metrics.since_ms(t0))
+    return probs, m.version
 
+
+def to_response(req: PredictRequest, proba: float, version: str) -> PredictResponse:
     return PredictResponse(
         reading_id=req.reading_id,
         source_id=req.source_id,
         ts=req.ts,
-        prediction=pred,
+        prediction=int(proba >= 0.5),
         probability=proba,
-        model_version=MODEL_VERSION,
-    )
\ No newline at end of file
+        model_version=version,
+    )
+
+
+def get_coalescer(version: str | None) -> Coalescer:
+    key = version or ""
+    c = coalescers.get(key)
+    if c is None:
+        if version:
+            get_model(version)  # 404 pre nego sto napravimo coalescer za nepostojecu verziju
+        c = Coalescer(lambda x: predict_proba(x, version), COALESCE_MAX_BATCH, COALESCE_MAX_WAIT_MS / 1000.0)
+        coalescers[key] = c
+    return c
+
+
+async def score_row(row, version: str | None = None) -> tuple[float, str]:
+    # jedan red (REST /predict i gRPC): preko coalescer-a ako je ukljucen
+    if COALESCE_ENABLED:
+        proba, served = await get_coalescer(version).submit(row)
+    else:
+        x = np.array([row], dtype=float)
+        probs, served = await run_in_threadpool(predict_proba, x, version)
+        proba = float(probs[0])  # P(class=1)
+    if shadow is not None:
+        shadow.offer([row], [proba], served)
+    return proba, served
+
+
+@app.post("/predict", response_model=PredictResponse)
+async def predict(req: PredictRequest, model_version: str | None = None):
+    metrics.mark_parsed("/predict")
+    t0 = time.perf_counter()
+    row = feature_row(req.features)
+    metrics.feature_assembly_ms.labels("/predict").observe(metrics.since_ms(t0))
+    proba, served = await score_row(row, model_version)
+    return to_response(req, proba, served)
+
+
+@app.post("/predict/batch", response_model=PredictBatchResponse)
+async def predict_batch(req: PredictBatchRequest, model_version: str | None = None):
+    metrics.mark_parsed("/predict/batch")
+    n = len(req.items)
+    if n > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch too large ({n} > {MAX_BATCH_SIZE})")
+    if n == 0:
+        return PredictBatchResponse(items=[])
+
+    # N x 12 matrica -> jedan predict_proba za ceo batch
+    t0 = time.perf_counter()
+    rows = [feature_row(it.features) for it in req.items]
+    x = np.array(rows, dtype=float)
+    metrics.feature_assembly_ms.labels("/predict/batch").observe(metrics.since_ms(t0))
+    probs, served = await run_in_threadpool(predict_proba, x, model_version)
+    if shadow is not None:
+        shadow.offer(rows, probs, served)
+    return PredictBatchResponse(items=[to_response(it, float(p), served) for it, p in zip(req.items, probs)])
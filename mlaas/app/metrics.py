@@ -0,0 +1,347 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+import numpy as np
+from fastapi.routing import APIRoute
+
+from .schemas import Features
+
+# jednostavni histogrami (fiksni bucket-i), dovoljno jeftini da stalno rade u produkciji
+
+
+class Histogram:
+    def __init__(self, bounds, lock=None):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # poslednji = +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = lock or threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += value
+
+    def observe_many(self, values: np.ndarray) -> None:
+        # vektorski (batch): jedan searchsorted + bincount umesto petlje
+        idx = np.searchsorted(self.bounds, values, side="left")
+        counts = np.bincount(idx, minlength=len(self.counts))
+        total = float(np.sum(values))
+        with self._lock:
+            for i, c in enumerate(counts.tolist()):
+                self.counts[i] += c
+            self.count += len(values)
+            self.sum += total
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self.counts)
+            count, total = self.count, self.sum
+        buckets = {}
+        cum = 0
+        for b, c in zip(self.bounds + ["+Inf"], counts):
+            cum += c
+            buckets[f"le_{b}"] = cum
+        return {
+            "count": count,
+            "sum": total,
+            "mean": (total / count) if count else 0.0,
+            "buckets": buckets,
+        }
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, n: int = 1) -> None:
+        with self._lock:
+            self.value += n
+
+
+class LabeledHistogram:
+    """Histogram po labeli (npr. endpoint); labele se prave lenjo."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self._by_label: dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, label: str) -> Histogram:
+        h = self._by_label.get(label)
+        if h is None:
+            with self._lock:
+                h = self._by_label.setdefault(label, Histogram(self.bounds))
+        return h
+
+    def snapshot(self) -> dict:
+        return {k: h.snapshot() for k, h in sorted(self._by_label.items())}
+
+
+class LabeledCounter:
+    def __init__(self):
+        self._values: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label: str, n: int = 1) -> None:
+        with self._lock:
+            self._values[label] = self._values.get(label, 0) + n
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(sorted(self._values.items()))
+
+
+class FeatureHistograms:
+    """Po jedan histogram za svaku kolonu ulazne matrice (drift ulaza)."""
+
+    SMALL_BATCH = 8  # do ovoliko redova bisect petlja je jeftinija od numpy poziva
+
+    def __init__(self, names, bounds_for):
+        self.names = list(names)
+        self._lock = threading.Lock()  # jedan lock za sve kolone
+        self.hists = [Histogram(bounds_for(n), self._lock) for n in self.names]
+
+    def observe_rows(self, x: np.ndarray) -> None:
+        if len(x) <= self.SMALL_BATCH:
+            for row in x.tolist():
+                idx = [bisect.bisect_left(h.bounds, v) for h, v in zip(self.hists, row)]
+                with self._lock:
+                    for h, i, v in zip(self.hists, idx, row):
+                        h.counts[i] += 1
+                        h.count += 1
+                        h.sum += v
+        else:
+            for j, h in enumerate(self.hists):
+                h.observe_many(x[:, j])
+
+    def snapshot(self) -> dict:
+        return {n: h.snapshot() for n, h in zip(self.names, self.hists)}
+
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+LATENCY_MS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 50, 100, 250, 1000)
+ABS_DIFF_BUCKETS = (1e-6, 1e-4, 1e-3, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0)
+PROBABILITY_BUCKETS = (0.01, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 0.99)
+
+# bucket-i ulaznih feature-a (opsezi iz occupancy dataseta), po prefiksu/sufiksu imena
+FEATURE_BUCKETS = {
+    "temp": (16, 18, 19, 20, 21, 22, 23, 24, 25, 26, 28, 30),
+    "hum": (15, 20, 22.5, 25, 27.5, 30, 32.5, 35, 40),
+    "light": (0, 10, 50, 100, 200, 300, 400, 500, 750, 1000, 1500),
+    "co2": (400, 450, 500, 600, 700, 800, 1000, 1200, 1500, 2000),
+}
+STD_BUCKETS = {
+    "temp": (0.01, 0.05, 0.1, 0.2, 0.5, 1, 2),
+    "hum": (0.01, 0.05, 0.1, 0.2, 0.5, 1, 2, 3),
+    "light": (0.1, 1, 5, 10, 25, 50, 100, 250, 500),
+    "co2": (1, 5, 10, 25, 50, 100, 200, 400),
+}
+
+
+def feature_bounds(name: str):
+    prefix, _, kind = name.partition("_")
+    return (STD_BUCKETS if kind == "std" else FEATURE_BUCKETS)[prefix]
+
+
+# coalescer (micro-batching)
+coalesced_batch_size = Histogram(BATCH_SIZE_BUCKETS)
+coalesce_queue_wait_ms = Histogram(LATENCY_MS_BUCKETS)
+
+# latencija po fazama, labela = endpoint ("/predict", "/predict/batch", "grpc")
+request_parse_ms = LabeledHistogram(LATENCY_MS_BUCKETS)  # citanje tela + pydantic validacija
+feature_assembly_ms = LabeledHistogram(LATENCY_MS_BUCKETS)
+request_total_ms = LabeledHistogram(LATENCY_MS_BUCKETS)  # od ulaska u route do odgovora
+predict_proba_ms = Histogram(LATENCY_MS_BUCKETS)  # sam poziv modela (po batch-u)
+predict_batch_size = Histogram(BATCH_SIZE_BUCKETS)  # redova po pozivu modela
+
+# po verziji modela
+predictions_by_version = LabeledCounter()  # broj bodovanih redova
+model_calls_by_version = LabeledCounter()  # broj poziva predict_proba
+
+# drift: ulazni feature-i i izlazna verovatnoca
+input_features = FeatureHistograms(list(Features.model_fields), feature_bounds)
+output_probability = Histogram(PROBABILITY_BUCKETS)
+
+# t0 tekuceg HTTP zahteva (postavlja TimedRoute, cita endpoint)
+request_started: ContextVar[float] = ContextVar("request_started", default=0.0)
+
+
+def since_ms(t0: float) -> float:
+    return (time.perf_counter() - t0) * 1000.0
+
+
+def mark_parsed(endpoint: str) -> None:
+    """Poziva se na ulazu u endpoint: sve do tad (telo, validacija) je parse."""
+    t0 = request_started.get()
+    if t0:
+        request_parse_ms.labels(endpoint).observe(since_ms(t0))
+
+
+class TimedRoute(APIRoute):
+    """Meri ukupno vreme route-a i postavlja request_started za mark_parsed."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        path = self.path
+
+        async def timed_handler(request):
+            t0 = time.perf_counter()
+            token = request_started.set(t0)
+            try:
+                return await handler(request)
+            finally:
+                request_started.reset(token)
+                request_total_ms.labels(path).observe(since_ms(t0))
+
+        return timed_handler
+
+
+def observe_scoring(x: np.ndarray, probs: np.ndarray, version: str, elapsed_ms: float) -> None:
+    predict_proba_ms.observe(elapsed_ms)
+    predict_batch_size.observe(len(x))
+    predictions_by_version.inc(version, len(x))
+    model_calls_by_version.inc(version)
+    input_features.observe_rows(x)
+    if len(probs) <= FeatureHistograms.SMALL_BATCH:
+        for p in probs.tolist():
+            output_probability.observe(p)
+    else:
+        output_probability.observe_many(probs)
+
+
+# kes predikcija (cache.py)
+prediction_cache_hits = Counter()
+prediction_cache_misses = Counter()
+prediction_cache_evictions = Counter()
+
+
+# shadow model (poredjenje sa primarnim, van hot path-a)
+shadow_scored = Counter()
+shadow_dropped = Counter()  # red pun -> preskoceno
+shadow_disagreements = Counter()  # razlicita klasa (prag 0.5)
+shadow_abs_diff = Histogram(ABS_DIFF_BUCKETS)
+
+
+def snapshot() -> dict:
+    return {
+        "latency_ms": {
+            "parse": request_parse_ms.snapshot(),
+            "feature_assembly": feature_assembly_ms.snapshot(),
+            "predict_proba": predict_proba_ms.snapshot(),
+            "total": request_total_ms.snapshot(),
+        },
+        "predict_batch_size": predict_batch_size.snapshot(),
+        "model_versions": {
+            "predictions": predictions_by_version.snapshot(),
+            "model_calls": model_calls_by_version.snapshot(),
+        },
+        "drift": {
+            "input_features": input_features.snapshot(),
+            "output_probability": output_probability.snapshot(),
+        },
+        "prediction_cache": {
+            "hits": prediction_cache_hits.value,
+            "misses": prediction_cache_misses.value,
+            "evictions": prediction_cache_evictions.value,
+            "hit_rate": prediction_cache_hits.value / max(1, prediction_cache_hits.value + prediction_cache_misses.value),
+        },
+        "coalesced_batch_size": coalesced_batch_size.snapshot(),
+        "coalesce_queue_wait_ms": coalesce_queue_wait_ms.snapshot(),
+        "shadow": {
+            "scored": shadow_scored.value,
+            "dropped": shadow_dropped.value,
+            "disagreements": shadow_disagreements.value,
+            "abs_diff": shadow_abs_diff.snapshot(),
+        },
+    }
+
+
+# Vise workera (WEB_CONCURRENCY > 1): svaki proces ima svoje histograme, pa bi /metrics vracao
+# brojeve onog workera koji je primio zahtev. Zato svaki worker periodicno upisuje svoj snapshot u
+# <dir>/<ppid>/<pid>.json, a /metrics sabira sve fajlove (tudji su stari najvise flush_s).
+# ppid = uvicorn supervisor, pa novi start servisa ne sabira fajlove prethodnog; fajl ugaslog
+# workera ostaje, da brojaci ne opadaju.
+
+
+def merge_snapshots(snaps: list) -> dict:
+    """Sabira snapshot-e workera (brojevi se sabiraju, mean/hit_rate se racunaju ponovo)."""
+
+    def add(a, b):
+        if isinstance(a, dict) and isinstance(b, dict):
+            out = dict(a)
+            for k, v in b.items():
+                out[k] = add(out[k], v) if k in out else v
+            return out
+        return a + b
+
+    def fix(d):
+        if isinstance(d, dict):
+            if "count" in d and "sum" in d and "mean" in d:
+                d["mean"] = (d["sum"] / d["count"]) if d["count"] else 0.0
+            if "hits" in d and "misses" in d and "hit_rate" in d:
+                d["hit_rate"] = d["hits"] / max(1, d["hits"] + d["misses"])
+            for v in d.values():
+                fix(v)
+        return d
+
+    merged = {}
+    for s in snaps:
+        merged = add(merged, s)
+    return fix(merged)
+
+
+class SharedSnapshots:
+    def __init__(self, root: str, flush_s: float, local):
+        self.dir = os.path.join(root, str(os.getppid()))
+        self.path = os.path.join(self.dir, f"{os.getpid()}.json")
+        self.flush_s = flush_s
+        self.local = local  # () -> snapshot ovog procesa
+        self._stop = threading.Event()
+
+    def write(self) -> dict:
+        snap = self.local()
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snap, f)
+        os.replace(tmp, self.path)
+        return snap
+
+    def collect(self) -> dict:
+        """Svez snapshot ovog workera + poslednji upisani ostalih, sabrani."""
+        own = self.write()
+        snaps, pids = [own], [os.getpid()]
+        for name in sorted(os.listdir(self.dir)):
+            if not name.endswith(".json") or name == os.path.basename(self.path):
+                continue
+            try:
+                with open(os.path.join(self.dir, name), "r", encoding="utf-8") as f:
+                    snaps.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # upravo se menja ili je osteceno; sledeci scrape ga uzima
+            pids.append(int(name[:-5]))
+        out = merge_snapshots(snaps)
+        out["workers"] = {"pid": os.getpid(), "pids": sorted(pids)}
+        return out
+
+    def _flush(self) -> None:
+        while not self._stop.wait(self.flush_s):
+            try:
+                self.write()
+            except Exception as e:
+                print(f"[mlaas] metrics flush failed: {e}")
+
+    def start(self) -> None:
+        os.makedirs(self.dir, exist_ok=True)
+        self.write()
+        threading.Thread(target=self._flush, name="metrics-flush", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
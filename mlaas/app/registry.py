@@ -0,0 +1,231 @@
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .scorer import LinearScorer
+
+# registar modela: svaki poddirektorijum MODEL_REGISTRY_DIR je jedna verzija
+#   <dir>/model.meta.json   (obavezan, upisuje se POSLEDNJI - oznaka da je verzija spremna)
+#   <dir>/model.linear.json i/ili <dir>/model.joblib
+#   meta "scorer": "sklearn" -> model.linear.json se ignorise (nelinearni model, npr. iz sweep.py)
+# verzija se cita iz meta ("model_version"); watcher u pozadini ucitava nove/izmenjene
+# verzije i atomski menja dict, pa zahtevi u toku zavrsavaju na starom modelu
+
+META_FILE = "model.meta.json"
+LINEAR_FILE = "model.linear.json"
+SKLEARN_FILE = "model.joblib"
+
+
+@dataclass
+class LoadedModel:
+    version: str
+    kind: str  # "linear" | "sklearn"
+    model: object  # ima predict_proba (N x 2)
+    path: str
+    meta: dict = field(default_factory=dict)
+
+    @property
+    def trained_at(self) -> str:
+        return str(self.meta.get("trained_at", ""))
+
+
+def _patch_logreg(obj):
+    """
+    Patch za sklearn LogisticRegression modele ucitane iz starijih joblib/pickle fajlova.
+    Ako je Pipeline, patchuje i korake.
+    """
+    # Pipeline support (bez dodatnog importa)
+    if hasattr(obj, "steps") and isinstance(getattr(obj, "steps"), list):
+        for _, step in obj.steps:
+            _patch_logreg(step)
+
+    try:
+        from sklearn.linear_model import LogisticRegression
+        if isinstance(obj, LogisticRegression) and not hasattr(obj, "multi_class"):
+            # fallback za stare dump-ove
+            obj.multi_class = "auto"
+    except Exception:
+        # ako sklearn nije tu ili import fail — ignorisi
+        pass
+
+    return obj
+
+def load_sklearn(path: str, mmap: bool = False):
+    import joblib  # sklearn se uvozi tek ovde (unpickle), linear putanja ga ne dira
+    # mmap_mode="r": numpy nizovi modela se mapiraju read-only iz fajla, pa svi uvicorn
+    # workeri dele iste stranice iz page cache-a (radi samo za nekompresovan joblib dump)
+    return _patch_logreg(joblib.load(path, mmap_mode="r" if mmap else None))
+
+
+def verify_linear(scorer: LinearScorer, sk_model, n: int = 1000) -> float:
+    """Max razlika izmedju linear scorer-a i sklearn pipeline-a na sintetickim redovima."""
+    rng = np.random.default_rng(0)
+    scaler = getattr(sk_model, "named_steps", {}).get("scaler")
+    mean = getattr(scaler, "mean_", None)
+    scale = getattr(scaler, "scale_", None)
+    x = rng.standard_normal((n, len(scorer.feature_names)))
+    if mean is not None and scale is not None:
+        x = mean + x * scale
+    ref = sk_model.predict_proba(x)[:, 1]
+    return float(np.max(np.abs(ref - scorer.predict_proba(x)[:, 1])))
+
+
+def read_meta(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def load_model_files(
+    linear_path: str,
+    sklearn_path: str,
+    meta_path: str,
+    feature_names: list,
+    scorer_mode: str = "auto",
+    verify: bool = False,
+    fallback_version: str = "",
+    mmap: bool = False,
+) -> LoadedModel:
+    meta = read_meta(meta_path)
+    version = str(meta.get("model_version") or fallback_version)
+
+    if meta.get("scorer") == "sklearn":
+        if scorer_mode == "linear":
+            raise ValueError(f"model version {version} has no linear form (meta scorer=sklearn)")
+        if os.path.exists(linear_path):
+            print(f"[mlaas] model version {version} is sklearn-only, ignoring {linear_path}")
+    elif scorer_mode in ("auto", "linear") and os.path.exists(linear_path):
+        try:
+            scorer = LinearScorer.load(linear_path)
+            if scorer.feature_names != feature_names:
+                raise ValueError(f"feature order mismatch: {scorer.feature_names}")
+            if verify:
+                sk_model = load_sklearn(sklearn_path, mmap)
+                diff = verify_linear(scorer, sk_model)
+                if diff > 1e-6:
+                    print(f"[mlaas] linear model differs from sklearn (max diff {diff:.2e}), using sklearn")
+                    return LoadedModel(version, "sklearn", sk_model, sklearn_path, meta)
+                print(f"[mlaas] linear model verified against sklearn (max diff {diff:.2e})")
+            return LoadedModel(version or scorer.version, "linear", scorer, linear_path, meta)
+        except Exception as e:
+            if scorer_mode == "linear":
+                raise
+            print(f"[mlaas] linear model unusable ({e}), falling back to sklearn")
+    return LoadedModel(version, "sklearn", load_sklearn(sklearn_path, mmap), sklearn_path, meta)
+
+
+class ModelRegistry:
+    def __init__(self, loader, registry_dir: str = "", default_version: str = "", poll_s: float = 2.0):
+        self.loader = loader  # (dir) -> LoadedModel
+        self.registry_dir = registry_dir
+        self.pinned_default = default_version
+        self.poll_s = poll_s
+        self.models: dict[str, LoadedModel] = {}
+        self.default_version = ""
+        self._sigs: dict[str, tuple] = {}  # dir -> mtime-ovi fajlova
+        self._by_dir: dict[str, LoadedModel] = {}
+        self._listeners = []
+        self._stop = threading.Event()
+
+    def add_listener(self, fn) -> None:
+        """fn(set verzija koje su dodate/izmenjene/uklonjene) - npr. flush kesa."""
+        self._listeners.append(fn)
+
+    def set_single(self, m: LoadedModel) -> None:
+        # rezim bez registra (MODEL_PATH/LINEAR_MODEL_PATH)
+        self.models = {m.version: m}
+        self.default_version = m.version
+
+    def get(self, version: str | None = None) -> LoadedModel:
+        models = self.models  # jedna referenca -> konzistentan snapshot
+        v = version or self.default_version
+        m = models.get(v)
+        if m is None:
+            raise KeyError(v)
+        return m
+
+    def _signature(self, d: str) -> tuple:
+        sig = []
+        for name in (META_FILE, LINEAR_FILE, SKLEARN_FILE):
+            try:
+                st = os.stat(os.path.join(d, name))
+                sig.append((name, st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                pass
+        return tuple(sig)
+
+    def scan(self) -> bool:
+        """Ucita nove/izmenjene verzije; vraca True ako se registar promenio."""
+        try:
+            entries = sorted(os.scandir(self.registry_dir), key=lambda e: e.name)
+        except FileNotFoundError:
+            entries = []
+        sigs = {}
+        for e in entries:
+            if e.is_dir() and os.path.exists(os.path.join(e.path, META_FILE)):
+                sigs[e.path] = self._signature(e.path)
+        if sigs == self._sigs:
+            return False
+
+        by_dir: dict[str, LoadedModel] = {}
+        for d, sig in sigs.items():
+            old = self._by_dir.get(d)
+            if old is not None and self._sigs.get(d) == sig:
+                by_dir[d] = old
+                continue
+            try:
+                by_dir[d] = self.loader(d)
+                print(f"[mlaas] registry loaded {by_dir[d].kind} model version={by_dir[d].version} from {d}")
+            except Exception as e:
+                print(f"[mlaas] registry failed to load {d}: {e}")
+                if old is not None:
+                    by_dir[d] = old  # zadrzi staru verziju
+
+        models: dict[str, LoadedModel] = {}
+        for m in by_dir.values():
+            cur = models.get(m.version)
+            if cur is not None:
+                print(f"[mlaas] registry: version {m.version} in {cur.path} and {m.path}, using newest")
+            if cur is None or m.trained_at > cur.trained_at:
+                models[m.version] = m
+
+        changed = {v for v in set(models) | set(self.models) if models.get(v) is not self.models.get(v)}
+        if self.pinned_default and self.pinned_default in models:
+            default = self.pinned_default
+        elif models:
+            default = max(models.values(), key=lambda m: m.trained_at).version
+        else:
+            default = ""
+
+        # atomska zamena
+        self.models = models
+        self.default_version = default
+        self._by_dir = by_dir
+        self._sigs = sigs
+
+        if changed:
+            print(f"[mlaas] registry versions={sorted(models)} default={default}")
+            for fn in self._listeners:
+                try:
+                    fn(changed)
+                except Exception as e:
+                    print(f"[mlaas] registry listener failed: {e}")
+        return bool(changed)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_s):
+            try:
+                self.scan()
+            except Exception as e:
+                print(f"[mlaas] registry scan failed: {e}")
+
+    def start_watching(self) -> None:
+        threading.Thread(target=self._watch, name="model-registry", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 class Features(BaseModel):
     # window agregati
@@ -30,3 +30,9 @@ class PredictResponse(BaseModel):
     prediction: int              # 0/1 occupancy
     probability: float           # npr. P(occupancy=1)
     model_version: str
+
+class PredictBatchRequest(BaseModel):
+    items: List[PredictRequest]
+
+class PredictBatchResponse(BaseModel):
+    items: List[PredictResponse]    # istim redosledom kao u zahtevu
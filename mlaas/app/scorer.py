@@ -0,0 +1,37 @@
+import json
+
+import numpy as np
+
+# minimalni scorer za linearni artefakt iz train.py (model.linear.json):
+# StandardScaler je vec ugradjen u tezine, pa je predikcija samo dot + sigmoid
+
+
+class LinearScorer:
+    def __init__(self, weights, bias: float, feature_names, version: str, threshold: float = 0.5):
+        self.weights = np.asarray(weights, dtype=float)
+        self.bias = float(bias)
+        self.feature_names = list(feature_names)
+        self.version = version
+        self.threshold = threshold
+        if self.weights.shape != (len(self.feature_names),):
+            raise ValueError("weights and feature_names length mismatch")
+
+    @classmethod
+    def load(cls, path: str) -> "LinearScorer":
+        with open(path, "r", encoding="utf-8") as f:
+            art = json.load(f)
+        if art.get("format") != "linear-logistic-v1":
+            raise ValueError(f"Unsupported linear model format: {art.get('format')}")
+        return cls(
+            weights=art["weights"],
+            bias=art["bias"],
+            feature_names=art["feature_names"],
+            version=str(art.get("version", "")),
+            threshold=float(art.get("threshold", 0.5)),
+        )
+
+    def predict_proba(self, x: np.ndarray) -> np.ndarray:
+        """Isti oblik kao sklearn: N x 2, kolona 1 = P(class=1)."""
+        z = x @ self.weights + self.bias
+        p1 = 0.5 * (1.0 + np.tanh(0.5 * z))  # sigmoid bez overflow-a
+        return np.column_stack((1.0 - p1, p1))
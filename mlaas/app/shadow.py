@@ -0,0 +1,60 @@
+import asyncio
+
+import numpy as np
+
+from . import metrics
+
+# shadow scoring: primarni odgovor ide odmah klijentu, a isti redovi se (ako ima mesta u redu)
+# naknadno boduju shadow verzijom; rezultat se samo meri, nikad ne vraca klijentu
+
+
+class ShadowScorer:
+    def __init__(self, registry, version: str, queue_max: int, max_batch: int):
+        self.registry = registry
+        self.version = version
+        self.max_batch = max(1, max_batch)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_max))
+        self._task = None
+
+    def offer(self, rows, primary_probs, primary_version: str) -> None:
+        """Ne blokira: ako je red pun, shadow poredjenje se preskace."""
+        if primary_version == self.version:
+            return
+        for row, p in zip(rows, primary_probs):
+            try:
+                self._queue.put_nowait((row, float(p)))
+            except asyncio.QueueFull:
+                metrics.shadow_dropped.inc()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                m = self.registry.get(self.version)
+            except KeyError:
+                continue  # shadow verzija (jos) nije u registru
+            try:
+                x = np.array([row for row, _ in batch], dtype=float)
+                probs = (await asyncio.to_thread(m.model.predict_proba, x))[:, 1]
+            except Exception as e:
+                print(f"[mlaas] shadow scoring failed (version={self.version}): {e}")
+                continue
+            ref = np.array([p for _, p in batch], dtype=float)
+            diff = np.abs(probs - ref)
+            for d in diff:
+                metrics.shadow_abs_diff.observe(float(d))
+            metrics.shadow_scored.inc(len(batch))
+            metrics.shadow_disagreements.inc(int(np.count_nonzero((probs >= 0.5) != (ref >= 0.5))))
@@ -0,0 +1,155 @@
+import argparse
+import asyncio
+import multiprocessing as mp
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+# benchmark MLaaS-a sa 1..N uvicorn workera: req/s za /predict i memorija workera (PSS = deljene
+# stranice podeljene brojem procesa, pa mmap-ovan model ne bi trebalo da raste sa brojem workera)
+#
+#   python bench.py --workers 1,2,4 --duration 10 --scorer sklearn
+
+HERE = Path(__file__).resolve().parent
+
+FEATURES = {
+    "temp_mean": 21.5, "temp_std": 0.2,
+    "hum_mean": 27.0, "hum_std": 0.3,
+    "light_mean": 420.0, "light_std": 12.0,
+    "co2_mean": 780.0, "co2_std": 25.0,
+    "temp_last": 21.6, "hum_last": 27.1, "light_last": 430.0, "co2_last": 790.0,
+}
+
+
+async def _load(url: str, duration: float, concurrency: int) -> int:
+    body = {"reading_id": "bench", "source_id": 1, "ts": "2026-01-01T00:00:00Z", "features": FEATURES}
+    done = 0
+    deadline = time.perf_counter() + duration
+
+    async with httpx.AsyncClient(timeout=10.0, limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def worker():
+            nonlocal done
+            while time.perf_counter() < deadline:
+                r = await client.post(url, json=body)
+                r.raise_for_status()
+                done += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return done
+
+
+def _client_proc(url, duration, concurrency, out):
+    out.put(asyncio.run(_load(url, duration, concurrency)))
+
+
+def _pss_kb(pid: int) -> tuple[int, int]:
+    # (rss, pss) u kB iz /proc (samo Linux)
+    rss = pss = 0
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("Rss:"):
+                    rss = int(line.split()[1])
+                elif line.startswith("Pss:"):
+                    pss = int(line.split()[1])
+    except OSError:
+        pass
+    return rss, pss
+
+
+def _children(pid: int) -> list[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children", "r", encoding="utf-8") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def run(workers: int, args) -> dict:
+    env = dict(os.environ)
+    env.update(
+        GRPC_ENABLED="false",
+        MODEL_SCORER=args.scorer,
+        MODEL_MMAP="true" if args.mmap else "false",
+        MODEL_PATH=str(HERE / "model.joblib"),
+        LINEAR_MODEL_PATH=str(HERE / "model.linear.json"),
+        MODEL_META_PATH=str(HERE / "model.meta.json"),
+        MODEL_REGISTRY_DIR="",
+        OMP_NUM_THREADS="1",
+    )
+    cmd = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(args.port),
+        "--workers", str(workers), "--log-level", "warning",
+    ]
+    server = subprocess.Popen(cmd, cwd=HERE, env=env)
+    base = f"http://127.0.0.1:{args.port}"
+    try:
+        for _ in range(200):
+            try:
+                if httpx.get(f"{base}/health", timeout=1.0).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.1)
+        else:
+            raise RuntimeError("server did not start")
+
+        # zagrevanje: svaki worker ucita model i odradi prve zahteve
+        asyncio.run(_load(f"{base}/predict", 1.0, 8))
+
+        out = mp.Queue()
+        procs = [
+            mp.Process(target=_client_proc, args=(f"{base}/predict", args.duration, args.concurrency, out))
+            for _ in range(args.clients)
+        ]
+        t0 = time.perf_counter()
+        for p in procs:
+            p.start()
+        total = sum(out.get() for _ in procs)
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - t0
+
+        pids = _children(server.pid) if workers > 1 else [server.pid]
+        mem = [_pss_kb(p) for p in pids]
+        return {
+            "workers": workers,
+            "requests": total,
+            "rps": total / elapsed,
+            "rss_mb": sum(r for r, _ in mem) / 1024.0,
+            "pss_mb": sum(p for _, p in mem) / 1024.0,
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", default="1,2,4", help="lista broja workera, npr. 1,2,4,8")
+    ap.add_argument("--duration", type=float, default=10.0, help="trajanje merenja po konfiguraciji (s)")
+    ap.add_argument("--clients", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="broj klijentskih procesa")
+    ap.add_argument("--concurrency", type=int, default=32, help="paralelnih zahteva po klijentskom procesu")
+    ap.add_argument("--scorer", default="sklearn", choices=["auto", "linear", "sklearn"])
+    ap.add_argument("--no-mmap", dest="mmap", action="store_false", help="ucitaj model kopijom u svaki worker")
+    ap.add_argument("--port", type=int, default=8765)
+    args = ap.parse_args()
+
+    print(f"[bench] cpus={os.cpu_count()} scorer={args.scorer} mmap={args.mmap} clients={args.clients}x{args.concurrency}")
+    base_rps = None
+    for n in [int(w) for w in args.workers.split(",") if w]:
+        r = run(n, args)
+        base_rps = base_rps or r["rps"]
+        print(
+            f"[bench] workers={r['workers']:>2}  rps={r['rps']:>9.1f}  speedup={r['rps'] / base_rps:4.2f}x"
+            f"  rss_total={r['rss_mb']:7.1f}MB  pss_total={r['pss_mb']:7.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
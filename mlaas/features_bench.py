@@ -0,0 +1,115 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from train import FEATURE_COLS, MODEL_FEATURE_NAMES, build_window_features, load_csv
+
+from features import WindowStore
+
+# parity + benchmark za window feature-e: pandas groupby-rolling (stara implementacija iz train.py),
+# batch rolling_features (trening/backfill) i inkrementalni RollingWindow (live analytics)
+# moraju da daju iste MODEL_FEATURE_NAMES vektore; izlaz != 0 ako se razlikuju
+#
+#   python features_bench.py --window 20
+#   python features_bench.py --synthetic 2000000 --sources 200 --window 100 --skip-incremental
+
+
+def pandas_window_features(df: pd.DataFrame, window: int) -> pd.DataFrame:
+    """Referenca: prethodni build_window_features (8 rolling prolaza preko pandas groupby)."""
+    g = df.groupby("source_id", group_keys=False)
+    out = df[["source_id", "ts"]].copy()
+    for col, p in zip(FEATURE_COLS, ("temp", "hum", "light", "co2")):
+        out[f"{p}_mean"] = g[col].rolling(window).mean().reset_index(level=0, drop=True)
+        out[f"{p}_std"] = g[col].rolling(window).std(ddof=0).reset_index(level=0, drop=True)
+    for col, p in zip(FEATURE_COLS, ("temp", "hum", "light", "co2")):
+        out[f"{p}_last"] = df[col].astype(float)
+    out["y"] = df["occupancy"].astype(int)
+    out = out.dropna(subset=MODEL_FEATURE_NAMES).reset_index(drop=True)
+    return out.sort_values("ts", kind="stable").reset_index(drop=True)
+
+
+def incremental_window_features(df: pd.DataFrame, window: int) -> np.ndarray:
+    """Isti redovi kao batch, ali kroz WindowStore.push red po red (kao analytics main petlja)."""
+    store = WindowStore(window, 0)
+    rows = []
+    order = np.argsort(df["ts"].to_numpy(), kind="stable")  # live redosled = po vremenu
+    sources = df["source_id"].to_numpy()[order]
+    values = df[FEATURE_COLS].to_numpy(dtype=float)[order]
+    for sid, x in zip(sources.tolist(), values.tolist()):
+        w = store.push(sid, dict(zip(FEATURE_COLS, x)), 0.0)
+        if w.full:
+            f = w.features()
+            rows.append([f[n] for n in MODEL_FEATURE_NAMES])
+    return np.array(rows, dtype=float).reshape(-1, len(MODEL_FEATURE_NAMES))
+
+
+def synthetic(n: int, sources: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "source_id": rng.integers(1, sources + 1, n),
+        "ts": pd.Timestamp("2026-01-01", tz="UTC") + pd.to_timedelta(np.arange(n), unit="s"),
+        "temperature_c": 20 + 3 * rng.random(n),
+        "humidity_percent": np.round(27 + rng.random(n), 1),
+        "light_lux": rng.choice([0.0, 450.0], n) + rng.random(n),
+        "co2_ppm": 700 + 300 * rng.random(n),
+        "occupancy": rng.integers(0, 2, n),
+    })
+    return df.sort_values(["source_id", "ts"], kind="stable").reset_index(drop=True)
+
+
+def timed(fn, *a):
+    t0 = time.perf_counter()
+    out = fn(*a)
+    return out, time.perf_counter() - t0
+
+
+def report(name: str, ref: np.ndarray, got: np.ndarray, tol: float) -> bool:
+    if ref.shape != got.shape:
+        print(f"[features] {name}: shape {got.shape} != {ref.shape}")
+        return False
+    diff = np.abs(ref - got).max(axis=0) if len(ref) else np.zeros(ref.shape[1])
+    worst = int(np.argmax(diff))
+    ok = bool(diff.max() <= tol)
+    print(f"[features] {name}: max abs diff {diff.max():.3g} ({MODEL_FEATURE_NAMES[worst]}) {'OK' if ok else 'MISMATCH'}")
+    return ok
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--data", default="../data/processed/occupancy_readings.csv", help="putanja do CSV-a")
+    ap.add_argument("--synthetic", type=int, default=0, help="umesto CSV-a: N generisanih redova")
+    ap.add_argument("--sources", type=int, default=100, help="broj izvora za --synthetic")
+    ap.add_argument("--window", type=int, default=20)
+    ap.add_argument("--tol", type=float, default=1e-6, help="dozvoljena apsolutna razlika")
+    ap.add_argument("--skip-incremental", action="store_true", help="preskoci RollingWindow (sporo za velike N)")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    if args.synthetic:
+        df = synthetic(args.synthetic, args.sources, args.seed)
+    else:
+        df = load_csv(Path(args.data).resolve())
+    print(f"[features] rows={len(df)} sources={df['source_id'].nunique()} window={args.window}")
+
+    ref, t_pandas = timed(pandas_window_features, df, args.window)
+    new, t_batch = timed(build_window_features, df, args.window)
+    print(f"[features] pandas groupby-rolling: {t_pandas:7.3f}s")
+    print(f"[features] numpy rolling_features: {t_batch:7.3f}s  ({t_pandas / max(t_batch, 1e-9):.1f}x)")
+
+    ok = report("batch vs pandas", ref[MODEL_FEATURE_NAMES].to_numpy(), new[MODEL_FEATURE_NAMES].to_numpy(), args.tol)
+    ok &= bool((ref["y"].to_numpy() == new["y"].to_numpy()).all())
+
+    if not args.skip_incremental:
+        inc, t_inc = timed(incremental_window_features, df, args.window)
+        print(f"[features] RollingWindow (live):   {t_inc:7.3f}s  ({len(df) / max(t_inc, 1e-9):,.0f} readings/s)")
+        ok &= report("incremental vs batch", new[MODEL_FEATURE_NAMES].to_numpy(), inc, args.tol)
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
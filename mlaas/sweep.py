@@ -0,0 +1,280 @@
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+from argparse import Namespace
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.metrics import accuracy_score, f1_score, log_loss, roc_auc_score
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+import train
+from app.scorer import LinearScorer
+from train import MODEL_FEATURE_NAMES, SplitConfig, build_window_features, default_data, load_dataset
+
+import columnar
+
+# sweep: window x regularizacija x familija modela, fit u process pool-u. Matrice window feature-a
+# se kesiraju na disku (kljuc = hash dataset-a + features.py, pa window), pa ponovno pokretanje
+# ne racuna prozore. Za svaku kombinaciju se meri latencija inferencije (1 red i batch), serijski
+# posle fitovanja da paralelni fit-ovi ne kvare merenje, i to kroz scorer koji MLaaS koristi za
+# tu familiju (LinearScorer za logreg/sgd, sklearn Pipeline za ostale).
+#
+#   python sweep.py --windows 5,10,20,50 --C 0.01,0.1,1,10 --models logreg,sgd,hgb
+#   python sweep.py --latency-budget-us 200 --out model.joblib --meta model.meta.json --version 1.1.0
+
+HERE = Path(__file__).resolve().parent
+CACHE_DIR = os.getenv("FEATURE_CACHE_DIR", str(HERE.parent / "data" / "cache" / "features"))
+
+# C = inverzna jacina regularizacije (kao LogisticRegression.C) za sve familije:
+#   logreg: C;  sgd: alpha = 1 / (C * n_train);  hgb: l2_regularization = 1 / C
+MODELS = {
+    "logreg": lambda c, n, seed: LogisticRegression(C=c, max_iter=2000, class_weight="balanced", random_state=seed),
+    "sgd": lambda c, n, seed: SGDClassifier(loss="log_loss", alpha=1.0 / (c * n), class_weight="balanced", random_state=seed),
+    "hgb": lambda c, n, seed: HistGradientBoostingClassifier(l2_regularization=1.0 / c, class_weight="balanced", random_state=seed),
+}
+# metrika -> True ako je veca bolja
+METRICS = {"log_loss": False, "f1": True, "roc_auc": True, "accuracy": True}
+LINEAR = ("logreg", "sgd")  # MLaaS ih boduje kroz model.linear.json (bez sklearn-a)
+
+
+def dataset_hash(path: Path) -> str:
+    """Sadrzaj CSV-a ili manifest kolonskog dataset-a (menja se pri append-u) + kod feature-a."""
+    h = hashlib.sha256()
+    if columnar.is_columnar(path):
+        h.update((path / columnar.MANIFEST).read_bytes())
+    else:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    h.update((train.ANALYTICS_DIR / "features.py").read_bytes())
+    return h.hexdigest()[:16]
+
+
+def cached_features(data_path: Path, windows: list[int], cache_dir: Path) -> dict[int, Path]:
+    """window -> .npz sa X, y (hronoloski, kao build_window_features); nedostajuci se racunaju."""
+    d = cache_dir / dataset_hash(data_path)
+    paths = {w: d / f"w{w}.npz" for w in windows}
+    missing = [w for w, p in paths.items() if not p.exists()]
+    print(f"[sweep] feature cache {d}: {len(windows) - len(missing)} hit, {len(missing)} miss")
+    if missing:
+        d.mkdir(parents=True, exist_ok=True)
+        df = load_dataset(data_path)
+        for w in missing:
+            t0 = time.perf_counter()
+            feat = build_window_features(df, window=w)
+            tmp = d / f"w{w}.tmp.npz"
+            np.savez(tmp, X=feat[MODEL_FEATURE_NAMES].to_numpy(dtype=float), y=feat["y"].to_numpy(dtype=np.int8))
+            os.replace(tmp, paths[w])
+            print(f"[sweep] window={w}: {len(feat)} rows in {time.perf_counter() - t0:.2f}s -> {paths[w].name}")
+    return paths
+
+
+def split(n: int, cfg: SplitConfig) -> tuple[slice, slice, slice]:
+    # isto kao train.time_split
+    a, b = int(n * cfg.train_frac), int(n * (cfg.train_frac + cfg.val_frac))
+    return slice(0, a), slice(a, b), slice(b, n)
+
+
+def scores(y, prob) -> dict:
+    pred = (prob >= 0.5).astype(int)
+    try:
+        auc = float(roc_auc_score(y, prob))
+    except ValueError:
+        auc = float("nan")
+    return {
+        "accuracy": float(accuracy_score(y, pred)),
+        "f1": float(f1_score(y, pred, zero_division=0)),
+        "roc_auc": auc,
+        # definisan i kad split ima samo jednu klasu (npr. vikend bez prisustva), za razliku od f1/auc
+        "log_loss": float(log_loss(y, np.clip(prob, 1e-15, 1 - 1e-15), labels=[0, 1])),
+    }
+
+
+def fit_candidate(features_path: str, window: int, family: str, c: float, seed: int) -> dict:
+    """Radi u procesu iz pool-a; vraca metrike i fitovan model (pickle nazad u roditelja)."""
+    data = np.load(features_path)
+    X, y = data["X"], data["y"].astype(int)
+    tr, va, te = split(len(X), SplitConfig())
+
+    model = Pipeline(steps=[("scaler", StandardScaler()), ("clf", MODELS[family](c, tr.stop, seed))])
+    t0 = time.perf_counter()
+    model.fit(X[tr], y[tr])
+    fit_s = time.perf_counter() - t0
+
+    metrics = {}
+    for name, s in (("val", va), ("test", te)):
+        if s.stop > s.start:
+            metrics[name] = scores(y[s], model.predict_proba(X[s])[:, 1])
+    return {
+        "window": window, "model": family, "C": c, "fit_s": fit_s, "metrics": metrics,
+        "rows": {"train": tr.stop, "val": va.stop - va.start, "test": te.stop - te.start},
+        "_model": model,
+    }
+
+
+def serving_scorer(r: dict, X_check: np.ndarray):
+    """
+    Ono sto MLaaS zaista poziva: linearne familije se izvoze (export_linear) i boduju kroz
+    LinearScorer iz model.linear.json, ostale kroz sklearn Pipeline iz joblib-a.
+    """
+    if r["model"] not in LINEAR:
+        return "sklearn", r["_model"]
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / train.LINEAR_FILE
+        train.export_linear(r["_model"], path, "sweep", "", X_check)
+        return "linear", LinearScorer.load(str(path))
+
+
+def measure_latency(model, X: np.ndarray, batch: int, repeat: int) -> dict:
+    """predict_proba: median za 1 red i za batch od `batch` redova (us)."""
+    one = X[:1]
+    rows = X[np.arange(batch) % len(X)]
+    model.predict_proba(one)  # warmup
+
+    def median_us(x, n):
+        t = []
+        for _ in range(n):
+            t0 = time.perf_counter()
+            model.predict_proba(x)
+            t.append(time.perf_counter() - t0)
+        return float(np.median(t) * 1e6)
+
+    batch_us = median_us(rows, max(3, repeat // 20))
+    return {
+        "single_row_us": median_us(one, repeat),
+        "batch_rows": batch,
+        "batch_us": batch_us,
+        "batch_per_row_us": batch_us / batch,
+    }
+
+
+def parse_list(s: str, cast) -> list:
+    return [cast(x) for x in s.split(",") if x.strip()]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Sweep window x regularizacija x model, sa kesom feature-a")
+    ap.add_argument("--data", default=default_data(), help="CSV ili kolonski dataset")
+    ap.add_argument("--windows", default="5,10,20,50")
+    ap.add_argument("--C", dest="cs", default="0.01,0.1,1,10", help="inverzna jacina regularizacije")
+    ap.add_argument("--models", default="logreg,sgd,hgb", help=f"familije: {','.join(MODELS)}")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--cache-dir", default=CACHE_DIR)
+    ap.add_argument("--latency-batch", type=int, default=1000, help="redova u batch merenju latencije")
+    ap.add_argument("--latency-repeat", type=int, default=200)
+    ap.add_argument("--select", default="val.log_loss", choices=[f"{s}.{m}" for s in ("val", "test") for m in METRICS],
+                    help="metrika za izbor najboljeg kandidata")
+    ap.add_argument("--latency-budget-us", type=float, default=0.0,
+                    help="najbolji kandidat se bira samo medju onima sa single_row_us <= budzet (0 = bez)")
+    ap.add_argument("--sweep-out", default="sweep.meta.json", help="rezultati svih kandidata")
+    ap.add_argument("--out", default="", help="ako je zadat, snimi najboljeg kandidata kao train.py (joblib + meta)")
+    ap.add_argument("--meta", default="model.meta.json")
+    ap.add_argument("--linear-out", default="model.linear.json")
+    ap.add_argument("--version", default="1.0.0")
+    ap.add_argument("--registry-dir", default="")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    windows = parse_list(args.windows, int)
+    cs = parse_list(args.cs, float)
+    families = parse_list(args.models, str)
+    for f in families:
+        if f not in MODELS:
+            raise SystemExit(f"nepoznat model {f!r}, ocekivano: {', '.join(MODELS)}")
+    if min(windows) < 2 or min(cs) <= 0:
+        raise SystemExit("window mora biti >= 2, C > 0")
+
+    data_path = Path(args.data).resolve()
+    if not data_path.exists():
+        raise FileNotFoundError(f"Ne postoji dataset: {data_path}")
+
+    t0 = time.perf_counter()
+    paths = cached_features(data_path, windows, Path(args.cache_dir))
+
+    grid = [(w, f, c) for w in windows for f in families for c in cs]
+    print(f"[sweep] {len(grid)} candidates on {args.workers} workers")
+    results = []
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futs = [pool.submit(fit_candidate, str(paths[w]), w, f, c, args.seed) for w, f, c in grid]
+        for fut in as_completed(futs):
+            r = fut.result()
+            results.append(r)
+            val = r["metrics"].get("val", {})
+            print(f"[sweep] window={r['window']:<4} {r['model']:<6} C={r['C']:<6g} "
+                  f"val_log_loss={val.get('log_loss', float('nan')):.4f} fit={r['fit_s']:.2f}s")
+
+    # latencija serijski, na redovima iz test dela, kroz scorer koji bi MLaaS koristio
+    for r in results:
+        X = np.load(paths[r["window"]])["X"]
+        X = X[split(len(X), SplitConfig())[2]] if len(X) else X
+        kind, scorer = serving_scorer(r, X[:1000])
+        r["latency"] = {"scorer": kind, **measure_latency(scorer, X, args.latency_batch, args.latency_repeat)}
+        r["servable_linear"] = kind == "linear"
+
+    split_name, metric = args.select.split(".")
+
+    def selected(r) -> float:
+        return r["metrics"].get(split_name, {}).get(metric, float("nan"))
+
+    def rank(r):
+        v = selected(r)
+        v = -np.inf if np.isnan(v) else (v if METRICS[metric] else -v)
+        return v, -r["latency"]["single_row_us"]  # izjednaceno -> brzi
+
+    results.sort(key=rank, reverse=True)
+    eligible = [r for r in results if not args.latency_budget_us or r["latency"]["single_row_us"] <= args.latency_budget_us]
+    best = eligible[0] if eligible else None
+
+    print(f"\n[sweep] {'window':>6} {'model':<6} {'C':>8} {args.select:>12} {'test_f1':>7} {'scorer':>7} {'1 row us':>9} {'batch us/row':>12}")
+    for r in results:
+        m, lat = r["metrics"], r["latency"]
+        print(f"[sweep] {r['window']:>6} {r['model']:<6} {r['C']:>8g} {selected(r):>12.4f} "
+              f"{m.get('test', {}).get('f1', float('nan')):>7.4f} {lat['scorer']:>7} {lat['single_row_us']:>9.1f} {lat['batch_per_row_us']:>12.3f}"
+              + ("  <- best" if r is best else ""))
+
+    candidates = [{k: v for k, v in r.items() if k != "_model"} for r in results]
+    summary = {
+        "swept_at": train.iso_z(datetime.now(timezone.utc)),
+        "data_file": str(data_path),
+        "dataset_hash": paths[windows[0]].parent.name,
+        "grid": {"windows": windows, "C": cs, "models": families},
+        "selection": {"metric": args.select, "latency_budget_us": args.latency_budget_us or None},
+        "best": {k: best[k] for k in ("window", "model", "C")} if best else None,
+        "elapsed_s": time.perf_counter() - t0,
+        "candidates": candidates,
+    }
+    Path(args.sweep_out).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    print(f"[sweep] saved results -> {Path(args.sweep_out).resolve()}")
+
+    if best is None:
+        print("[sweep] no candidate fits the latency budget")
+        return
+    if args.out:
+        X = np.load(paths[best["window"]])["X"]
+        _, va, te = split(len(X), SplitConfig())
+        save_args = Namespace(
+            out=args.out, meta=args.meta, linear_out=args.linear_out, version=args.version,
+            registry_dir=args.registry_dir, window=best["window"], seed=args.seed,
+            datamanager="", data=str(data_path),
+        )
+        train.save_artifacts(best["_model"], save_args, best["metrics"], X[va.start:te.stop], {
+            "model": f"StandardScaler + {type(best['_model'].named_steps['clf']).__name__}(C={best['C']:g}, class_weight=balanced)",
+            "rows_features": int(len(X)),
+            "split_sizes": best["rows"],
+            "latency": best["latency"],
+            "sweep": {k: summary[k] for k in ("swept_at", "dataset_hash", "grid", "selection")} | {"candidates": candidates},
+        })
+
+
+if __name__ == "__main__":
+    main()
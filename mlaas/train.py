@@ -1,5 +1,8 @@
 import argparse
 import json
+import os
+import shutil
+import sys
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
@@ -10,20 +13,29 @@ import pandas as pd
 
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.metrics import accuracy_score, f1_score, roc_auc_score, confusion_matrix, classification_report
 
 
-FEATURE_COLS = ["temperature_c", "humidity_percent", "light_lux", "co2_ppm"]
+# window feature-i dolaze iz analytics/features.py (isti kod koji racuna live feature-e),
+# da trening i inferencija ne bi mogli da se razidju
+ANALYTICS_DIR = Path(__file__).resolve().parent.parent / "analytics"
+# kolonski dataset (scripts/prepare_dataset.py -> scripts/columnar.py)
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+for d in (ANALYTICS_DIR, SCRIPTS_DIR):
+    if str(d) not in sys.path:
+        sys.path.insert(0, str(d))
+
+import columnar
+from features import FEATURE_NAMES, RAW_FIELDS, rolling_features
+
+FEATURE_COLS = list(RAW_FIELDS)
 
 # Ovo mora da match-uje MLaaS /predict input (schemas.py)
-MODEL_FEATURE_NAMES = [
-    "temp_mean", "temp_std",
-    "hum_mean", "hum_std",
-    "light_mean", "light_std",
-    "co2_mean", "co2_std",
-    "temp_last", "hum_last", "light_last", "co2_last",
-]
+MODEL_FEATURE_NAMES = FEATURE_NAMES
+
+# linearni artefakt u registru (app/registry.py LINEAR_FILE)
+LINEAR_FILE = "model.linear.json"
 
 @dataclass
 class SplitConfig:
@@ -43,8 +55,17 @@ def coerce_bool_series(s: pd.Series) -> pd.Series:
     return s.astype(str).str.strip().str.lower().isin(["1", "true", "yes", "y", "t"]).astype(int)
 
 def load_csv(path: Path) -> pd.DataFrame:
-    df = pd.read_csv(path)
+    df = clean_frame(pd.read_csv(path))
+
+    # sort po source i vremenu
+    df = df.sort_values(["source_id", "ts"]).reset_index(drop=True)
+
+    # izbaci redove gde su feature-i NaN
+    df = df.dropna(subset=FEATURE_COLS)
+
+    return df
 
+def clean_frame(df: pd.DataFrame) -> pd.DataFrame:
     # TS kolona: podrži "ts" ili "date"
     if "ts" not in df.columns and "date" in df.columns:
         df = df.rename(columns={"date": "ts"})
@@ -71,15 +92,28 @@ def load_csv(path: Path) -> pd.DataFrame:
 
     # label u 0/1
     df["occupancy"] = coerce_bool_series(df["occupancy"])
-
-    # sort po source i vremenu
-    df = df.sort_values(["source_id", "ts"]).reset_index(drop=True)
-
-    # izbaci redove gde su feature-i NaN
-    df = df.dropna(subset=FEATURE_COLS)
-
     return df
 
+def load_columnar(path: Path) -> pd.DataFrame:
+    """Isti oblik kao load_csv, iz mmap-ovanih kolona (bez parsiranja teksta)."""
+    cols = columnar.load(path, ["ts_ms", "source_id", *FEATURE_COLS, "occupancy"])
+    order = np.lexsort((cols["ts_ms"], cols["source_id"]))  # sort po source i vremenu
+    df = pd.DataFrame({
+        "ts": pd.to_datetime(cols["ts_ms"][order], unit="ms", utc=True),
+        "source_id": cols["source_id"][order],
+        **{c: cols[c][order] for c in FEATURE_COLS},
+        "occupancy": cols["occupancy"][order].astype(int),
+    })
+    return df.dropna(subset=FEATURE_COLS).reset_index(drop=True)
+
+def default_data() -> str:
+    # kolonski dataset ako je napravljen, inace CSV
+    cols = "../data/processed/occupancy_readings.columns"
+    return cols if columnar.is_columnar(cols) else "../data/processed/occupancy_readings.csv"
+
+def load_dataset(path: Path) -> pd.DataFrame:
+    return load_columnar(path) if columnar.is_columnar(path) else load_csv(path)
+
 def build_window_features(df: pd.DataFrame, window: int) -> pd.DataFrame:
     """
     Pravi window feature-e po source_id:
@@ -89,36 +123,19 @@ def build_window_features(df: pd.DataFrame, window: int) -> pd.DataFrame:
     if window < 2:
         raise ValueError("window mora biti >= 2")
 
-    g = df.groupby("source_id", group_keys=False)
-
-    out = df[["source_id", "ts"]].copy()
-
-    # rolling mean/std (ddof=0 = population std, konzistentno sa pstdev)
-    out["temp_mean"] = g["temperature_c"].rolling(window).mean().reset_index(level=0, drop=True)
-    out["temp_std"]  = g["temperature_c"].rolling(window).std(ddof=0).reset_index(level=0, drop=True)
-
-    out["hum_mean"]  = g["humidity_percent"].rolling(window).mean().reset_index(level=0, drop=True)
-    out["hum_std"]   = g["humidity_percent"].rolling(window).std(ddof=0).reset_index(level=0, drop=True)
-
-    out["light_mean"] = g["light_lux"].rolling(window).mean().reset_index(level=0, drop=True)
-    out["light_std"]  = g["light_lux"].rolling(window).std(ddof=0).reset_index(level=0, drop=True)
-
-    out["co2_mean"]  = g["co2_ppm"].rolling(window).mean().reset_index(level=0, drop=True)
-    out["co2_std"]   = g["co2_ppm"].rolling(window).std(ddof=0).reset_index(level=0, drop=True)
-
-    # last (= trenutni red)
-    out["temp_last"]  = df["temperature_c"].astype(float)
-    out["hum_last"]   = df["humidity_percent"].astype(float)
-    out["light_last"] = df["light_lux"].astype(float)
-    out["co2_last"]   = df["co2_ppm"].astype(float)
-
-    out["y"] = df["occupancy"].astype(int)
-
-    # prvih window-1 redova po source_id nemaju rolling -> NaN
-    out = out.dropna(subset=MODEL_FEATURE_NAMES).reset_index(drop=True)
+    # df je vec sortiran po (source_id, ts) u load_csv / load_columnar
+    idx, X = rolling_features(df[FEATURE_COLS].to_numpy(dtype=float), df["source_id"].to_numpy(), window)
 
+    # prvih window-1 redova po source_id nemaju pun prozor -> nema ih u idx
     # obavezno sortiraj globalno po vremenu za time split
-    out = out.sort_values("ts").reset_index(drop=True)
+    order = np.argsort(df["ts"].to_numpy(dtype="datetime64[ns]")[idx], kind="stable")
+    idx, X = idx[order], X[order]
+
+    out = pd.concat([
+        df[["source_id", "ts"]].iloc[idx].reset_index(drop=True),
+        pd.DataFrame(X, columns=MODEL_FEATURE_NAMES),
+    ], axis=1)
+    out["y"] = df["occupancy"].to_numpy(dtype=int)[idx]
     return out
 
 def time_split(df_feat: pd.DataFrame, cfg: SplitConfig):
@@ -154,23 +171,377 @@ def eval_split(name: str, y_true, y_prob):
     print(cm)
     return {"accuracy": acc, "f1": f1, "roc_auc": auc, "cm": cm.tolist()}
 
+def export_linear(model: Pipeline, path: Path, version: str, trained_at: str, X_check: np.ndarray) -> dict:
+    """
+    StandardScaler + LogisticRegression -> jedan linearni sloj (scaler ugradjen u tezine):
+      logit = sum(w * x) + b,  w = coef / scale,  b = intercept - sum(coef * mean / scale)
+    MLaaS to boduje sa dot + sigmoid bez sklearn-a. Proverava se protiv pipeline-a na X_check.
+    """
+    scaler = model.named_steps["scaler"]
+    clf = model.named_steps["clf"]
+
+    coef = clf.coef_.ravel().astype(float)
+    mean = scaler.mean_ if getattr(scaler, "mean_", None) is not None and scaler.with_mean else np.zeros_like(coef)
+    scale = scaler.scale_ if getattr(scaler, "scale_", None) is not None and scaler.with_std else np.ones_like(coef)
+
+    weights = coef / scale
+    bias = float(clf.intercept_[0] - np.sum(coef * mean / scale))
+
+    max_diff = 0.0
+    if len(X_check):
+        ref = model.predict_proba(X_check)[:, 1]
+        z = X_check @ weights + bias
+        ours = 0.5 * (1.0 + np.tanh(0.5 * z))
+        max_diff = float(np.max(np.abs(ref - ours)))
+        if max_diff > 1e-9:
+            raise RuntimeError(f"linear export ne odgovara pipeline-u (max diff {max_diff})")
+
+    art = {
+        "format": "linear-logistic-v1",
+        "version": version,
+        "trained_at": trained_at,
+        "feature_names": MODEL_FEATURE_NAMES,
+        "weights": weights.tolist(),
+        "bias": bias,
+        "threshold": 0.5,
+        "verified_rows": int(len(X_check)),
+        "verified_max_abs_diff": max_diff,
+    }
+    path.write_text(json.dumps(art, indent=2), encoding="utf-8")
+    return art
+
+def publish_to_registry(registry_dir: Path, version: str, model_path: Path, linear_path: Path | None, meta_path: Path) -> Path:
+    """
+    Kopira artefakte u <registry_dir>/<version>/. meta ide poslednja (tmp + rename),
+    jer MLaaS smatra verziju spremnom tek kad meta postoji. Bez linear_path (nelinearni model)
+    brise se linearni artefakt prethodne objave iste verzije, da ga MLaaS ne bi bodovao.
+    """
+    dest = registry_dir.resolve() / version
+    dest.mkdir(parents=True, exist_ok=True)
+    if linear_path is None:
+        (dest / LINEAR_FILE).unlink(missing_ok=True)
+    for src in (model_path, linear_path, meta_path):
+        if src is None:
+            continue
+        tmp = dest / (src.name + ".tmp")
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dest / src.name)
+    return dest
+
+
+# --- streaming (out-of-core) trening: --streaming ---
+# podaci idu u komadima (CSV chunk, isecak kolonskog dataset-a ili ExportReadings blok), prozori
+# se nastavljaju preko granica komada, a memorija zavisi od velicine komada, ne dataset-a
+
+def frame_block(df: pd.DataFrame) -> dict:
+    df = df.dropna(subset=FEATURE_COLS)
+    return {
+        "ts_ms": ((df["ts"] - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(milliseconds=1)).to_numpy(dtype=np.int64),
+        "source_id": df["source_id"].to_numpy(),
+        "values": df[FEATURE_COLS].to_numpy(dtype=float),
+        "y": df["occupancy"].to_numpy(dtype=np.int8),
+    }
+
+def csv_chunks(path: Path, chunk_rows: int):
+    for df in pd.read_csv(path, chunksize=chunk_rows):
+        yield frame_block(clean_frame(df))
+
+def columnar_chunks(path: Path, chunk_rows: int):
+    m = columnar.read_manifest(path)
+    cols = columnar.load(path, ["ts_ms", "source_id", *FEATURE_COLS, "occupancy"])
+    # segment = jedan dodati fajl; segmenti idu redom po prvom ts
+    bounds = np.cumsum([0] + [f["rows"] for f in m["files"]])
+    segs = [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+    for lo, hi in sorted(segs, key=lambda seg: int(np.min(cols["ts_ms"][seg[0]:seg[1]]))):
+        ts = cols["ts_ms"][lo:hi]
+        # nesortiran segment: redosled iz argsort-a samo ts kolone (8 B po redu), ostale kolone
+        # se i dalje citaju u komadima
+        order = None if (np.diff(ts) >= 0).all() else lo + np.argsort(ts, kind="stable")
+        for a in range(lo, hi, chunk_rows):
+            b = min(hi, a + chunk_rows)
+            rows = slice(a, b) if order is None else order[a - lo:b - lo]
+            values = np.column_stack([cols[c][rows] for c in FEATURE_COLS])
+            ok = ~np.isnan(values).any(axis=1)
+            yield {
+                "ts_ms": np.asarray(cols["ts_ms"][rows])[ok],
+                "source_id": np.asarray(cols["source_id"][rows])[ok],
+                "values": values[ok],
+                "y": np.asarray(cols["occupancy"][rows])[ok],
+            }
+
+def datamanager_chunks(target: str, from_dt: datetime | None, to_dt: datetime | None, batch_size: int):
+    import asyncio
+    import history  # analytics/history.py (gRPC ExportReadings)
+
+    loop = asyncio.new_event_loop()
+    blocks = history.export_blocks(target, from_dt, to_dt, batch_size)
+    try:
+        while True:
+            try:
+                b = loop.run_until_complete(blocks.__anext__())
+            except StopAsyncIteration:
+                break
+            yield {"ts_ms": b["ts_ms"], "source_id": b["source_id"], "values": b["values"], "y": b["occupancy"]}
+    finally:
+        loop.run_until_complete(blocks.aclose())
+        loop.close()
+
+class WindowStream:
+    """
+    rolling_features preko niza komada: poslednjih window-1 redova svakog izvora prelazi u sledeci
+    komad, pa su vektori isti kao da je ceo dataset obradjen odjednom (ako komadi idu hronoloski).
+    """
+
+    KEYS = ("ts_ms", "source_id", "values", "y")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.carry = None
+        self.rows = 0
+        self.dropped = 0  # readinzi stariji od poslednjeg vec vidjenog za isti izvor
+
+    def push(self, b: dict):
+        self.rows += len(b["ts_ms"])
+        n_carry = 0
+        if self.carry is not None and len(self.carry["ts_ms"]):
+            c_src, c_ts = self.carry["source_id"], self.carry["ts_ms"]
+            last = np.append(np.flatnonzero(c_src[1:] != c_src[:-1]), len(c_src) - 1)
+            srcs, last_ts = c_src[last], c_ts[last]
+            pos = np.minimum(np.searchsorted(srcs, b["source_id"]), len(srcs) - 1)
+            ok = (srcs[pos] != b["source_id"]) | (b["ts_ms"] >= last_ts[pos])
+            if not ok.all():
+                self.dropped += int((~ok).sum())
+                b = {k: b[k][ok] for k in self.KEYS}
+            n_carry = len(c_ts)
+            b = {k: np.concatenate([self.carry[k], b[k]]) for k in self.KEYS}
+
+        # po (source, ts); lexsort je stabilan pa carry ostaje ispred novih redova sa istim ts
+        order = np.lexsort((b["ts_ms"], b["source_id"]))
+        b = {k: b[k][order] for k in self.KEYS}
+        is_new = order >= n_carry
+        idx, X = rolling_features(b["values"], b["source_id"], self.window)
+        keep = is_new[idx]
+
+        # carry: poslednjih window-1 redova svakog izvora
+        src = b["source_id"]
+        n = len(src)
+        ends = np.append(np.flatnonzero(src[1:] != src[:-1]), n - 1)
+        group_end = np.repeat(ends, np.diff(np.concatenate(([-1], ends))))
+        tail = group_end - np.arange(n) < self.window - 1
+        self.carry = {k: b[k][tail] for k in self.KEYS}
+
+        idx = idx[keep]
+        return b["ts_ms"][idx], X[keep], b["y"][idx]
+
+def stream_source(args):
+    """Funkcija koja svaki put vraca nov iterator komada (trening ide u vise prolaza)."""
+    if args.datamanager:
+        return lambda: datamanager_chunks(args.datamanager, parse_iso(args.from_ts), parse_iso(args.to_ts), args.chunk_rows)
+    path = Path(args.data).resolve()
+    if columnar.is_columnar(path):
+        return lambda: columnar_chunks(path, args.chunk_rows)
+    return lambda: csv_chunks(path, args.chunk_rows)
+
+def parse_iso(s: str | None) -> datetime | None:
+    if not s:
+        return None
+    dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+def holdout_start_ms(args, source) -> int:
+    """--holdout-from, ili poslednjih holdout_frac vremenskog raspona podataka."""
+    if args.holdout_from:
+        return int(parse_iso(args.holdout_from).timestamp() * 1000)
+    lo, hi = parse_iso(args.from_ts), parse_iso(args.to_ts)
+    if args.datamanager and lo and hi:
+        t0, t1 = lo.timestamp() * 1000, hi.timestamp() * 1000
+    else:
+        # jedan prolaz samo za min/max ts
+        t0, t1 = np.inf, -np.inf
+        for b in source():
+            if len(b["ts_ms"]):
+                t0, t1 = min(t0, int(b["ts_ms"].min())), max(t1, int(b["ts_ms"].max()))
+        if t0 > t1:
+            raise ValueError("dataset je prazan")
+    return int(t1 - (t1 - t0) * args.holdout_frac)
+
+def fit_streaming(args):
+    source = stream_source(args)
+    holdout_ms = holdout_start_ms(args, source)
+    holdout_from = iso_z(datetime.fromtimestamp(holdout_ms / 1000.0, tz=timezone.utc))
+    print(f"[train] streaming: chunk_rows={args.chunk_rows} holdout_from={holdout_from} epochs={args.epochs}")
+
+    stats = {}
+
+    def windows():
+        ws = WindowStream(args.window)
+        for b in source():
+            ts, X, y = ws.push(b)
+            if len(ts):
+                yield ts, X, y
+        stats.update(rows_raw=ws.rows, dropped_out_of_order=ws.dropped)
+
+    # 1. prolaz: StandardScaler.partial_fit + broj primera po klasi (za class_weight=balanced)
+    scaler = StandardScaler()
+    counts = np.zeros(2, dtype=np.int64)
+    n_hold = 0
+    for ts, X, y in windows():
+        tr = ts < holdout_ms
+        n_hold += int((~tr).sum())
+        if tr.any():
+            scaler.partial_fit(X[tr])
+            counts += np.bincount(y[tr], minlength=2)[:2]
+    n_train = int(counts.sum())
+    if n_train == 0 or counts.min() == 0:
+        raise ValueError(f"trening deo nema obe klase (counts={counts.tolist()})")
+    print(f"[train] rows={stats['rows_raw']} train windows={n_train} holdout windows={n_hold} classes={counts.tolist()}")
+    dropped = stats["dropped_out_of_order"]
+    if dropped:
+        msg = (f"{dropped} od {stats['rows_raw']} readinga ({dropped / stats['rows_raw']:.2%}) van hronoloskog reda "
+               "(CSV se cita redom, sortiraj ga po source_id, ts; kolonski dataset se sortira po segmentu)")
+        if dropped > args.max_dropped_frac * stats["rows_raw"]:
+            raise ValueError(f"{msg}; dozvoljeno je --max-dropped-frac={args.max_dropped_frac}")
+        print(f"[warn] {msg} preskoceno")
+
+    # 2. epohe: SGD (log_loss = logisticka regresija) partial_fit po komadu
+    class_w = n_train / (2.0 * counts)
+    clf = SGDClassifier(loss="log_loss", alpha=args.alpha, random_state=args.seed)
+    rng = np.random.default_rng(args.seed)
+    for epoch in range(args.epochs):
+        for ts, X, y in windows():
+            tr = ts < holdout_ms
+            if not tr.any():
+                continue
+            p = rng.permutation(int(tr.sum()))
+            Xt, yt = scaler.transform(X[tr])[p], y[tr][p]
+            clf.partial_fit(Xt, yt, classes=np.array([0, 1]), sample_weight=class_w[yt])
+        print(f"[train] epoch {epoch + 1}/{args.epochs} done")
+
+    model = Pipeline(steps=[("scaler", scaler), ("clf", clf)])
+
+    # 3. evaluacija na holdout vremenskom opsegu
+    y_true, y_prob, X_check = [], [], []
+    n_check = 0
+    for ts, X, y in windows():
+        h = ts >= holdout_ms
+        if not h.any():
+            continue
+        y_true.append(y[h])
+        y_prob.append(model.predict_proba(X[h])[:, 1].astype(np.float32))
+        if n_check < 10000:
+            X_check.append(X[h][:10000 - n_check])
+            n_check += len(X_check[-1])
+    metrics = {}
+    if y_true:
+        metrics["test"] = eval_split("HOLDOUT", np.concatenate(y_true), np.concatenate(y_prob).astype(float))
+
+    info = {
+        "model": "StandardScaler(partial_fit) + SGDClassifier(log_loss, partial_fit, balanced sample weights)",
+        "training": {
+            "mode": "streaming",
+            "chunk_rows": args.chunk_rows,
+            "epochs": args.epochs,
+            "alpha": args.alpha,
+            "holdout_from": holdout_from,
+            "dropped_out_of_order": stats["dropped_out_of_order"],
+        },
+        "rows_raw": stats["rows_raw"],
+        "rows_features": n_train + n_hold,
+        "split_sizes": {"train": n_train, "test": n_hold},
+    }
+    X_check = np.vstack(X_check) if X_check else np.empty((0, len(MODEL_FEATURE_NAMES)))
+    return model, metrics, X_check, info
+
+def save_artifacts(model: Pipeline, args, metrics: dict, X_check: np.ndarray, info: dict) -> None:
+    # Snimi model
+    out_path = Path(args.out).resolve()
+    joblib.dump(model, out_path)  # bez compress: MLaaS ga ucitava sa mmap_mode="r"
+    print(f"\n[train] saved model -> {out_path}")
+
+    trained_at = iso_z(datetime.now(timezone.utc))
+
+    # Kompaktni linearni artefakt (MLaaS ga boduje bez sklearn-a)
+    # (samo za linearne modele; ostale MLaaS boduje iz joblib-a)
+    linear_path = Path(args.linear_out).resolve()
+    scorer = "linear" if hasattr(model.named_steps["clf"], "coef_") else "sklearn"
+    if scorer == "linear":
+        linear = export_linear(model, linear_path, args.version, trained_at, X_check)
+        print(f"[train] saved linear -> {linear_path} (max diff vs pipeline {linear['verified_max_abs_diff']:.2e})")
+    else:
+        # stari linearni artefakt bi MLaaS bodovao umesto ovog modela
+        if linear_path.exists():
+            linear_path.unlink()
+            print(f"[train] removed stale linear -> {linear_path}")
+        linear_path = None
+
+    # Snimi meta 
+    meta = {
+        "trained_at": trained_at,
+        "model_version": args.version,
+        "window_size": args.window,
+        "feature_names": MODEL_FEATURE_NAMES,
+        "label": "occupancy (0/1)",
+        "model": info.pop("model"),
+        "scorer": scorer,  # MLaaS: "sklearn" = ignorisi model.linear.json
+        "metrics": metrics,
+        "data_file": f"datamanager://{args.datamanager}" if args.datamanager else str(Path(args.data).resolve()),
+        **info,
+        "seed": args.seed,
+    }
+    meta_path = Path(args.meta).resolve()
+    meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    print(f"[train] saved meta  -> {meta_path}")
+
+    if args.registry_dir:
+        dest = publish_to_registry(Path(args.registry_dir), args.version, out_path, linear_path, meta_path)
+        print(f"[train] published version {args.version} -> {dest}")
+
+
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--data", default="../data/processed/occupancy_readings.csv", help="putanja do CSV-a")
+    ap.add_argument("--data", default=default_data(), help="CSV ili kolonski dataset (direktorijum iz prepare_dataset.py)")
     ap.add_argument("--window", type=int, default=20, help="veličina sliding window-a (N)")
     ap.add_argument("--out", default="model.joblib", help="gde snimiti model")
     ap.add_argument("--meta", default="model.meta.json", help="gde snimiti metapodatke")
+    ap.add_argument("--linear-out", default="model.linear.json", help="kompaktni linearni model za MLaaS")
+    ap.add_argument("--version", default="1.0.0", help="verzija modela (ide u meta i linear artefakt)")
+    ap.add_argument("--registry-dir", default="", help="ako je zadat, objavi model u <dir>/<version>/ (MLaaS registar)")
     ap.add_argument("--seed", type=int, default=42)
+    # streaming (out-of-core) trening
+    ap.add_argument("--streaming", action="store_true", help="trening u komadima (SGD partial_fit), ograničena memorija")
+    ap.add_argument("--chunk-rows", type=int, default=200_000, help="redova po komadu (--streaming)")
+    ap.add_argument("--epochs", type=int, default=5, help="prolaza kroz trening deo (--streaming)")
+    ap.add_argument("--alpha", type=float, default=1e-4, help="L2 regularizacija SGD-a (--streaming)")
+    ap.add_argument("--holdout-from", default="", help="ISO ts od kog su podaci holdout za evaluaciju (--streaming)")
+    ap.add_argument("--holdout-frac", type=float, default=0.15, help="bez --holdout-from: poslednji deo vremenskog raspona")
+    ap.add_argument("--max-dropped-frac", type=float, default=0.001,
+                    help="najveci deo readinga van hronoloskog reda koji sme da se preskoci (--streaming)")
+    ap.add_argument("--datamanager", default="", help="host:port: podaci iz DataManager ExportReadings umesto --data")
+    ap.add_argument("--from", dest="from_ts", default="", help="pocetak opsega za --datamanager (ISO)")
+    ap.add_argument("--to", dest="to_ts", default="", help="kraj opsega za --datamanager (ISO)")
     args = ap.parse_args()
+    if args.window < 2:
+        raise ValueError("window mora biti >= 2")
 
     np.random.seed(args.seed)
 
+    if args.datamanager and not args.streaming:
+        raise SystemExit("--datamanager radi samo sa --streaming")
+
+    if args.streaming:
+        if not args.datamanager and not Path(args.data).exists():
+            raise FileNotFoundError(f"Ne postoji dataset: {Path(args.data).resolve()}")
+        print(f"[train] streaming from: {args.datamanager or Path(args.data).resolve()}")
+        model, metrics, X_check, info = fit_streaming(args)
+        save_artifacts(model, args, metrics, X_check, info)
+        return
+
     data_path = Path(args.data).resolve()
     if not data_path.exists():
-        raise FileNotFoundError(f"Ne postoji CSV: {data_path}")
+        raise FileNotFoundError(f"Ne postoji dataset: {data_path}")
 
     print(f"[train] reading: {data_path}")
-    df = load_csv(data_path)
+    df = load_dataset(data_path)
     print(f"[train] rows after cleanup: {len(df)}")
 
     df_feat = build_window_features(df, window=args.window)
@@ -207,28 +578,13 @@ def main():
     if len(X_test):
         metrics["test"] = eval_split("TEST", y_test, test_prob)
 
-    # Snimi model
-    out_path = Path(args.out).resolve()
-    joblib.dump(model, out_path)
-    print(f"\n[train] saved model -> {out_path}")
-
-    # Snimi meta 
-    meta = {
-        "trained_at": iso_z(datetime.now(timezone.utc)),
-        "window_size": args.window,
-        "feature_names": MODEL_FEATURE_NAMES,
-        "label": "occupancy (0/1)",
+    X_check = np.vstack([X_val, X_test]) if len(X_val) + len(X_test) else X_train
+    save_artifacts(model, args, metrics, X_check, {
         "model": "StandardScaler + LogisticRegression(class_weight=balanced)",
-        "metrics": metrics,
-        "data_file": str(data_path),
         "rows_raw": int(len(df)),
         "rows_features": int(len(df_feat)),
         "split_sizes": {"train": int(len(train_df)), "val": int(len(val_df)), "test": int(len(test_df))},
-        "seed": args.seed,
-    }
-    meta_path = Path(args.meta).resolve()
-    meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
-    print(f"[train] saved meta  -> {meta_path}")
+    })
 
     # Detaljniji report 
     if len(X_test):
@@ -237,4 +593,4 @@ def main():
         print(classification_report(y_test, y_pred, digits=4, zero_division=0))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+# kolonski dataset: direktorijum sa jednim .npy fajlom po koloni + manifest.json.
+# ts je int64 epoch ms (UTC, isto kao ExportReadings). Ucitavanje je np.load(mmap_mode="r"):
+# nema parsiranja, a stranice se citaju sa diska tek kad se kolona stvarno koristi.
+#
+# append: podaci se dopisuju na kraj svakog .npy fajla (header se prepisuje u mestu, numpy
+# ostavlja mesto za rast shape-a), pa se manifest atomski zameni. Broj redova iz manifesta je
+# merodavan: prekinut append ostavlja samo visak na kraju fajlova, koji se ignorise i odsece
+# pri sledecem append-u.
+
+FORMAT = "iot-columnar-v1"
+MANIFEST = "manifest.json"
+
+COLUMNS = {
+    "ts_ms": np.int64,
+    "source_id": np.int32,
+    "temperature_c": np.float64,
+    "humidity_percent": np.float64,
+    "light_lux": np.float64,
+    "co2_ppm": np.float64,
+    "humidity_ratio": np.float64,
+    "occupancy": np.int8,
+    "file_id": np.int16,  # indeks u manifest["files"] (iz kog sirovog fajla je red)
+}
+
+
+def is_columnar(path) -> bool:
+    return (Path(path) / MANIFEST).is_file()
+
+
+def read_manifest(path) -> dict:
+    with open(Path(path) / MANIFEST, "r", encoding="utf-8") as f:
+        m = json.load(f)
+    if m.get("format") != FORMAT:
+        raise ValueError(f"{path}: unknown dataset format {m.get('format')}")
+    return m
+
+
+def load(path, columns=None, mmap: bool = True) -> dict[str, np.ndarray]:
+    """kolona -> niz duzine manifest["rows"] (read-only memmap ako je mmap=True)."""
+    path = Path(path)
+    m = read_manifest(path)
+    rows = int(m["rows"])
+    out = {}
+    for name in columns or m["columns"]:
+        if name not in m["columns"]:
+            raise KeyError(f"{path}: no column {name!r}")
+        if rows == 0:
+            out[name] = np.empty(0, dtype=COLUMNS[name])
+            continue
+        out[name] = np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None)[:rows]
+    return out
+
+
+def file_info(p: Path) -> dict:
+    st = p.stat()
+    return {"name": p.name, "size": st.st_size, "mtime": int(st.st_mtime)}
+
+
+def has_file(m: dict | None, info: dict) -> bool:
+    return m is not None and any(
+        f["name"] == info["name"] and f["size"] == info["size"] and f["mtime"] == info["mtime"] for f in m["files"]
+    )
+
+
+def _append_npy(path: Path, rows: int, arr: np.ndarray) -> None:
+    if rows == 0:
+        np.save(path, arr)
+        return
+    fmt = np.lib.format
+    with open(path, "r+b") as f:
+        version = fmt.read_magic(f)
+        read_header = fmt.read_array_header_1_0 if version == (1, 0) else fmt.read_array_header_2_0
+        _, fortran, dtype = read_header(f)
+        offset = f.tell()
+        if dtype != arr.dtype:
+            raise ValueError(f"{path}: dtype {dtype} != {arr.dtype}")
+        f.seek(offset + rows * dtype.itemsize)
+        f.truncate()  # visak od prekinutog append-a
+        f.write(np.ascontiguousarray(arr).tobytes())
+
+        f.seek(0)
+        d = {"descr": fmt.dtype_to_descr(dtype), "fortran_order": fortran, "shape": (rows + len(arr),)}
+        write_header = fmt.write_array_header_1_0 if version == (1, 0) else fmt.write_array_header_2_0
+        write_header(f, d)
+        if f.tell() != offset:
+            raise ValueError(f"{path}: header cannot grow in place, rewrite the dataset")
+
+
+def append(path, chunks, info: dict) -> dict:
+    """
+    Dopisuje redove jednog sirovog fajla (`chunks`: iterable dict-ova sa kolonama iz COLUMNS osim
+    file_id, da veliki fajl ne mora ceo u memoriju) i belezi `info` u manifest. Vraca novi manifest.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    m = read_manifest(path) if is_columnar(path) else {
+        "format": FORMAT, "rows": 0, "columns": list(COLUMNS), "files": [],
+    }
+    start = rows = int(m["rows"])
+    file_id = len(m["files"])
+
+    for cols in chunks:
+        n = len(cols["ts_ms"])
+        if n == 0:
+            continue
+        cols = dict(cols, file_id=np.full(n, file_id))
+        for name, dtype in COLUMNS.items():
+            arr = np.asarray(cols[name]).astype(dtype, copy=False)
+            if len(arr) != n:
+                raise ValueError(f"column {name} has {len(arr)} rows, expected {n}")
+            _append_npy(path / f"{name}.npy", rows, arr)
+        rows += n
+
+    m["rows"] = rows
+    m["files"].append(dict(info, rows=rows - start, added_at=time.time()))
+    tmp = path / (MANIFEST + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(m, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path / MANIFEST)
+    return m
@@ -1,14 +1,34 @@
 from __future__ import annotations
+import argparse
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
+import columnar
+
 PROJECT_ROOT = Path(__file__).resolve().parents[1]   # .../scripts/.. = root projekta
 RAW_BASE = PROJECT_ROOT / "data" / "raw"
 OUT_DIR = PROJECT_ROOT / "data" / "processed"
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# kolonski dataset (scripts/columnar.py): train.py, thresholds.py i sensorgenerator ga ucitavaju
+# mmap-om umesto parsiranja CSV-a
+COLUMNAR_OUT = OUT_DIR / "occupancy_readings.columns"
+
 FILES = ["datatraining.txt", "datatest.txt", "datatest2.txt"]
 
+# Kanonska imena (što ćemo koristiti u API-ju)
+RENAME = {
+    "date": "ts",
+    "Temperature": "temperature_c",
+    "Humidity": "humidity_percent",
+    "Light": "light_lux",
+    "CO2": "co2_ppm",
+    "HumidityRatio": "humidity_ratio",
+    "Occupancy": "occupancy",
+    "id": "source_id"
+}
+
 def find_raw_dir() -> Path:
     matches = list(RAW_BASE.rglob("datatraining.txt"))
     if not matches:
@@ -18,11 +38,6 @@ def find_raw_dir() -> Path:
         )
     return matches[0].parent
 
-RAW_DIR = find_raw_dir()
-
-
-FILES = ["datatraining.txt", "datatest.txt", "datatest2.txt"]
-
 def load_one(path: Path) -> pd.DataFrame:
     df = pd.read_csv(path)  # radi za UCI occupancy fajlove (CSV-like) :contentReference[oaicite:7]{index=7}
     # Normalizacija naziva kolona
@@ -31,40 +46,94 @@ def load_one(path: Path) -> pd.DataFrame:
     df["date"] = pd.to_datetime(df["date"], errors="raise")
     return df
 
+def normalize(df: pd.DataFrame) -> pd.DataFrame:
+    df.columns = [c.strip() for c in df.columns]
+    df = df.rename(columns=RENAME)
+    # occupancy u bool
+    df["occupancy"] = df["occupancy"].astype(int).astype(bool)
+    return df
+
+def to_columns(df: pd.DataFrame) -> dict:
+    """Normalizovan DataFrame -> kolone za columnar.append (ts bez zone se tretira kao UTC)."""
+    ts = pd.to_datetime(df["ts"], utc=True)
+    n = len(df)
+    return {
+        "ts_ms": ((ts - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(milliseconds=1)).to_numpy(dtype=np.int64),
+        # 0 = fajl nema source_id (potrosaci koriste svoj default, npr. SOURCE_ID u sensorgenerator-u)
+        "source_id": df["source_id"].to_numpy() if "source_id" in df.columns else np.zeros(n),
+        "temperature_c": df["temperature_c"].to_numpy(dtype=float),
+        "humidity_percent": df["humidity_percent"].to_numpy(dtype=float),
+        "light_lux": df["light_lux"].to_numpy(dtype=float),
+        "co2_ppm": df["co2_ppm"].to_numpy(dtype=float),
+        "humidity_ratio": df["humidity_ratio"].to_numpy(dtype=float) if "humidity_ratio" in df.columns else np.full(n, np.nan),
+        "occupancy": df["occupancy"].to_numpy(dtype=np.int8),
+    }
+
+def append_file(path: Path, out: Path, chunk_rows: int) -> None:
+    """Dopisuje jedan sirovi fajl (UCI format ili CSV sa kanonskim imenima) u kolonski dataset."""
+    info = columnar.file_info(path)
+    m = columnar.read_manifest(out) if columnar.is_columnar(out) else None
+    if columnar.has_file(m, info):
+        print(f"Skip: {path.name} (already in {out.name})")
+        return
+
+    def chunks():
+        # u komadima: memorija ne raste sa velicinom fajla
+        for df in pd.read_csv(path, chunksize=chunk_rows):
+            yield to_columns(normalize(df).drop_duplicates())
+
+    m = columnar.append(out, chunks(), info)
+    print(f"Appended: {path.name} -> {out} (rows={m['files'][-1]['rows']}, total={m['rows']})")
+
 def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--format", choices=["csv", "columnar", "both"], default="both")
+    ap.add_argument("--columnar-out", default=str(COLUMNAR_OUT))
+    ap.add_argument("--append", nargs="+", default=[], metavar="FILE",
+                    help="samo dopisi date fajlove u kolonski dataset (vec dodati se preskacu)")
+    ap.add_argument("--chunk-rows", type=int, default=1_000_000)
+    args = ap.parse_args()
+    columnar_out = Path(args.columnar_out)
+
+    if args.append:
+        for name in args.append:
+            append_file(Path(name).resolve(), columnar_out, args.chunk_rows)
+        return
+
+    raw_dir = find_raw_dir()
     frames = []
     for name in FILES:
-        p = RAW_DIR / name
+        p = raw_dir / name
         if not p.exists():
             raise FileNotFoundError(f"Missing file: {p}")
         df = load_one(p)
         df["source_file"] = name
         frames.append(df)
 
+    if args.format in ("columnar", "both"):
+        # isti fajlovi se ne dodaju dvaput, pa ponovno pokretanje samo dopisuje nove
+        for name in FILES:
+            append_file(raw_dir / name, columnar_out, args.chunk_rows)
+
+    if args.format == "columnar":
+        return
+
     all_df = pd.concat(frames, ignore_index=True)
 
     # UCI dataset je bez missing vrednosti :contentReference[oaicite:8]{index=8}
     # ali uklanjamo duplikate (ne smeta, plus je “production-like”)
     all_df = all_df.drop_duplicates()
 
-    # Kanonska imena (što ćemo koristiti u API-ju)
-    all_df = all_df.rename(columns={
-        "date": "ts",
-        "Temperature": "temperature_c",
-        "Humidity": "humidity_percent",
-        "Light": "light_lux",
-        "CO2": "co2_ppm",
-        "HumidityRatio": "humidity_ratio",
-        "Occupancy": "occupancy",
-        "id": "source_id"
-    })
+    all_df = normalize(all_df)
 
-    # occupancy u bool
-    all_df["occupancy"] = all_df["occupancy"].astype(int).astype(bool)
+    # fajlovi se ne nastavljaju hronoloski (datatest je stariji od datatraining): CSV ide sortiran
+    # po (source_id, ts), pa ga train.py --streaming i sensorgenerator citaju redom
+    order = [c for c in ("source_id", "ts") if c in all_df.columns]
+    all_df = all_df.sort_values(order, kind="stable").reset_index(drop=True)
 
     out = OUT_DIR / "occupancy_readings.csv"
     all_df.to_csv(out, index=False)
     print(f"Wrote: {out} (rows={len(all_df)})")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
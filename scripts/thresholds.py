@@ -1,20 +1,35 @@
 import csv
+import sys
+from pathlib import Path
 
-path = r"G:\IOT I\data\processed\occupancy_readings.csv"
+import numpy as np
+
+import columnar
+
+# percentili senzora za pragove eventmanager-a; argument = kolonski dataset (default) ili CSV
+PROCESSED = Path(__file__).resolve().parents[1] / "data" / "processed"
+path = Path(sys.argv[1]) if len(sys.argv) > 1 else PROCESSED / "occupancy_readings.columns"
+if not columnar.is_columnar(path) and path.suffix != ".csv":
+    path = PROCESSED / "occupancy_readings.csv"
 
 keys = ["temperature_c", "co2_ppm", "humidity_percent", "light_lux"]
-cols = {k: [] for k in keys}
 
-with open(path, newline="", encoding="utf-8") as f:
-    r = csv.DictReader(f)
-    for row in r:
-        for k in keys:
-            cols[k].append(float(row[k]))
+if columnar.is_columnar(path):
+    cols = columnar.load(path, keys)
+else:
+    cols = {k: [] for k in keys}
+    with open(path, newline="", encoding="utf-8") as f:
+        r = csv.DictReader(f)
+        for row in r:
+            for k in keys:
+                cols[k].append(float(row[k]))
+    cols = {k: np.array(v) for k, v in cols.items()}
 
-def q(vals, p):
-    s = sorted(vals)
+def q(s, p):
+    # s je sortiran; isti indeks kao ranije (bez interpolacije)
     i = int(p * (len(s) - 1))
     return s[i]
 
 for k,v in cols.items():
-    print(k, "min", min(v), "p95", q(v, 0.95), "max", max(v), "p05", q(v, 0.05))
\ No newline at end of file
+    s = np.sort(v)
+    print(k, "min", s[0], "p95", q(s, 0.95), "max", s[-1], "p05", q(s, 0.05))
@@ -1,13 +1,22 @@
 import os
 import csv
+import sys
 import time
 from dataclasses import dataclass
-from typing import Dict, Optional, Tuple
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional, Tuple
 
 import httpx
 from dateutil import parser as dtparser
 from dateutil import tz
 
+# kolonski dataset: scripts/columnar.py je jedina kopija; u image se kopira pored main.py
+# (build context "scripts" u docker-compose.yaml), lokalno se uzima iz ../scripts
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+if os.path.isdir(SCRIPTS_DIR) and SCRIPTS_DIR not in sys.path:
+    sys.path.append(SCRIPTS_DIR)
+
+import columnar
 
 
 def env(name: str, default: str) -> str:
@@ -18,12 +27,13 @@ def env(name: str, default: str) -> str:
 @dataclass
 class Config:
     gateway_url: str
-    data_file: str
+    data_file: str          # CSV ili kolonski dataset (direktorijum iz scripts/prepare_dataset.py)
     mode: str               # fixed | replay
     interval_ms: int        # used in fixed
     speed: float            # used in replay (npr 60 => 60x brže)
     limit: int              # 0 = bez limita
     loop: bool              # ponavljaj fajl
+    source_id: int          # senzor (soba) ako CSV nema source_id kolonu
     timeout_s: float
 
 
@@ -83,6 +93,13 @@ def map_row_to_payload(row: Dict[str, str], source_id: int) -> Dict:
     # Mapiranje kolona iz occupancy dataset-a:
     # Temperature, Humidity, Light, CO2, HumidityRatio, Occupancy, date
     ts = parse_ts(row)
+    # analytics pravi prozore po source_id -> mora biti stabilan po senzoru, ne po redu
+    sid = pick(row, "source_id")
+    if sid is not None:
+        try:
+            source_id = int(float(sid))
+        except ValueError:
+            pass
 
     payload = {
         "source_id": source_id,
@@ -97,6 +114,36 @@ def map_row_to_payload(row: Dict[str, str], source_id: int) -> Dict:
     return payload
 
 
+def csv_payloads(path: str, source_id: int) -> Iterator[Tuple[Dict, float]]:
+    delim = sniff_delimiter(path)
+    print(f"[sensorgenerator] file={path} delim='{delim}'")
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f, delimiter=delim):
+            payload = map_row_to_payload(row, source_id=source_id)
+            yield payload, dtparser.parse(payload["ts"]).timestamp()
+
+
+def columnar_payloads(path: str, source_id: int, block: int = 10000) -> Iterator[Tuple[Dict, float]]:
+    # mmap kolone, bez parsiranja; tolist po bloku da se ne pravi numpy skalar po polju
+    cols = columnar.load(path)
+    rows = len(cols["ts_ms"])
+    print(f"[sensorgenerator] columnar dataset={path} rows={rows}")
+    names = ("ts_ms", "source_id", "temperature_c", "humidity_percent", "light_lux", "co2_ppm", "humidity_ratio", "occupancy")
+    for a in range(0, rows, block):
+        for ts_ms, sid, temp, hum, light, co2, ratio, occ in zip(*(cols[n][a:a + block].tolist() for n in names)):
+            ts = datetime.fromtimestamp(ts_ms / 1000.0, tz=timezone.utc)
+            yield {
+                "source_id": sid or source_id,  # 0 = dataset nema source_id
+                "ts": ts.isoformat().replace("+00:00", "Z"),
+                "temperature_c": temp,
+                "humidity_percent": hum,
+                "light_lux": light,
+                "co2_ppm": co2,
+                "humidity_ratio": 0.0 if ratio != ratio else ratio,  # NaN = nema kolone
+                "occupancy": bool(occ),
+            }, ts_ms / 1000.0
+
+
 def send_with_retry(client: httpx.Client, url: str, json: Dict, max_tries: int = 5) -> Tuple[bool, Optional[str]]:
     delay = 0.5
     for attempt in range(1, max_tries + 1):
@@ -110,8 +157,18 @@ def send_with_retry(client: httpx.Client, url: str, json: Dict, max_tries: int =
                 except Exception:
                     rid = None
                 return True, rid
+            # 429: datamanager admission control, sacekaj koliko kaze pa probaj opet
+            if r.status_code == 429:
+                last_err = f"{r.status_code} {r.text}"
+                try:
+                    retry_ms = r.json().get("retry_after_ms")
+                except Exception:
+                    retry_ms = None
+                if retry_ms:
+                    time.sleep(min(retry_ms / 1000.0, 5.0))
+                    continue
             # 4xx: loš payload (nema smisla retry mnogo)
-            if 400 <= r.status_code < 500:
+            elif 400 <= r.status_code < 500:
                 return False, f"{r.status_code} {r.text}"
         except Exception as e:
             last_err = str(e)
@@ -131,16 +188,16 @@ def main():
         speed=float(env("SPEED", "60")),            # replay mode: 60x brže
         limit=int(env("LIMIT", "5000")),               # 0 = bez limita
         loop=env("LOOP", "false").lower() in ("1", "true", "yes", "y"),
+        source_id=int(env("SOURCE_ID", "1")),
         timeout_s=float(env("TIMEOUT_S", "10")),
     )
 
-    print(f"[sensorgenerator] url={cfg.gateway_url} file={cfg.data_file} mode={cfg.mode} interval_ms={cfg.interval_ms} speed={cfg.speed} limit={cfg.limit} loop={cfg.loop}")
+    print(f"[sensorgenerator] url={cfg.gateway_url} file={cfg.data_file} mode={cfg.mode} interval_ms={cfg.interval_ms} speed={cfg.speed} limit={cfg.limit} loop={cfg.loop} source_id={cfg.source_id}")
 
     if not os.path.exists(cfg.data_file):
         raise FileNotFoundError(f"DATA_FILE ne postoji: {cfg.data_file}")
 
-    delim = sniff_delimiter(cfg.data_file)
-    print(f"[sensorgenerator] file={cfg.data_file} delim='{delim}' mode={cfg.mode}")
+    payloads = columnar_payloads if columnar.is_columnar(cfg.data_file) else csv_payloads
 
     with httpx.Client(timeout=cfg.timeout_s) as client:
         total_sent = 0
@@ -150,43 +207,31 @@ def main():
             file_round += 1
             prev_ts_epoch: Optional[float] = None
 
-            with open(cfg.data_file, "r", newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f, delimiter=delim)
-
-                for idx, row in enumerate(reader, start=1):
-                    # limit
-                    if cfg.limit > 0 and total_sent >= cfg.limit:
-                        print(f"[sensorgenerator] LIMIT reached: {cfg.limit}")
-                        return
-
-                    payload = map_row_to_payload(row, source_id=idx + (file_round - 1) * 1_000_000)
-
-                    # pacing
-                    if cfg.mode == "replay":
-                        # sleep based on delta(ts)/speed
-                        try:
-                            ts_iso = payload["ts"]
-                            dt = dtparser.parse(ts_iso)
-                            cur_epoch = dt.timestamp()
-                            if prev_ts_epoch is not None:
-                                delta = max(0.0, cur_epoch - prev_ts_epoch)
-                                sleep_s = delta / max(cfg.speed, 0.0001)
-                                if sleep_s > 0:
-                                    time.sleep(min(sleep_s, 2.0))  # safety cap
-                            prev_ts_epoch = cur_epoch
-                        except Exception:
-                            # fallback fixed small sleep
-                            time.sleep(cfg.interval_ms / 1000.0)
-                    else:
-                        time.sleep(cfg.interval_ms / 1000.0)
-
-                    ok, info = send_with_retry(client, cfg.gateway_url, payload)
-                    total_sent += 1
-
-                    if ok:
-                        print(f"[sent #{total_sent}] id={info} ts={payload['ts']}")
-                    else:
-                        print(f"[fail #{total_sent}] {info}")
+            for payload, cur_epoch in payloads(cfg.data_file, cfg.source_id):
+                # limit
+                if cfg.limit > 0 and total_sent >= cfg.limit:
+                    print(f"[sensorgenerator] LIMIT reached: {cfg.limit}")
+                    return
+
+                # pacing
+                if cfg.mode == "replay":
+                    # sleep based on delta(ts)/speed
+                    if prev_ts_epoch is not None:
+                        delta = max(0.0, cur_epoch - prev_ts_epoch)
+                        sleep_s = delta / max(cfg.speed, 0.0001)
+                        if sleep_s > 0:
+                            time.sleep(min(sleep_s, 2.0))  # safety cap
+                    prev_ts_epoch = cur_epoch
+                else:
+                    time.sleep(cfg.interval_ms / 1000.0)
+
+                ok, info = send_with_retry(client, cfg.gateway_url, payload)
+                total_sent += 1
+
+                if ok:
+                    print(f"[sent #{total_sent}] id={info} ts={payload['ts']}")
+                else:
+                    print(f"[fail #{total_sent}] {info}")
 
             if not cfg.loop:
                 break